@@ -1,155 +1,46 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
 from llm_client import (
-    read_image_with_gemini,
+    read_image_bytes_with_gemini,
     parse_ocr_text,
     classify_disease,
-    DISEASE_MASTER
+    extraction_cache_key,
+    get_gemini_client,
+    get_disease_master,
+    reload_disease_master
 )
-import os
+from database import (
+    init_db,
+    check_duplicate,
+    find_overlapping_leaves,
+    find_identity_matches,
+    save_to_db,
+    get_cached_extraction,
+    save_extraction_cache,
+    get_upload_date_range,
+    get_upload_periods,
+    get_dashboard_summary,
+    get_top_diagnoses,
+    get_category_distribution,
+    get_monthly_trend,
+    get_leave_events,
+    get_duplicate_score_distribution,
+    get_raw_text,
+    count_review_records,
+    get_review_page,
+    save_disease_master,
+    get_perf_spans,
+    DISEASE_CATEGORIES
+)
+from metrics import trace, span, flush_spans, stage_percentiles, slowest_traces
+from leave_patterns import detect_frequency_patterns, ROLLING_WINDOW_DAYS
+from reclassify import reclassify
+from export import EXPORT_FORMATS, export_bytes
 from pathlib import Path
 
-# ==================== DATABASE SETUP ====================
-
-DB_PATH = "surat_izin.db"
-
-def init_db():
-    """Inisialisasi database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS surat_izin (
-        surat_id TEXT PRIMARY KEY,
-        nik TEXT,
-        nama TEXT,
-        tanggal_izin TEXT,
-        durasi INTEGER,
-        diagnosa TEXT,
-        dokter TEXT,
-        rumah_sakit TEXT,
-        is_reimburseable BOOLEAN,
-        kategori TEXT,
-        is_duplicate BOOLEAN,
-        duplicate_score FLOAT,
-        duplicate_note TEXT,
-        warning_flag BOOLEAN,
-        warning_reason TEXT,
-        upload_date TEXT,
-        raw_text TEXT
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-
-def get_all_records():
-    """Ambil semua record dari database"""
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM surat_izin ORDER BY upload_date DESC", conn)
-    conn.close()
-    return df
-
-
-def check_duplicate(new_data: dict) -> tuple[bool, float, str]:
-    """
-    Cek duplikasi dengan rule-based scoring
-    
-    Kriteria bobot:
-    - NIK sama: 50%
-    - Tanggal izin sama: 30%
-    - Diagnosa sama: 20%
-    """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM surat_izin")
-    existing_records = cursor.fetchall()
-    conn.close()
-    
-    if not existing_records:
-        return False, 0.0, ""
-    
-    # Get column names
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA table_info(surat_izin)")
-    columns = [row[1] for row in cursor.fetchall()]
-    conn.close()
-    
-    highest_score = 0.0
-    similar_records = []
-    
-    for record in existing_records:
-        record_dict = dict(zip(columns, record))
-        score = 0.0
-        
-        # NIK check (50%)
-        if new_data.get('nik') and record_dict.get('nik') == new_data['nik']:
-            score += 50
-        
-        # Tanggal izin check (30%)
-        if new_data.get('tanggal_izin') and record_dict.get('tanggal_izin') == new_data['tanggal_izin']:
-            score += 30
-        
-        # Diagnosa check (20%)
-        if new_data.get('diagnosa') and record_dict.get('diagnosa') == new_data['diagnosa']:
-            score += 20
-        
-        if score >= 80:
-            highest_score = max(highest_score, score)
-            similar_records.append(record_dict)
-    
-    if highest_score >= 80:
-        note_parts = []
-        if any(r['nik'] == new_data.get('nik') for r in similar_records):
-            note_parts.append("NIK sama")
-        if any(r['tanggal_izin'] == new_data.get('tanggal_izin') for r in similar_records):
-            note_parts.append("Tanggal sama")
-        if any(r['diagnosa'] == new_data.get('diagnosa') for r in similar_records):
-            note_parts.append("Diagnosa sama")
-        
-        return True, highest_score, " & ".join(note_parts)
-    
-    return False, highest_score, ""
-
-
-def save_to_db(record: dict):
-    """Simpan record ke database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    INSERT INTO surat_izin VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        record['surat_id'],
-        record['nik'],
-        record['nama'],
-        record['tanggal_izin'],
-        record['durasi'],
-        record['diagnosa'],
-        record['dokter'],
-        record['rumah_sakit'],
-        record['is_reimburseable'],
-        record['kategori'],
-        record['is_duplicate'],
-        record['duplicate_score'],
-        record['duplicate_note'],
-        record['warning_flag'],
-        record['warning_reason'],
-        record['upload_date'],
-        record['raw_text']
-    ))
-    
-    conn.commit()
-    conn.close()
-
-
 # ==================== STREAMLIT APP ====================
 
 st.set_page_config(page_title="HR Digitalisasi Surat Izin Dokter", layout="wide")
@@ -161,7 +52,7 @@ init_db()
 st.sidebar.title("📋 Menu Navigasi")
 page = st.sidebar.radio(
     "Pilih halaman:",
-    ["📤 Upload Surat", "📊 Dashboard Analytics", "🔍 Review Data", "⚙️ Konfigurasi Penyakit"]
+    ["📤 Upload Surat", "📊 Dashboard Analytics", "🔍 Review Data", "⚙️ Konfigurasi Penyakit", "⏱️ Performance"]
 )
 
 # ==================== PAGE 1: UPLOAD ====================
@@ -179,21 +70,33 @@ if page == "📤 Upload Surat":
         )
     
     if uploaded_file:
-        with st.spinner("📖 Membaca gambar dengan AI..."):
-            # Save temp file
-            temp_path = f"temp_{uploaded_file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+        # Semua rerun untuk file ini dicatat di trace yang sama (halaman Performance)
+        with trace("upload", uploaded_file.file_id, uploaded_file.name):
+            # Rerun / upload ulang file yang sama diambil dari cache, tanpa call Gemini
+            file_buffer = uploaded_file.getbuffer()
+            with span("extraction_cache"):
+                cache_key = extraction_cache_key(file_buffer)
+                raw_text = get_cached_extraction(cache_key)
             
-            # Read with Gemini
-            raw_text = read_image_with_gemini(temp_path)
+            if raw_text is None:
+                with st.spinner("📖 Membaca gambar dengan AI..."):
+                    # Read with Gemini langsung dari buffer upload (tanpa temp file)
+                    raw_text = read_image_bytes_with_gemini(file_buffer, uploaded_file.name)
+                
+                call_stats = get_gemini_client().last_call_stats
+                if call_stats:
+                    tokens = ""
+                    if call_stats.get('prompt_tokens') is not None:
+                        tokens = f", {call_stats['prompt_tokens']} + {call_stats.get('response_tokens') or 0} token"
+                    st.caption(f"⏱️ Gemini: {call_stats['latency_ms']:.0f} ms, {call_stats['retries']} retry{tokens}")
+                
+                if not raw_text.startswith("Error"):
+                    with span("save_extraction_cache"):
+                        save_extraction_cache(cache_key, raw_text)
             
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        
-        # Parse text
-        extracted_data = parse_ocr_text(raw_text)
+            # Parse text
+            with span("parse_ocr_text"):
+                extracted_data = parse_ocr_text(raw_text)
         
         # Display extracted data
         st.success("✅ Data berhasil diekstrak!")
@@ -230,11 +133,21 @@ if page == "📤 Upload Surat":
                     'raw_text': raw_text
                 }
                 
-                # Check duplicate
-                is_dup, dup_score, dup_note = check_duplicate(processed_data)
-                
-                # Classify disease
-                disease_info = classify_disease(processed_data['diagnosa'])
+                with trace("upload", uploaded_file.file_id, uploaded_file.name):
+                    # Check duplicate & overlap rentang izin
+                    with span("check_duplicate"):
+                        is_dup, dup_score, dup_note = check_duplicate(processed_data)
+                    with span("find_overlapping_leaves"):
+                        overlaps = find_overlapping_leaves(processed_data)
+                    with span("find_identity_matches"):
+                        similar_niks = [
+                            match for match in find_identity_matches(processed_data['nik'], processed_data['nama'])
+                            if match['nik_distance'] > 0
+                        ]
+                    
+                    # Classify disease
+                    with span("classify_disease"):
+                        disease_info = classify_disease(processed_data['diagnosa'])
                 
                 # Create record
                 record = {
@@ -251,14 +164,19 @@ if page == "📤 Upload Surat":
                     'is_duplicate': is_dup,
                     'duplicate_score': dup_score,
                     'duplicate_note': dup_note if is_dup else None,
-                    'warning_flag': is_dup or disease_info['warning'] is not None,
-                    'warning_reason': disease_info['warning'] if disease_info['warning'] else (f"Duplikasi ({dup_score}%)" if is_dup else None),
+                    'warning_flag': is_dup or bool(overlaps) or disease_info['warning'] is not None,
+                    'warning_reason': disease_info['warning'] if disease_info['warning'] else (
+                        f"Duplikasi ({dup_score}%)" if is_dup else
+                        f"Overlap izin dengan {overlaps[0]['surat_id']} ({overlaps[0]['overlap_hari']} hari)" if overlaps else None
+                    ),
                     'upload_date': datetime.now().isoformat(),
+                    'master_version': disease_info['master_version'],
                     'raw_text': raw_text
                 }
                 
                 # Save to DB
-                save_to_db(record)
+                with trace("upload", uploaded_file.file_id, uploaded_file.name), span("save_to_db"):
+                    save_to_db(record)
                 st.success(f"✅ Surat {record['surat_id']} berhasil disimpan!")
         
         with col2:
@@ -272,6 +190,18 @@ if page == "📤 Upload Surat":
                 else:
                     st.info("✅ Tidak ada duplikasi")
                 
+                for match in similar_niks:
+                    st.warning(
+                        f"⚠️ **NIK MIRIP**: {match['nik']} ({match['nama']}, {match['jumlah']} surat) "
+                        f"beda {match['nik_distance']} digit — cek kemungkinan salah baca OCR"
+                    )
+                
+                for overlap in overlaps:
+                    st.warning(
+                        f"⚠️ **OVERLAP IZIN**: {overlap['surat_id']} ({overlap['tanggal_izin']} s/d "
+                        f"{overlap['tanggal_selesai']}) beririsan {overlap['overlap_hari']} hari"
+                    )
+                
                 if disease_info['warning']:
                     st.warning(f"⚠️ {disease_info['warning']}")
 
@@ -282,9 +212,10 @@ elif page == "📊 Dashboard Analytics":
     st.title("📊 Dashboard Analytics HR")
     st.markdown("---")
     
-    df = get_all_records()
+    with span("get_upload_date_range", kind="dashboard"):
+        first_upload, last_upload = get_upload_date_range()
     
-    if df.empty:
+    if first_upload is None:
         st.info("📭 Belum ada data. Mulai dengan upload surat di halaman Upload.")
     else:
         # ---- DATE FILTER ----
@@ -292,9 +223,6 @@ elif page == "📊 Dashboard Analytics":
         
         filter_col1, filter_col2, filter_col3 = st.columns(3)
         
-        # Convert upload_date to datetime
-        df['upload_date'] = pd.to_datetime(df['upload_date'])
-        
         with filter_col1:
             filter_type = st.radio(
                 "Tipe Filter:",
@@ -302,15 +230,21 @@ elif page == "📊 Dashboard Analytics":
                 horizontal=True
             )
         
+        # Periode filter upload_date [period_start, period_end), None = tanpa batas
+        period_start, period_end = None, None
+        
         if filter_type == "By Bulan & Tahun":
+            with span("get_upload_periods", kind="dashboard"):
+                periods = get_upload_periods()
+            
             with filter_col2:
                 selected_year = st.selectbox(
                     "Pilih Tahun:",
-                    sorted(df['upload_date'].dt.year.unique(), reverse=True)
+                    sorted(periods['year'].unique(), reverse=True)
                 )
             
             with filter_col3:
-                months = sorted(df[df['upload_date'].dt.year == selected_year]['upload_date'].dt.month.unique())
+                months = sorted(periods[periods['year'] == selected_year]['month'].unique())
                 month_names = {1: 'Januari', 2: 'Februari', 3: 'Maret', 4: 'April', 
                               5: 'Mei', 6: 'Juni', 7: 'Juli', 8: 'Agustus',
                               9: 'September', 10: 'Oktober', 11: 'November', 12: 'Desember'}
@@ -321,29 +255,29 @@ elif page == "📊 Dashboard Analytics":
                 )
             
             # Filter data by year and month
-            df_filtered = df[(df['upload_date'].dt.year == selected_year) & 
-                            (df['upload_date'].dt.month == selected_month)]
+            period_start = date(int(selected_year), int(selected_month), 1)
+            period_end = date(period_start.year + period_start.month // 12, period_start.month % 12 + 1, 1)
+            period_start, period_end = period_start.isoformat(), period_end.isoformat()
         
         elif filter_type == "By Rentang Tanggal":
             with filter_col2:
                 start_date = st.date_input(
                     "Tanggal Mulai:",
-                    value=df['upload_date'].min().date()
+                    value=datetime.fromisoformat(first_upload).date()
                 )
             
             with filter_col3:
                 end_date = st.date_input(
                     "Tanggal Akhir:",
-                    value=df['upload_date'].max().date()
+                    value=datetime.fromisoformat(last_upload).date()
                 )
             
-            # Filter data by date range
-            df_filtered = df[(df['upload_date'].dt.date >= start_date) & 
-                            (df['upload_date'].dt.date <= end_date)]
+            # Filter data by date range (end_date inklusif)
+            period_start = start_date.isoformat()
+            period_end = (end_date + timedelta(days=1)).isoformat()
         
-        else:
-            # No filter
-            df_filtered = df.copy()
+        with span("get_dashboard_summary", kind="dashboard"):
+            summary = get_dashboard_summary(period_start, period_end)
         
         st.markdown("---")
         
@@ -353,23 +287,19 @@ elif page == "📊 Dashboard Analytics":
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            st.metric("📄 Total Surat", len(df_filtered))
+            st.metric("📄 Total Surat", summary['total'])
         
         with col2:
-            eligible = df_filtered['is_reimburseable'].sum()
-            st.metric("✅ Eligible", int(eligible))
+            st.metric("✅ Eligible", summary['reimb_true'])
         
         with col3:
-            not_eligible = len(df_filtered) - int(df_filtered['is_reimburseable'].sum())
-            st.metric("❌ Tidak Eligible", not_eligible)
+            st.metric("❌ Tidak Eligible", summary['total'] - summary['reimb_true'])
         
         with col4:
-            duplicates = int(df_filtered['is_duplicate'].sum())
-            st.metric("🔁 Duplikat", duplicates)
+            st.metric("🔁 Duplikat", summary['duplicates'])
         
         with col5:
-            warnings = int(df_filtered['warning_flag'].sum())
-            st.metric("⚠️ Perlu Review", warnings)
+            st.metric("⚠️ Perlu Review", summary['warnings'])
         
         st.markdown("---")
         
@@ -379,10 +309,11 @@ elif page == "📊 Dashboard Analytics":
         col1, col2 = st.columns(2)
         
         with col1:
-            disease_counts = df_filtered['diagnosa'].value_counts().head(5)
+            with span("get_top_diagnoses", kind="dashboard"):
+                disease_counts = get_top_diagnoses(period_start, period_end, limit=5)
             if len(disease_counts) > 0:
                 fig_disease = go.Figure(data=[
-                    go.Bar(x=disease_counts.values, y=disease_counts.index, orientation='h', marker_color='lightblue')
+                    go.Bar(x=disease_counts['jumlah'], y=disease_counts['diagnosa'], orientation='h', marker_color='lightblue')
                 ])
                 fig_disease.update_layout(xaxis_title="Jumlah", yaxis_title="Penyakit", height=400)
                 st.plotly_chart(fig_disease, use_container_width=True)
@@ -391,10 +322,11 @@ elif page == "📊 Dashboard Analytics":
         
         with col2:
             # Penyakit tidak reimburseable
-            not_reimb = df_filtered[df_filtered['is_reimburseable'] == False]['diagnosa'].value_counts().head(5)
+            with span("get_top_diagnoses[not_reimburseable]", kind="dashboard"):
+                not_reimb = get_top_diagnoses(period_start, period_end, limit=5, reimburseable=False)
             if len(not_reimb) > 0:
                 fig_not_reimb = go.Figure(data=[
-                    go.Bar(x=not_reimb.values, y=not_reimb.index, orientation='h', marker_color='salmon')
+                    go.Bar(x=not_reimb['jumlah'], y=not_reimb['diagnosa'], orientation='h', marker_color='salmon')
                 ])
                 fig_not_reimb.update_layout(xaxis_title="Jumlah", yaxis_title="Penyakit", height=400)
                 st.plotly_chart(fig_not_reimb, use_container_width=True)
@@ -409,12 +341,8 @@ elif page == "📊 Dashboard Analytics":
         col1, col2 = st.columns(2)
         
         with col1:
-            # Count reimburseable status properly
-            reimb_true = int((df_filtered['is_reimburseable'] == True).sum())
-            reimb_false = int((df_filtered['is_reimburseable'] == False).sum())
-            
             labels = ['✅ Bisa Direimburse', '❌ Tidak Bisa Direimburse']
-            values = [reimb_true, reimb_false]
+            values = [summary['reimb_true'], summary['reimb_false']]
             colors = ['#2ecc71', '#e74c3c']
             
             if sum(values) > 0:
@@ -425,10 +353,11 @@ elif page == "📊 Dashboard Analytics":
                 st.info("Tidak ada data")
         
         with col2:
-            category_dist = df_filtered['kategori'].value_counts()
+            with span("get_category_distribution", kind="dashboard"):
+                category_dist = get_category_distribution(period_start, period_end)
             if len(category_dist) > 0:
                 fig_cat = go.Figure(data=[
-                    go.Bar(x=category_dist.index, y=category_dist.values, marker_color='mediumpurple')
+                    go.Bar(x=category_dist['kategori'], y=category_dist['jumlah'], marker_color='mediumpurple')
                 ])
                 fig_cat.update_layout(xaxis_title="Kategori", yaxis_title="Jumlah", height=400, title="Distribusi Kategori Penyakit")
                 st.plotly_chart(fig_cat, use_container_width=True)
@@ -440,12 +369,12 @@ elif page == "📊 Dashboard Analytics":
         # ---- TREND TIMELINE ----
         st.subheader("📅 Trend Izin Sakit per Bulan")
         
-        df_filtered['month'] = pd.to_datetime(df_filtered['tanggal_izin']).dt.to_period('M').astype(str)
-        monthly_counts = df_filtered['month'].value_counts().sort_index()
+        with span("get_monthly_trend", kind="dashboard"):
+            monthly_counts = get_monthly_trend(period_start, period_end)
         
         if len(monthly_counts) > 0:
             fig_timeline = go.Figure(data=[
-                go.Bar(x=monthly_counts.index, y=monthly_counts.values, marker_color='teal')
+                go.Bar(x=monthly_counts['month'], y=monthly_counts['jumlah'], marker_color='teal')
             ])
             fig_timeline.update_layout(xaxis_title="Bulan (Tanggal Izin)", yaxis_title="Jumlah Surat", height=400)
             st.plotly_chart(fig_timeline, use_container_width=True)
@@ -460,26 +389,39 @@ elif page == "📊 Dashboard Analytics":
         col1, col2 = st.columns(2)
         
         with col1:
-            st.metric("🔁 Total Duplikat Terdeteksi", int(df_filtered['is_duplicate'].sum()))
+            st.metric("🔁 Total Duplikat Terdeteksi", summary['duplicates'])
             
             # Karyawan dengan izin berulang
             st.write("**Karyawan dengan Izin Berulang (3+ kali):**")
-            employee_freq = df_filtered['nik'].value_counts()
-            repeat_employees = employee_freq[employee_freq >= 3]
+            with span("get_leave_events", kind="dashboard"):
+                leave_events = get_leave_events(period_start, period_end)
+            with span("detect_frequency_patterns", kind="dashboard"):
+                repeat_employees = detect_frequency_patterns(leave_events, min_count=3)
             
             if len(repeat_employees) > 0:
-                for nik, count in repeat_employees.items():
-                    emp_data = df_filtered[df_filtered['nik'] == nik].iloc[0]
-                    st.warning(f"{emp_data['nama']} ({nik}): {count} kali izin")
+                for emp in repeat_employees.head(10).itertuples():
+                    notes = [f"{emp.total_durasi} hari"]
+                    if pd.notna(emp.first_izin):
+                        notes.append(f"{emp.first_izin:%d/%m/%Y} – {emp.last_izin:%d/%m/%Y}")
+                    if emp.rolling_flag:
+                        notes.append(f"📆 {emp.max_window_count} surat dalam {ROLLING_WINDOW_DAYS} hari")
+                    if emp.weekend_flag:
+                        notes.append(f"🗓️ {emp.senin_jumat} surat di hari Senin/Jumat")
+                    st.warning(f"{emp.nama} ({emp.nik}): {emp.jumlah} kali izin — " + " · ".join(notes))
+                
+                if len(repeat_employees) > 10:
+                    with st.expander(f"Lihat semua {len(repeat_employees)} karyawan"):
+                        st.dataframe(repeat_employees, use_container_width=True)
             else:
                 st.info("Tidak ada pola izin berulang yang mencurigakan")
         
         with col2:
             # Duplicate score distribution
-            dup_df = df_filtered[df_filtered['is_duplicate'] == True]
-            if len(dup_df) > 0:
+            with span("get_duplicate_score_distribution", kind="dashboard"):
+                dup_scores = get_duplicate_score_distribution(period_start, period_end)
+            if len(dup_scores) > 0:
                 fig_dup = go.Figure(data=[
-                    go.Histogram(x=dup_df['duplicate_score'], nbinsx=10, marker_color='coral')
+                    go.Histogram(x=dup_scores['duplicate_score'], y=dup_scores['jumlah'], histfunc='sum', nbinsx=10, marker_color='coral')
                 ])
                 fig_dup.update_layout(xaxis_title="Duplicate Score (%)", yaxis_title="Jumlah", height=300)
                 st.plotly_chart(fig_dup, use_container_width=True)
@@ -493,19 +435,21 @@ elif page == "🔍 Review Data":
     st.title("🔍 Review Data Surat Izin")
     st.markdown("---")
     
-    df = get_all_records()
-    
-    if df.empty:
+    if count_review_records() == 0:
         st.info("📭 Belum ada data.")
     else:
         # Filter options
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+        
+        status_options = {
+            "Semua": None,
+            "✅ Eligible Reimburse": "eligible",
+            "⚠️ Perlu Review": "review",
+            "❌ Tidak Reimburseable": "not_eligible",
+        }
         
         with col1:
-            status_filter = st.selectbox(
-                "Filter Status:",
-                ["Semua", "✅ Eligible Reimburse", "⚠️ Perlu Review", "❌ Tidak Reimburseable"]
-            )
+            status_filter = st.selectbox("Filter Status:", list(status_options))
         
         with col2:
             duplicate_filter = st.checkbox("Hanya Duplikat")
@@ -513,28 +457,81 @@ elif page == "🔍 Review Data":
         with col3:
             warning_filter = st.checkbox("Hanya dengan Warning")
         
-        # Apply filters
-        filtered_df = df.copy()
-        
-        if status_filter == "✅ Eligible Reimburse":
-            filtered_df = filtered_df[filtered_df['is_reimburseable'] == True]
-        elif status_filter == "❌ Tidak Reimburseable":
-            filtered_df = filtered_df[filtered_df['is_reimburseable'] == False]
-        elif status_filter == "⚠️ Perlu Review":
-            filtered_df = filtered_df[filtered_df['warning_flag'] == True]
-        
-        if duplicate_filter:
-            filtered_df = filtered_df[filtered_df['is_duplicate'] == True]
-        
-        if warning_filter:
-            filtered_df = filtered_df[filtered_df['warning_flag'] == True]
-        
-        # Display table
-        display_cols = ['surat_id', 'nik', 'nama', 'tanggal_izin', 'durasi', 'diagnosa', 
-                       'is_reimburseable', 'kategori', 'is_duplicate', 'warning_flag', 'upload_date']
-        
-        st.write(f"**Total Records: {len(filtered_df)}**")
-        st.dataframe(filtered_df[display_cols], use_container_width=True, height=600)
+        with col4:
+            page_size = st.selectbox("Per halaman:", [50, 100, 200])
+        
+        review_filters = (status_options[status_filter], duplicate_filter, warning_filter)
+        
+        # Keyset pagination: simpan cursor awal setiap halaman yang sudah dibuka,
+        # reset ke halaman pertama jika filter berubah
+        if st.session_state.get('review_filters') != (review_filters, page_size):
+            st.session_state['review_filters'] = (review_filters, page_size)
+            st.session_state['review_cursors'] = [None]
+        cursors = st.session_state['review_cursors']
+        
+        page_df, next_cursor = get_review_page(*review_filters, after=cursors[-1], page_size=page_size)
+        total_records = count_review_records(*review_filters)
+        total_pages = max(1, -(-total_records // page_size))
+        
+        st.write(f"**Total Records: {total_records}** — Halaman {len(cursors)} dari {total_pages}")
+        st.dataframe(page_df, use_container_width=True, height=600)
+        
+        nav_col1, nav_col2, _ = st.columns([1, 1, 6])
+        with nav_col1:
+            st.button("⬅️ Sebelumnya", disabled=len(cursors) == 1, on_click=cursors.pop)
+        with nav_col2:
+            st.button("Berikutnya ➡️", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+        
+        # Export dengan filter yang sama (+ periode tanggal izin). File baru dibuat saat
+        # tombol "Siapkan" diklik, lalu disimpan di session sampai filter berubah
+        with st.expander("📥 Export Data (Payroll)"):
+            exp_col1, exp_col2, exp_col3 = st.columns([1, 4, 2])
+            
+            with exp_col1:
+                export_format = st.selectbox("Format:", list(EXPORT_FORMATS))
+            
+            with exp_col2:
+                # Rentang kosong = semua tanggal; satu tanggal = mulai dari tanggal itu
+                export_period = st.date_input("Periode Tanggal Izin:", value=[])
+            
+            with exp_col3:
+                include_raw_text = st.checkbox("Sertakan raw text")
+            
+            export_start, export_end = (list(export_period) + [None, None])[:2]
+            # Tanggal akhir inklusif
+            export_filters = dict(
+                zip(('status', 'only_duplicate', 'only_warning'), review_filters),
+                start=export_start.isoformat() if export_start else None,
+                end=(export_end + timedelta(days=1)).isoformat() if export_end else None,
+                include_raw_text=include_raw_text
+            )
+            export_key = (export_format, tuple(export_filters.items()))
+            if st.button("⚙️ Siapkan File Export"):
+                with st.spinner("Menyiapkan file export..."):
+                    st.session_state['export_file'] = (export_key, export_bytes(export_format, **export_filters))
+            
+            prepared = st.session_state.get('export_file')
+            if prepared and prepared[0] == export_key:
+                extension, mime = EXPORT_FORMATS[export_format]
+                period_label = "_".join(day.strftime('%Y%m%d') for day in (export_start, export_end) if day)
+                st.download_button(
+                    f"📥 Download {export_format.upper()} ({len(prepared[1]) / 1024:.0f} KB)",
+                    data=prepared[1],
+                    file_name=f"surat_izin_{review_filters[0] or 'semua'}{'_' + period_label if period_label else ''}{extension}",
+                    mime=mime
+                )
+            elif prepared:
+                # Filter berubah: file lama tidak berlaku lagi
+                del st.session_state['export_file']
+        
+        # Raw text hanya dibaca saat satu surat dibuka
+        selected_surat = st.selectbox(
+            "📄 Lihat raw text surat:",
+            [""] + page_df['surat_id'].tolist()
+        )
+        if selected_surat:
+            raw_text = get_raw_text(selected_surat)
+            st.text_area("Raw Text", value=raw_text or "(raw text tidak tersedia)", height=250, disabled=True)
 
 
 # ==================== PAGE 4: CONFIG ====================
@@ -545,9 +542,11 @@ elif page == "⚙️ Konfigurasi Penyakit":
     
     st.info("📌 Tabel ini menentukan apakah penyakit dapat direimburse berdasarkan jenis kelamin dan kategori penyakit")
     
-    # Display current config
+    master = get_disease_master()
+    
+    # Display current config (bisa diedit langsung, simpan untuk menerapkan)
     disease_list = []
-    for disease, info in DISEASE_MASTER.items():
+    for disease, info in master.diseases.items():
         # Determine gender status
         if info['reimburseable_male'] and info['reimburseable_female']:
             gender_status = "👥 Semua"
@@ -560,17 +559,72 @@ elif page == "⚙️ Konfigurasi Penyakit":
         
         disease_list.append({
             'Penyakit': disease,
-            'Status': '✅ Bisa' if info['reimburseable'] else '❌ Tidak Bisa',
+            'Reimburse': info['reimburseable'],
             'Kategori': info['kategori'],
+            'Laki-laki': info['reimburseable_male'],
+            'Perempuan': info['reimburseable_female'],
             'Jenis Kelamin': gender_status,
             'Catatan': info.get('catatan', '')
         })
     
-    config_df = pd.DataFrame(disease_list)
-    st.dataframe(config_df, use_container_width=True)
+    config_df = pd.DataFrame(disease_list, columns=[
+        'Penyakit', 'Reimburse', 'Kategori', 'Laki-laki', 'Perempuan', 'Jenis Kelamin', 'Catatan'
+    ])
+    edited_df = st.data_editor(
+        config_df,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        disabled=['Jenis Kelamin'],
+        column_config={
+            'Reimburse': st.column_config.CheckboxColumn("Reimburse", default=False),
+            'Kategori': st.column_config.SelectboxColumn("Kategori", options=list(DISEASE_CATEGORIES), required=True),
+            'Laki-laki': st.column_config.CheckboxColumn("Laki-laki", default=False),
+            'Perempuan': st.column_config.CheckboxColumn("Perempuan", default=False),
+        },
+        key=f"disease_master_editor_{master.version}"
+    )
+    
+    st.caption(f"Versi master data: {master.version}")
+    
+    if st.button("💾 Simpan Master Data", type="primary"):
+        try:
+            version = save_disease_master({
+                row['Penyakit']: {
+                    'reimburseable': bool(row['Reimburse']),
+                    'kategori': row['Kategori'],
+                    'reimburseable_male': bool(row['Laki-laki']),
+                    'reimburseable_female': bool(row['Perempuan']),
+                    'catatan': row['Catatan'] if pd.notna(row['Catatan']) else ''
+                }
+                for row in edited_df.to_dict('records')
+                if pd.notna(row['Penyakit']) and str(row['Penyakit']).strip()
+            })
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            reload_disease_master()
+            st.session_state['disease_master_saved'] = version
+            st.rerun()
+    
+    if 'disease_master_saved' in st.session_state:
+        saved_version = st.session_state.pop('disease_master_saved')
+        st.success(f"✅ Master data disimpan (versi {saved_version}). Surat baru langsung memakai data ini.")
+    
+    # Surat lama tetap memakai klasifikasi versi sebelumnya sampai diklasifikasi ulang
+    if st.button("🔄 Klasifikasi Ulang Surat Tersimpan"):
+        progress_bar = st.progress(0.0, text="Mencari surat yang terdampak...")
+        summary = reclassify(progress=lambda done, total: progress_bar.progress(
+            done / max(total, 1), text=f"{done:,} / {total:,} surat"
+        ))
+        progress_bar.progress(1.0, text="Selesai")
+        st.success(f"✅ {summary['total']:,} surat terdampak diperiksa: {summary['updated']:,} berubah, "
+                   f"{summary['unchanged']:,} tetap (master versi {summary['version']})")
     
     st.markdown("---")
-    st.write("**📝 Catatan:** Untuk mengubah konfigurasi, edit `DISEASE_MASTER` di file `llm_client.py`")
+    st.write("**📝 Catatan:** Perubahan berlaku untuk surat yang diklasifikasi setelah disimpan; "
+             "setiap surat mencatat versi master data yang dipakai. Gunakan **Klasifikasi Ulang** "
+             "(atau `python reclassify.py`) untuk menerapkan perubahan ke surat lama.")
     
     # Display info about changes
     st.subheader("📋 Informasi Field:")
@@ -586,3 +640,58 @@ elif page == "⚙️ Konfigurasi Penyakit":
         - **Catatan**: Penjelasan detail penyakit
         """)
 
+
+# ==================== PAGE 5: PERFORMANCE ====================
+
+elif page == "⏱️ Performance":
+    st.title("⏱️ Performance")
+    st.markdown("---")
+    
+    # Span yang masih di buffer ditulis dulu agar request terakhir ikut terlihat
+    flush_spans()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        window_days = st.selectbox("Periode:", [1, 7, 30], index=1, format_func=lambda days: f"{days} hari terakhir")
+    
+    with col2:
+        kind = st.radio(
+            "Jenis:",
+            ["upload", "dashboard"],
+            format_func=lambda value: {'upload': "📤 Upload Surat", 'dashboard': "📊 Query Dashboard"}[value],
+            horizontal=True
+        )
+    
+    spans = get_perf_spans(since=(datetime.now() - timedelta(days=window_days)).isoformat(), kind=kind)
+    
+    if spans.empty:
+        st.info("📭 Belum ada data timing untuk periode ini.")
+    else:
+        # ---- PERSENTIL PER TAHAP ----
+        st.subheader("📊 Latency per Tahap (ms)")
+        percentiles = stage_percentiles(spans).drop(columns='kind').sort_values('p95', ascending=False)
+        st.dataframe(percentiles.round(1), hide_index=True, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # ---- TREND ----
+        st.subheader("📅 Latency dari Waktu ke Waktu")
+        percentile = st.selectbox("Persentil:", ['p50', 'p95', 'p99'], index=1)
+        trend = stage_percentiles(spans, freq='h' if window_days == 1 else 'D')
+        fig_trend = px.line(trend, x='periode', y=percentile, color='stage', markers=True)
+        fig_trend.update_layout(xaxis_title="Waktu", yaxis_title=f"{percentile} (ms)", height=400)
+        st.plotly_chart(fig_trend, use_container_width=True)
+        
+        # ---- UPLOAD PALING LAMBAT ----
+        if kind == 'upload':
+            st.markdown("---")
+            st.subheader("🐢 Upload Paling Lambat")
+            slowest = slowest_traces(spans, 'upload', limit=10).set_index(['mulai', 'label'])
+            st.dataframe(
+                slowest.drop(columns='trace_id').round(1).reset_index().rename(columns={'label': 'file'}),
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption("Durasi tiap tahap dalam ms, dijumlahkan untuk semua rerun file yang sama "
+                       "(ekstraksi + simpan).")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark normalize_date: regex satu kali jalan vs loop substring nama bulan
+
+Usage:
+    python bench_dates.py                  # 10k, 100k, 1M tanggal
+    python bench_dates.py 5000 200000      # ukuran custom
+"""
+
+import random
+import re
+import sys
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+import llm_client
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+UNIQUE_DATES = 2_000  # variasi string unik (OCR mengulang format yang sama)
+
+MONTHS_ID = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+             'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+MONTHS_EN = ['January', 'February', 'March', 'April', 'May', 'June',
+             'July', 'August', 'September', 'October', 'November', 'December']
+WEEKDAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+FORMATS = [
+    lambda d: f"{d.day} {MONTHS_ID[d.month - 1]} {d.year}",
+    lambda d: f"{WEEKDAYS[d.weekday()]}, {d.day} {MONTHS_ID[d.month - 1]} {d.year}",
+    lambda d: f"{d.day:02d} {MONTHS_EN[d.month - 1][:3]} {d.year}",
+    lambda d: d.strftime('%d/%m/%Y'),
+    lambda d: d.strftime('%d-%m-%y'),
+    lambda d: d.isoformat(),
+]
+
+
+def build_dates(n_rows: int, rng: random.Random) -> tuple[list[str], list[str]]:
+    """(string tanggal OCR, tanggal benar YYYY-MM-DD) dari pool UNIQUE_DATES string"""
+    base = date(2024, 1, 1)
+    pool = []
+    for _ in range(UNIQUE_DATES):
+        day = base + timedelta(days=rng.randint(0, 730))
+        pool.append((rng.choice(FORMATS)(day), day.isoformat()))
+    rows = [rng.choice(pool) for _ in range(n_rows)]
+    return [text for text, _ in rows], [expected for _, expected in rows]
+
+
+def legacy_normalize_date(date_str: str) -> str:
+    """Implementasi lama: cek substring setiap nama bulan, lalu split spasi"""
+    months = {
+        'januari': '01', 'january': '01', 'jan': '01',
+        'februari': '02', 'february': '02', 'feb': '02',
+        'maret': '03', 'march': '03', 'mar': '03',
+        'april': '04', 'apr': '04',
+        'mei': '05', 'may': '05',
+        'juni': '06', 'june': '06', 'jun': '06',
+        'juli': '07', 'july': '07', 'jul': '07',
+        'agustus': '08', 'august': '08', 'aug': '08',
+        'september': '09', 'sept': '09', 'sep': '09',
+        'oktober': '10', 'october': '10', 'oct': '10',
+        'november': '11', 'nov': '11',
+        'desember': '12', 'december': '12', 'dec': '12'
+    }
+
+    date_str = date_str.lower()
+    for month_name, month_num in months.items():
+        if month_name in date_str:
+            parts = date_str.split()
+            try:
+                return f"{parts[-1]}-{month_num}-{parts[0].zfill(2)}"
+            except IndexError:
+                pass
+
+    if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
+        return date_str
+    return None
+
+
+def timed(fn, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def accuracy(results, expected) -> float:
+    return 100 * sum(r == e for r, e in zip(results, expected)) / len(expected)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    rng = random.Random(42)
+    uncached = llm_client.normalize_date.__wrapped__
+
+    print(f"{'rows':>10} | {'legacy (ms)':>11} | {'regex (ms)':>10} | {'cached (ms)':>11} | "
+          f"{'series (ms)':>11} | {'legacy ok':>9} | {'regex ok':>8}")
+    print("-" * 90)
+
+    for n_rows in sizes:
+        texts, expected = build_dates(n_rows, rng)
+        llm_client.normalize_date.cache_clear()
+
+        legacy_ms, legacy = timed(lambda: [legacy_normalize_date(text) for text in texts])
+        regex_ms, regex = timed(lambda: [uncached(text) for text in texts])
+        cached_ms, _ = timed(lambda: [llm_client.normalize_date(text) for text in texts])
+        series_ms, _ = timed(llm_client.normalize_date_series, pd.Series(texts))
+
+        print(f"{n_rows:>10,} | {legacy_ms:11.0f} | {regex_ms:10.0f} | {cached_ms:11.0f} | "
+              f"{series_ms:11.0f} | {accuracy(legacy, expected):8.1f}% | {accuracy(regex, expected):7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
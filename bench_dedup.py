@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark check_duplicate: index-backed candidate retrieval vs full-table scan
+
+Usage:
+    python bench_dedup.py                  # 1k, 10k, 100k, 1M rows
+    python bench_dedup.py 1000 50000       # ukuran custom
+"""
+
+import os
+import sys
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import database
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 200
+LEGACY_MAX_ROWS = 100_000  # full scan di atas ini terlalu lama
+
+DISEASES = ['DEMAM', 'PILEK', 'BATUK', 'SAKIT KEPALA', 'TIPES', 'DBD', 'DIARE', 'ASMA']
+
+
+def build_db(path: str, n_rows: int, rng: random.Random):
+    """Isi database sintetis dengan n_rows surat"""
+    database.DB_PATH = path
+    database.init_db()
+
+    n_employees = max(n_rows // 5, 1)
+    niks = [f"317501{rng.randrange(10 ** 10):010d}" for _ in range(n_employees)]
+    base_date = datetime(2024, 1, 1)
+
+    def rows():
+        for i in range(n_rows):
+            tanggal = base_date + timedelta(days=rng.randint(0, 730))
+            yield (
+                f"SURAT_{i:08d}", rng.choice(niks), "karyawan",
+                tanggal.strftime('%Y-%m-%d'), rng.randint(1, 3), rng.choice(DISEASES),
+                "dr. Andi", "RS Sehat", True, "SEDANG", False, 0.0, None, False, None,
+                tanggal.isoformat(), None
+            )
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        f"INSERT INTO surat_izin ({', '.join(database.SURAT_IZIN_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(database.SURAT_IZIN_COLUMNS))})",
+        rows()
+    )
+    conn.commit()
+    probes = conn.execute(
+        f"SELECT nik, tanggal_izin, diagnosa FROM surat_izin ORDER BY random() LIMIT {LOOKUPS // 2}"
+    ).fetchall()
+    conn.close()
+
+    # Setengah probe adalah duplikat, setengah lagi tidak ada di database
+    queries = [{'nik': n, 'tanggal_izin': t, 'diagnosa': d} for n, t, d in probes]
+    queries += [
+        {'nik': f"999901{rng.randrange(10 ** 10):010d}", 'tanggal_izin': '2030-01-01', 'diagnosa': 'DEMAM'}
+        for i in range(LOOKUPS - len(queries))
+    ]
+    return queries
+
+
+def legacy_check_duplicate(new_data: dict) -> tuple[bool, float, str]:
+    """Implementasi lama: SELECT * lalu scoring di Python"""
+    conn = sqlite3.connect(database.DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM surat_izin")
+    existing_records = cursor.fetchall()
+    cursor.execute("PRAGMA table_info(surat_izin)")
+    columns = [row[1] for row in cursor.fetchall()]
+    conn.close()
+
+    highest_score = 0.0
+    for record in existing_records:
+        record_dict = dict(zip(columns, record))
+        score = 0.0
+        if new_data.get('nik') and record_dict.get('nik') == new_data['nik']:
+            score += 50
+        if new_data.get('tanggal_izin') and record_dict.get('tanggal_izin') == new_data['tanggal_izin']:
+            score += 30
+        if new_data.get('diagnosa') and record_dict.get('diagnosa') == new_data['diagnosa']:
+            score += 20
+        if score >= 80:
+            highest_score = max(highest_score, score)
+    return highest_score >= 80, highest_score, ""
+
+
+def time_lookups(fn, queries) -> float:
+    """Rata-rata waktu per lookup dalam milidetik"""
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    rng = random.Random(42)
+
+    print(f"{'rows':>10} | {'indexed (ms)':>12} | {'full scan (ms)':>14}")
+    print("-" * 44)
+
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            queries = build_db(path, n_rows, rng)
+            database.sync_nik_blocks()
+
+            indexed_ms = time_lookups(database.check_duplicate, queries)
+
+            if n_rows <= LEGACY_MAX_ROWS:
+                legacy_ms = time_lookups(legacy_check_duplicate, queries[:5])
+                legacy = f"{legacy_ms:14.2f}"
+            else:
+                legacy = f"{'skipped':>14}"
+
+            print(f"{n_rows:>10,} | {indexed_ms:12.3f} | {legacy}")
+            database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
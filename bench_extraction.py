@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Bandingkan mode ekstraksi Gemini: "json" (response schema + prompt ringkas)
+vs "text" (prompt lama "NIK: ...") — latency, token prompt/response, waktu
+parse_ocr_text dan kelengkapan field.
+
+Memanggil GEMINI_BASE_URL sungguhan (butuh GEMINI_API_KEY di .env).
+
+Usage:
+    python bench_extraction.py                       # surat sintetis
+    python bench_extraction.py surat1.jpg surat2.pdf --runs 3
+"""
+
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+import llm_client
+
+FIELDS = ('nik', 'nama', 'tanggal_izin', 'durasi', 'diagnosa', 'dokter', 'rumah_sakit')
+
+SAMPLE_LINES = [
+    "SURAT KETERANGAN SAKIT",
+    "",
+    "Yang bertanda tangan di bawah ini menerangkan bahwa:",
+    "Nama      : Budi Santoso",
+    "NIK       : 3175012345678901",
+    "perlu beristirahat selama 3 (tiga) hari",
+    "mulai tanggal Senin, 12 Januari 2026",
+    "Diagnosa  : Febris",
+    "",
+    "Jakarta, 12 Januari 2026",
+    "dr. Andi Wijaya - RS Sehat Sentosa",
+]
+
+
+def make_sample_image() -> tuple[str, str]:
+    """Surat izin sintetis (JPEG base64)"""
+    image = Image.new("RGB", (1240, 900), "white")
+    draw = ImageDraw.Draw(image)
+    for line, text in enumerate(SAMPLE_LINES):
+        draw.text((100, 100 + line * 50), text, fill="black")
+    return llm_client.encode_pil_image(image)
+
+
+def run_mode(mode: str, documents: list[tuple[str, str]], runs: int) -> dict:
+    """Ekstrak semua dokumen `runs` kali dengan satu mode"""
+    latencies, prompt_tokens, response_tokens, parse_ms, filled = [], [], [], [], []
+    results, errors = [], 0
+    client = llm_client.get_gemini_client()
+
+    for _ in range(runs):
+        for media_type, image_data in documents:
+            raw_text = llm_client.extract_with_gemini(media_type, image_data, mode)
+            stats = client.last_call_stats or {}
+            if raw_text.startswith("Error"):
+                errors += 1
+                print(f"   ❌ {mode}: {raw_text[:120]}")
+                continue
+
+            start = time.perf_counter()
+            parsed = llm_client.parse_ocr_text(raw_text)
+            parse_ms.append((time.perf_counter() - start) * 1000)
+
+            latencies.append(stats.get('latency_ms', 0.0))
+            prompt_tokens.append(stats.get('prompt_tokens') or 0)
+            response_tokens.append(stats.get('response_tokens') or 0)
+            filled.append(sum(parsed[field] is not None for field in FIELDS))
+            results.append({field: parsed[field] for field in FIELDS})
+
+    def mean(values):
+        return statistics.fmean(values) if values else 0.0
+
+    return {
+        'mode': mode,
+        'calls': len(latencies),
+        'errors': errors,
+        'p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'mean_ms': mean(latencies),
+        'prompt_tokens': mean(prompt_tokens),
+        'response_tokens': mean(response_tokens),
+        'parse_ms': mean(parse_ms),
+        'fields': mean(filled),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan mode ekstraksi Gemini json vs text")
+    parser.add_argument("files", nargs="*", help="Gambar/PDF surat izin (default: surat sintetis)")
+    parser.add_argument("--runs", type=int, default=3, help="Jumlah pengulangan per dokumen")
+    args = parser.parse_args()
+
+    if args.files:
+        documents = [llm_client.encode_image_file(path) for path in args.files]
+    else:
+        documents = [make_sample_image()]
+
+    print(f"📄 {len(documents)} dokumen × {args.runs} run → {llm_client.GEMINI_BASE_URL}\n")
+    reports = [run_mode(mode, documents, args.runs) for mode in llm_client.EXTRACTION_MODES]
+
+    print(f"{'mode':>6} | {'calls':>5} | {'err':>3} | {'p50 (ms)':>8} | {'mean (ms)':>9} | "
+          f"{'prompt tok':>10} | {'resp tok':>8} | {'parse (ms)':>10} | {'fields':>6}")
+    print("-" * 90)
+    for report in reports:
+        print(f"{report['mode']:>6} | {report['calls']:>5} | {report['errors']:>3} | {report['p50_ms']:8.0f} | "
+              f"{report['mean_ms']:9.0f} | {report['prompt_tokens']:10.0f} | {report['response_tokens']:8.0f} | "
+              f"{report['parse_ms']:10.3f} | {report['fields']:6.1f}")
+
+    # Field yang hasilnya berbeda antar mode (run pertama tiap dokumen)
+    json_results, text_results = reports[0]['results'], reports[1]['results']
+    for index, (a, b) in enumerate(zip(json_results[:len(documents)], text_results[:len(documents)])):
+        diff = [field for field in FIELDS if a[field] != b[field]]
+        if diff:
+            print(f"\n⚠️  Dokumen {index + 1} beda di: "
+                  + ", ".join(f"{field} (json={a[field]!r}, text={b[field]!r})" for field in diff))
+
+
+if __name__ == "__main__":
+    main()
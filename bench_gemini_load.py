@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Load test ekstraksi: N upload konkuren lewat read_image_with_gemini ke server
+Gemini palsu (fake_gemini.py), laporkan throughput, tail latency, retry,
+error dan hasil parse yang tidak sesuai fixture.
+
+Tanpa --url, server palsu dijalankan di proses ini dengan gangguan dari
+argumen (--latency-ms, --error-rate, --burst-period, --drip-rate, ...).
+Tanpa --fixtures, surat sintetis dibuat di folder sementara. Dengan --url,
+server harus dijalankan dengan --fixtures yang sama agar hasil bisa dicek.
+
+Usage:
+    python bench_gemini_load.py --uploads 200 --concurrency 16
+    python bench_gemini_load.py --uploads 500 --concurrency 32 --error-rate 0.05 --burst-period 20 --burst-duration 2
+    python bench_gemini_load.py --drip-rate 0.2 --drip-interval-ms 200 --read-timeout 5
+    python bench_gemini_load.py --url http://127.0.0.1:8765/v1beta/models/fake-gemini:generateContent --fixtures fixtures/
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+import llm_client
+from fake_gemini import (
+    add_fault_arguments,
+    fixture_paths,
+    load_fixture_record,
+    profile_from_args,
+    start_server,
+    write_fixtures
+)
+
+FIELDS = ('nik', 'nama', 'tanggal_izin', 'durasi', 'diagnosa', 'dokter', 'rumah_sakit')
+SYNTHETIC_FIXTURES = 20
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Persentil nearest-rank (q dalam 0-100)"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))] if ordered else 0.0
+
+
+def upload(path: str, expected: dict | None, mode: str) -> dict:
+    """Satu upload: baca gambar lewat Gemini, parse, bandingkan dengan fixture (jika ada)"""
+    start = time.perf_counter()
+    raw_text = llm_client.read_image_with_gemini(path, mode)
+    latency_ms = (time.perf_counter() - start) * 1000
+    stats = llm_client.get_gemini_client().last_call_stats or {}
+
+    result = {'latency_ms': latency_ms, 'retries': stats.get('retries', 0), 'error': None, 'mismatch': False}
+    if raw_text.startswith("Error"):
+        result['error'] = raw_text[:80]
+        return result
+
+    if expected is None:
+        return result
+    parsed = llm_client.parse_ocr_text(raw_text)
+    wanted = llm_client.parse_ocr_text(json.dumps(expected))
+    result['mismatch'] = any(parsed[field] != wanted[field] for field in FIELDS)
+    return result
+
+
+def run_load(paths: list[str], uploads: int, concurrency: int, mode: str, check: bool = True,
+             progress=None) -> tuple[list[dict], float]:
+    """Jalankan `uploads` upload (fixture dipakai bergiliran); return (hasil, durasi detik)"""
+    expected = {path: load_fixture_record(path) if check else None for path in paths}
+    done = 0
+    done_lock = threading.Lock()
+
+    def task(i):
+        nonlocal done
+        path = paths[i % len(paths)]
+        result = upload(path, expected[path], mode)
+        with done_lock:
+            done += 1
+            if progress:
+                progress(done, uploads)
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(task, range(uploads)))
+    return results, time.perf_counter() - start
+
+
+def server_counts(url: str) -> dict:
+    """Hitungan request di sisi server (GET /stats), kosong jika tidak tersedia"""
+    parts = urlsplit(url)
+    try:
+        return requests.get(f"{parts.scheme}://{parts.netloc}/stats", timeout=5).json()['counts']
+    except (requests.RequestException, ValueError, KeyError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test read_image_with_gemini ke server Gemini palsu")
+    parser.add_argument("--uploads", type=int, default=200, help="Jumlah upload")
+    parser.add_argument("--concurrency", type=int, default=16, help="Jumlah upload paralel")
+    parser.add_argument("--mode", choices=llm_client.EXTRACTION_MODES, default=llm_client.EXTRACTION_MODE,
+                        help="Mode ekstraksi")
+    parser.add_argument("--url", help="Server Gemini (palsu) yang sudah jalan; default: jalankan fake_gemini di proses ini")
+    parser.add_argument("--read-timeout", type=float, default=llm_client.GEMINI_READ_TIMEOUT, help="Read timeout client")
+    parser.add_argument("--max-retries", type=int, default=llm_client.GEMINI_MAX_RETRIES, help="Retry client untuk 429/5xx")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = fixture_paths(args.fixtures)
+        else:
+            paths = write_fixtures(tmp, SYNTHETIC_FIXTURES)
+        if not paths:
+            print(f"❌ Tidak ada fixture (gambar + .json) di {args.fixtures}")
+            return
+
+        server = None
+        url = args.url
+        if url is not None and not args.fixtures:
+            print("⚠️ Server eksternal tidak mengenal surat sintetis; hasil parse tidak dicek ke fixture")
+        if url is None:
+            server = start_server(profile=profile_from_args(args), fixtures_dir=args.fixtures or tmp, seed=args.seed)
+            url = server.url
+
+        # Client khusus load test: pool koneksi seukuran concurrency
+        llm_client._gemini_client = llm_client.GeminiClient(
+            base_url=url,
+            api_key="fake-key",
+            read_timeout=args.read_timeout,
+            max_retries=args.max_retries,
+            pool_size=args.concurrency
+        )
+
+        print(f"📄 {args.uploads} upload ({len(paths)} fixture, mode {args.mode}), "
+              f"{args.concurrency} paralel → {url}")
+        step = max(args.uploads // 10, 1)
+
+        def progress(done, total):
+            if done % step == 0 or done == total:
+                print(f"   [{done}/{total}]", flush=True)
+
+        try:
+            results, elapsed = run_load(paths, args.uploads, args.concurrency, args.mode,
+                                        check=args.url is None or bool(args.fixtures), progress=progress)
+            counts = server_counts(url)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+    ok = [result for result in results if result['error'] is None]
+    latencies = [result['latency_ms'] for result in ok]
+    errors = Counter(result['error'] for result in results if result['error'] is not None)
+
+    print(f"\n⏱️  {elapsed:.1f} detik, {len(ok) / elapsed:.2f} upload sukses/detik")
+    if latencies:
+        print(f"   latency (ms): p50 {percentile(latencies, 50):.0f} | p95 {percentile(latencies, 95):.0f} | "
+              f"p99 {percentile(latencies, 99):.0f} | max {max(latencies):.0f} | mean {statistics.fmean(latencies):.0f}")
+    print(f"   sukses {len(ok)}/{len(results)}, retry {sum(result['retries'] for result in results)}, "
+          f"hasil tidak sesuai fixture {sum(result['mismatch'] for result in ok)}")
+    if counts:
+        print(f"   server: {', '.join(f'{key} {value}' for key, value in sorted(counts.items()))}")
+    for error, count in errors.most_common(5):
+        print(f"   ❌ {count}× {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark import_history: file historis sintetis (CSV & Parquet) → database
+kosong, laporkan baris/detik dan peak RSS (memori harus tetap datar walau
+jumlah baris naik).
+
+Data sintetis meniru ekspor HR: format tanggal campur, sinonim diagnosis,
+±2% baris tidak lengkap, ±3% duplikat (NIK & tanggal sama).
+
+Usage:
+    python bench_import.py                         # 1M baris, CSV + Parquet
+    python bench_import.py --rows 200000 --format csv
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+import database
+import import_history
+
+MONTHS_ID = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+             'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+
+DATE_FORMATS = [
+    lambda d: d.isoformat(),
+    lambda d: d.strftime('%d/%m/%Y'),
+    lambda d: f"{d.day} {MONTHS_ID[d.month - 1]} {d.year}",
+]
+
+DIAGNOSES = ['Demam', 'Febris', 'Tipes', 'Typhus', 'DBD', 'Demam Berdarah', 'Pilek', 'Common Cold',
+             'Batuk', 'Sakit Kepala', 'Migrain', 'Diare', 'Asma', 'Hipertensi', 'Diabetes', 'Gastritis']
+
+WRITE_BATCH = 100_000
+
+
+def write_synthetic(path: str, n_rows: int, file_format: str, seed: int = 42):
+    """Tulis n_rows surat sintetis per batch (generator juga tidak memuat semua baris sekaligus)"""
+    rng = random.Random(seed)
+    n_employees = max(n_rows // 10, 1)
+    niks = [f"317501{rng.randrange(10 ** 10):010d}" for _ in range(n_employees)]
+    names = [f"Karyawan {i}" for i in range(n_employees)]
+    base = date(2020, 1, 1)
+    writer = None
+    previous = None
+
+    for start in range(0, n_rows, WRITE_BATCH):
+        rows = []
+        for _ in range(min(WRITE_BATCH, n_rows - start)):
+            if previous and rng.random() < 0.03:
+                row = dict(previous)
+            else:
+                employee = rng.randrange(n_employees)
+                day = base + timedelta(days=rng.randint(0, 1460))
+                row = {
+                    'NIK': niks[employee],
+                    'Nama Karyawan': names[employee],
+                    'Tanggal Izin': rng.choice(DATE_FORMATS)(day),
+                    'Lama Izin': f"{rng.randint(1, 3)} hari",
+                    'Diagnosa': rng.choice(DIAGNOSES),
+                    'Dokter': "dr. Andi",
+                    'Rumah Sakit': "RS Sehat",
+                }
+            if rng.random() < 0.02:
+                row = dict(row, **{rng.choice(['NIK', 'Tanggal Izin', 'Diagnosa']): ""})
+            rows.append(row)
+            previous = row
+
+        frame = pd.DataFrame(rows)
+        if file_format == 'csv':
+            frame.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+
+    if writer is not None:
+        writer.close()
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS proses ini (ru_maxrss dalam KB di Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import data historis")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Jumlah baris file sintetis")
+    parser.add_argument("--format", choices=['csv', 'parquet', 'all'], default='all', help="Format file")
+    parser.add_argument("--chunk-size", type=int, default=import_history.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    formats = ['csv', 'parquet'] if args.format == 'all' else [args.format]
+    print(f"{'format':>8} | {'rows':>10} | {'file (MB)':>9} | {'import (s)':>10} | {'rows/s':>9} | "
+          f"{'inserted':>9} | {'rejected':>8} | {'dup':>7} | {'peak RSS (MB)':>13}")
+    print("-" * 104)
+
+    for file_format in formats:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, f"history.{file_format}")
+            # Generator di proses terpisah agar peak RSS hanya mengukur import
+            writer = multiprocessing.Process(target=write_synthetic, args=(source, args.rows, file_format))
+            writer.start()
+            writer.join()
+
+            database.DB_PATH = os.path.join(tmp, "bench.db")
+            start = time.perf_counter()
+            summary = import_history.import_history(source, args.chunk_size)
+            elapsed = time.perf_counter() - start
+
+            print(f"{file_format:>8} | {summary['rows']:>10,} | {os.path.getsize(source) / 1e6:9.1f} | "
+                  f"{elapsed:10.1f} | {summary['rows'] / elapsed:9,.0f} | {summary['inserted']:>9,} | "
+                  f"{summary['rejected']:>8,} | {summary['duplicates']:>7,} | {peak_rss_mb():13.0f}")
+            database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark leave_patterns: engine vektor vs loop value_counts + scan per NIK
+
+Usage:
+    python bench_patterns.py                  # 10k, 100k, 1M surat
+    python bench_patterns.py 5000 200000      # ukuran custom
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import leave_patterns
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_ROWS = 100_000  # loop lama kuadratik, di atas ini terlalu lama
+
+
+def build_events(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Surat sintetis: ~5 surat per karyawan tersebar dalam 2 tahun"""
+    n_employees = max(n_rows // 5, 1)
+    niks = rng.integers(0, n_employees, n_rows)
+    tanggal = np.datetime64('2024-01-01') + rng.integers(0, 730, n_rows).astype('timedelta64[D]')
+    upload = tanggal + rng.integers(0, 86_400 * 14, n_rows).astype('timedelta64[s]')
+
+    return pd.DataFrame({
+        'nik': pd.Series(niks).map(lambda n: f"3175{n:012d}"),
+        'nama': pd.Series(niks).map(lambda n: f"karyawan {n}"),
+        'tanggal_izin': pd.Series(tanggal).dt.strftime('%Y-%m-%d'),
+        'durasi': rng.integers(1, 4, n_rows),
+        'upload_date': pd.Series(upload).dt.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+
+
+def legacy_repeat_employees(df: pd.DataFrame, min_count: int = 3) -> list[tuple]:
+    """Implementasi dashboard lama: value_counts lalu filter boolean per NIK"""
+    result = []
+    nik_counts = df['nik'].value_counts()
+    for nik, count in nik_counts[nik_counts >= min_count].items():
+        emp_name = df[df['nik'] == nik].iloc[0]['nama']
+        result.append((nik, emp_name, count))
+    return result
+
+
+def timed(fn, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    rng = np.random.default_rng(42)
+
+    print(f"{'rows':>10} | {'summary (ms)':>12} | {'rolling (ms)':>12} | {'senin/jumat (ms)':>16} | "
+          f"{'all rules (ms)':>14} | {'legacy (ms)':>11} | {'flagged':>8}")
+    print("-" * 104)
+
+    for n_rows in sizes:
+        df = build_events(n_rows, rng)
+
+        summary_ms, _ = timed(leave_patterns.summarize_employees, df)
+        rolling_ms, _ = timed(leave_patterns.max_rolling_counts, df)
+        weekend_ms, _ = timed(leave_patterns.weekend_adjacent_counts, df)
+        all_ms, result = timed(leave_patterns.detect_frequency_patterns, df)
+
+        if n_rows <= LEGACY_MAX_ROWS:
+            legacy_ms, _ = timed(legacy_repeat_employees, df)
+            legacy = f"{legacy_ms:11.0f}"
+        else:
+            legacy = f"{'skipped':>11}"
+
+        flagged = int((result['rolling_flag'] | result['weekend_flag']).sum())
+        print(f"{n_rows:>10,} | {summary_ms:12.0f} | {rolling_ms:12.0f} | {weekend_ms:16.0f} | "
+              f"{all_ms:14.0f} | {legacy} | {flagged:>8,}")
+
+
+if __name__ == "__main__":
+    main()
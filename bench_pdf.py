@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark jalur PDF: render semua halaman 300 DPI + PNG (lama)
+vs halaman pertama saja, DPI adaptif + JPEG (baru)
+
+Setiap varian dijalankan di proses terpisah agar peak RSS tidak tercampur.
+Butuh pdf2image + poppler (pdftoppm / pdfinfo).
+
+Usage:
+    python bench_pdf.py              # PDF sintetis 5 halaman A4
+    python bench_pdf.py surat.pdf    # PDF sendiri
+"""
+
+import base64
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+import llm_client
+
+RUNS = 3
+
+
+def make_sample_pdf(path: str, pages: int = 5):
+    """Buat PDF A4 multi-halaman berisi teks mirip surat izin"""
+    images = []
+    for page in range(pages):
+        image = Image.new("RGB", (1240, 1754), "white")  # A4 @ 150 DPI
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text((100, 100 + line * 40), f"Halaman {page + 1} - SURAT KETERANGAN SAKIT baris {line}", fill="black")
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=150)
+
+
+def legacy_payload(pdf_path: str) -> str:
+    """Jalur lama: semua halaman 300 DPI, halaman pertama di-encode PNG"""
+    images = llm_client.convert_from_path(pdf_path, dpi=300)
+    buffer = io.BytesIO()
+    images[0].save(buffer, format="PNG")
+    return base64.standard_b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def new_payload(pdf_path: str) -> str:
+    """Jalur baru lewat encode_image_file"""
+    return llm_client.encode_image_file(pdf_path)[1]
+
+
+def run_variant(variant: str, pdf_path: str):
+    """Dijalankan di child process: cetak hasil sebagai JSON"""
+    fn = legacy_payload if variant == "legacy" else new_payload
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        payload = fn(pdf_path)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / RUNS
+
+    # ru_maxrss dalam KB di Linux; termasuk child pdftoppm lewat RUSAGE_CHILDREN
+    rss_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                 resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({"wall_ms": elapsed_ms, "peak_rss_mb": rss_kb / 1024, "payload_bytes": len(payload)}))
+
+
+def main():
+    if not llm_client.PDF_SUPPORT:
+        print("❌ pdf2image tidak terinstall")
+        sys.exit(1)
+    if not shutil.which("pdftoppm"):
+        print("❌ poppler (pdftoppm) tidak ditemukan di PATH")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            pdf_path = sys.argv[1]
+        else:
+            pdf_path = os.path.join(tmp, "sample.pdf")
+            make_sample_pdf(pdf_path)
+
+        print(f"📄 {pdf_path} (DPI adaptif: {llm_client.choose_pdf_dpi(pdf_path)})\n")
+        print(f"{'variant':>8} | {'wall (ms)':>10} | {'peak RSS (MB)':>13} | {'payload (bytes)':>15}")
+        print("-" * 56)
+
+        for variant in ("legacy", "new"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, pdf_path],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{variant:>8} | {result['wall_ms']:10.0f} | {result['peak_rss_mb']:13.1f} | {result['payload_bytes']:15,}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--variant":
+        run_variant(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Laporan storage raw_text: buat database sintetis dengan schema lama
+(raw_text di surat_izin), lalu jalankan migrasi ke surat_izin_raw dan
+bandingkan ukuran file & memori DataFrame get_all_records.
+
+Usage:
+    python bench_storage.py            # 100k surat
+    python bench_storage.py 500000
+"""
+
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+DEFAULT_ROWS = 100_000
+DISEASES = ['Demam', 'Pilek', 'Batuk', 'Sakit Kepala', 'Tipes', 'DBD', 'Diare', 'Asma']
+
+
+def build_legacy_db(path: str, n_rows: int):
+    """Database dengan schema sebelum raw_text dipisah"""
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.execute('''
+    CREATE TABLE surat_izin (
+        surat_id TEXT PRIMARY KEY, nik TEXT, nama TEXT, tanggal_izin TEXT, durasi INTEGER,
+        diagnosa TEXT, dokter TEXT, rumah_sakit TEXT, is_reimburseable BOOLEAN, kategori TEXT,
+        is_duplicate BOOLEAN, duplicate_score FLOAT, duplicate_note TEXT, warning_flag BOOLEAN,
+        warning_reason TEXT, upload_date TEXT, raw_text TEXT
+    )
+    ''')
+
+    base_date = datetime(2024, 1, 1)
+
+    def rows():
+        for i in range(n_rows):
+            tanggal = base_date + timedelta(days=rng.randint(0, 730))
+            nik = f"3175{rng.randrange(n_rows // 5):012d}"
+            diagnosa = rng.choice(DISEASES)
+            # Mirip output Gemini: field terstruktur + catatan tambahan dari surat
+            raw_text = (
+                f"NIK: {nik}\nNama: Karyawan {i % 997}\n"
+                f"Tanggal Izin: {tanggal.day} {tanggal.strftime('%B')} {tanggal.year}\n"
+                f"Durasi: {rng.randint(1, 3)} hari\nDiagnosa: {diagnosa}\n"
+                f"Dokter: dr. Dokter {i % 53}\nRumah Sakit: RS Sehat {i % 17}\n"
+                f"Catatan: Pasien diberikan istirahat dan obat. Kontrol ulang bila keluhan berlanjut. "
+                f"Surat ini dibuat untuk keperluan izin kerja dan dapat dipertanggungjawabkan.\n"
+            )
+            yield (
+                f"SURAT_{i:08d}", nik, f"karyawan {i % 997}", tanggal.strftime('%Y-%m-%d'),
+                rng.randint(1, 3), diagnosa.upper(), f"dr. Dokter {i % 53}", f"RS Sehat {i % 17}",
+                True, "SEDANG", False, 0.0, None, False, None, tanggal.isoformat(), raw_text
+            )
+
+    conn.executemany(f"INSERT INTO surat_izin VALUES ({', '.join('?' * 17)})", rows())
+    conn.commit()
+    conn.close()
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legacy.db")
+        build_legacy_db(path, n_rows)
+        print(f"📦 {n_rows:,} surat dengan schema lama\n")
+        subprocess.run(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.py"),
+             "migrate-raw-text", "--db", path],
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite semua hot path dengan data sintetis ber-seed
+
+Database surat_izin sintetis (10k / 100k / 1M surat) dibangun dengan
+generator ber-seed: frekuensi surat per NIK mengikuti distribusi Pareto
+(sebagian kecil karyawan sering izin), diagnosa miring ke penyakit ringan,
+±3% surat duplikat. Lalu diukur:
+
+- upload: check_duplicate, find_overlapping_leaves, classify_disease, save_to_db
+- records: get_all_records (seluruh tabel ke DataFrame)
+- dashboard: semua agregat Dashboard Analytics (tanpa filter & periode 3 bulan)
+- review: count_review_records + get_review_page per filter (halaman 1 & 20)
+- parsing: parse_ocr_text (json/text), normalize_date, normalize_diagnosis
+
+Hasil ditulis ke JSON (beserta commit & versi library) agar regresi bisa
+dibandingkan antar commit dengan --compare.
+
+Usage:
+    python bench_suite.py                                  # 10k, 100k, 1M → bench_results.json
+    python bench_suite.py --sizes 10000 --output hasil.json
+    python bench_suite.py --sizes 10000 100000 --compare bench_results_main.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import database
+import llm_client
+from leave_patterns import detect_frequency_patterns
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_SEED = 42
+DEFAULT_OUTPUT = "bench_results.json"
+REGRESSION_THRESHOLD = 1.25  # median baru / median lama
+REGRESSION_MIN_MS = 1.0      # selisih median di bawah ini dianggap noise
+
+PROBES = 200          # lookup per benchmark upload
+RUNS = 20             # pengulangan per query dashboard/review
+MICRO_BATCH = 1_000   # input per run benchmark parsing
+INSERT_BATCH = 50_000
+
+# Diagnosa (sebelum normalisasi) dan bobotnya: penyakit ringan mendominasi
+DIAGNOSIS_WEIGHTS = {
+    'DEMAM': 0.22, 'PILEK': 0.18, 'BATUK': 0.14, 'SAKIT KEPALA': 0.10, 'DIARE': 0.08,
+    'TIPES': 0.06, 'DBD': 0.04, 'ASMA': 0.04, 'HIPERTENSI': 0.03, 'DIABETES': 0.02,
+    'GASTRITIS': 0.05, 'VERTIGO': 0.04,
+}
+DURATION_WEIGHTS = {1: 0.45, 2: 0.30, 3: 0.17, 5: 0.05, 7: 0.03}
+NIK_PREFIXES = ['3175', '3173', '3171', '3275', '3201', '3578']
+
+SAMPLE_OCR_TEXT = """NIK: 3175012345678901
+Nama: Budi Santoso
+Tanggal Izin: Senin, 12 Januari 2026
+Durasi: 3 hari
+Diagnosa: Febris
+Dokter: dr. Andi Wijaya
+Rumah Sakit: RS Sehat Sentosa"""
+
+SAMPLE_OCR_JSON = json.dumps({
+    'nik': '3175012345678901', 'nama': 'Budi Santoso', 'tanggal_izin': '2026-01-12', 'durasi': 3,
+    'diagnosa': 'Febris', 'dokter': 'dr. Andi Wijaya', 'rumah_sakit': 'RS Sehat Sentosa',
+})
+
+
+# ==================== DATA GENERATOR ====================
+
+def generate_surat(n_rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """
+    n_rows surat sintetis (kolom SURAT_IZIN_COLUMNS), deterministik untuk seed yang sama.
+    Klasifikasi & warning dihitung dengan classify_diseases seperti saat upload.
+    """
+    rng = np.random.default_rng(seed)
+    n_employees = max(n_rows // 8, 10)
+
+    # Frekuensi per karyawan: Pareto → ekor panjang karyawan yang sering izin
+    weights = rng.pareto(1.5, n_employees) + 1
+    employees = rng.choice(n_employees, n_rows, p=weights / weights.sum())
+    prefixes = np.array(NIK_PREFIXES)[rng.integers(0, len(NIK_PREFIXES), n_employees)]
+    niks = pd.Series(prefixes).str.cat(pd.Series(rng.integers(0, 10 ** 12, n_employees)).map('{:012d}'.format))
+
+    tanggal = np.datetime64('2024-01-01') + rng.integers(0, 730, n_rows).astype('timedelta64[D]')
+    upload = (tanggal.astype('datetime64[s]')
+              + rng.integers(0, 4 * 86_400, n_rows).astype('timedelta64[s]'))
+    diagnoses = rng.choice(list(DIAGNOSIS_WEIGHTS), n_rows, p=list(DIAGNOSIS_WEIGHTS.values()))
+    durations = rng.choice(list(DURATION_WEIGHTS), n_rows, p=list(DURATION_WEIGHTS.values()))
+
+    df = pd.DataFrame({
+        'surat_id': pd.Series(np.arange(n_rows)).map('BENCH_{:08d}'.format),
+        'nik': niks.to_numpy()[employees],
+        'nama': pd.Series(employees).map('karyawan {}'.format),
+        'tanggal_izin': pd.Series(tanggal).dt.strftime('%Y-%m-%d'),
+        'durasi': durations,
+        'diagnosa': diagnoses,
+        'dokter': rng.choice(['dr. Andi', 'dr. Budi', 'dr. Citra', 'dr. Doni'], n_rows),
+        'rumah_sakit': rng.choice(['RS Sehat', 'RS Maju', 'Klinik Medis', 'RS Bersama'], n_rows),
+        'upload_date': pd.Series(upload).dt.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+
+    # ±3% surat duplikat: NIK & tanggal sama dengan surat acak sebelumnya (separuhnya diagnosa juga sama)
+    duplicates = np.flatnonzero(rng.random(n_rows) < 0.03)
+    duplicates = duplicates[duplicates > 0]
+    sources = (rng.random(len(duplicates)) * duplicates).astype(int)
+    df.loc[duplicates, ['nik', 'nama', 'tanggal_izin']] = df.loc[sources, ['nik', 'nama', 'tanggal_izin']].to_numpy()
+    same_diagnosa = rng.random(len(duplicates)) < 0.5
+    df.loc[duplicates[same_diagnosa], 'diagnosa'] = df.loc[sources[same_diagnosa], 'diagnosa'].to_numpy()
+
+    is_duplicate = df.duplicated(['nik', 'tanggal_izin'])
+    same = df.duplicated(['nik', 'tanggal_izin', 'diagnosa'])
+    score = np.where(is_duplicate, np.where(same, 100.0, 80.0), 0.0)
+
+    master = llm_client.get_disease_master()
+    classified = llm_client.classify_diseases(df['diagnosa'], master)
+    reason = classified['warning'].fillna(
+        pd.Series([f"Duplikasi ({value}%)" for value in score], index=df.index, dtype="string").where(is_duplicate)
+    )
+
+    return df.assign(
+        is_reimburseable=classified['is_reimburseable'],
+        kategori=classified['kategori'],
+        is_duplicate=is_duplicate,
+        duplicate_score=score,
+        duplicate_note=np.where(is_duplicate, np.where(same, "NIK sama & Tanggal sama & Diagnosa sama",
+                                                      "NIK sama & Tanggal sama"), None),
+        warning_flag=reason.notna(),
+        warning_reason=reason,
+        master_version=master.version,
+    )[list(database.SURAT_IZIN_COLUMNS)]
+
+
+def build_db(path: str, n_rows: int, seed: int = DEFAULT_SEED):
+    """Isi database baru di `path` dengan n_rows surat sintetis (rollup & nik_blocks ikut dibangun)"""
+    database.DB_PATH = path
+    database.init_db()
+    df = generate_surat(n_rows, seed)
+
+    for start in range(0, n_rows, INSERT_BATCH):
+        chunk = df.iloc[start:start + INSERT_BATCH]
+        rows = list(zip(*(chunk[column].astype(object).where(chunk[column].notna(), None)
+                          for column in database.SURAT_IZIN_COLUMNS)))
+        with database.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            database.insert_surat_batch(conn, rows)
+    database.sync_nik_blocks()
+    return df
+
+
+# ==================== MEASUREMENT ====================
+
+def stats(samples_ms: list[float], **extra) -> dict:
+    """Ringkasan waktu (ms) satu benchmark"""
+    ordered = sorted(samples_ms)
+    return {
+        'runs': len(ordered),
+        'median_ms': round(statistics.median(ordered), 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        'min_ms': round(ordered[0], 4),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        **extra,
+    }
+
+
+def measure(fn, runs: int = RUNS, warmup: int = 1) -> list[float]:
+    """Jalankan fn() `runs` kali (setelah warmup), return waktu tiap run (ms)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def measure_each(fn, inputs) -> list[float]:
+    """Waktu fn(x) untuk setiap input (ms)"""
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_upload(df: pd.DataFrame, rng: random.Random) -> dict:
+    """Jalur upload per surat: separuh probe duplikat, separuh NIK baru"""
+    existing = df.sample(PROBES // 2, random_state=rng.randrange(2 ** 32))
+    probes = [
+        {'nik': row.nik, 'nama': row.nama, 'tanggal_izin': row.tanggal_izin,
+         'durasi': int(row.durasi), 'diagnosa': row.diagnosa}
+        for row in existing.itertuples()
+    ]
+    probes += [
+        {'nik': f"9999{rng.randrange(10 ** 12):012d}", 'nama': f"baru {i}", 'tanggal_izin': '2025-06-02',
+         'durasi': 2, 'diagnosa': 'DEMAM'}
+        for i in range(PROBES - len(probes))
+    ]
+    diagnoses = [probe['diagnosa'] for probe in probes]
+
+    results = {
+        'check_duplicate': stats(measure_each(database.check_duplicate, probes)),
+        'find_overlapping_leaves': stats(measure_each(database.find_overlapping_leaves, probes)),
+        'classify_disease': stats(measure_each(llm_client.classify_disease, diagnoses)),
+    }
+
+    records = [
+        {**probe, 'surat_id': f"BENCH_NEW_{i:06d}", 'dokter': "dr. Andi", 'rumah_sakit': "RS Sehat",
+         'is_reimburseable': False, 'kategori': 'RINGAN', 'is_duplicate': False, 'duplicate_score': 0.0,
+         'warning_flag': True, 'warning_reason': llm_client.WARNING_NOT_REIMBURSEABLE,
+         'upload_date': datetime(2026, 1, 1, 8, 0, i % 60).isoformat(), 'raw_text': SAMPLE_OCR_TEXT}
+        for i, probe in enumerate(probes)
+    ]
+    results['save_to_db'] = stats(measure_each(database.save_to_db, records))
+    return results
+
+
+def bench_records() -> dict:
+    """get_all_records: baca seluruh tabel surat_izin ke DataFrame"""
+    return {'get_all_records': stats(measure(database.get_all_records, runs=5))}
+
+
+def bench_dashboard() -> dict:
+    """Setiap agregat yang dipanggil halaman Dashboard Analytics"""
+    first, last = database.get_upload_date_range()
+    period_end = last[:10]
+    period_start = (pd.Timestamp(period_end) - pd.DateOffset(months=3)).strftime('%Y-%m-%d')
+
+    queries = {
+        'get_upload_date_range': database.get_upload_date_range,
+        'get_upload_periods': database.get_upload_periods,
+    }
+    for label, (start, end) in {'all': (None, None), '3m': (period_start, period_end)}.items():
+        queries.update({
+            f'get_dashboard_summary[{label}]': lambda s=start, e=end: database.get_dashboard_summary(s, e),
+            f'get_top_diagnoses[{label}]': lambda s=start, e=end: database.get_top_diagnoses(s, e, limit=5),
+            f'get_top_diagnoses[{label},not_reimburseable]':
+                lambda s=start, e=end: database.get_top_diagnoses(s, e, limit=5, reimburseable=False),
+            f'get_category_distribution[{label}]': lambda s=start, e=end: database.get_category_distribution(s, e),
+            f'get_monthly_trend[{label}]': lambda s=start, e=end: database.get_monthly_trend(s, e),
+            f'detect_frequency_patterns[{label}]':
+                lambda s=start, e=end: detect_frequency_patterns(database.get_leave_events(s, e), min_count=3),
+            f'get_duplicate_score_distribution[{label}]':
+                lambda s=start, e=end: database.get_duplicate_score_distribution(s, e),
+        })
+
+    return {
+        name: stats(measure(fn, runs=5 if name.startswith('detect_frequency_patterns') else RUNS))
+        for name, fn in queries.items()
+    }
+
+
+def bench_review() -> dict:
+    """Filter Review Data: total (count) dan halaman 1 & 20 (keyset) per filter"""
+    filters = {
+        'semua': (None, False, False),
+        'eligible': ('eligible', False, False),
+        'not_eligible': ('not_eligible', False, False),
+        'review': ('review', False, False),
+        'duplikat': (None, True, False),
+        'eligible+warning': ('eligible', False, True),
+    }
+    results = {}
+    for label, review_filters in filters.items():
+        results[f'count_review_records[{label}]'] = stats(measure(lambda: database.count_review_records(*review_filters)))
+        results[f'get_review_page[{label},p1]'] = stats(measure(lambda: database.get_review_page(*review_filters)))
+
+        cursor = None
+        for _ in range(19):
+            _, cursor = database.get_review_page(*review_filters, after=cursor)
+            if cursor is None:
+                break
+        if cursor is not None:
+            results[f'get_review_page[{label},p20]'] = stats(
+                measure(lambda: database.get_review_page(*review_filters, after=cursor))
+            )
+    return results
+
+
+def bench_parsing(seed: int = DEFAULT_SEED) -> dict:
+    """Parsing & normalisasi (tidak tergantung ukuran database); waktu per MICRO_BATCH input"""
+    rng = random.Random(seed)
+    months = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+              'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+    dates = []
+    for _ in range(MICRO_BATCH):
+        day, month, year = rng.randint(1, 28), rng.randint(1, 12), rng.randint(2024, 2026)
+        dates.append(rng.choice([
+            f"{day} {months[month - 1]} {year}", f"{day:02d}/{month:02d}/{year}", f"{year}-{month:02d}-{day:02d}",
+            f"Senin, {day} {months[month - 1]} {year}",
+        ]))
+    diagnoses = [rng.choice(['Febris', 'demam berdarah', 'Typhus abdominalis', 'COMMON COLD', 'Gastritis akut',
+                             'sakit kepala / migrain', 'Diare akut', 'ISPA'])
+                 + rng.choice(['', ' ringan', ' (observasi)']) for _ in range(MICRO_BATCH)]
+    uncached_date = llm_client.normalize_date.__wrapped__
+    uncached_diagnosis = llm_client.normalize_diagnosis.__wrapped__
+
+    benchmarks = {
+        'parse_ocr_text[text]': lambda: [llm_client.parse_ocr_text(SAMPLE_OCR_TEXT) for _ in range(MICRO_BATCH)],
+        'parse_ocr_text[json]': lambda: [llm_client.parse_ocr_text(SAMPLE_OCR_JSON) for _ in range(MICRO_BATCH)],
+        'normalize_date[uncached]': lambda: [uncached_date(value) for value in dates],
+        'normalize_date[cached]': lambda: [llm_client.normalize_date(value) for value in dates],
+        'normalize_date_series': lambda: llm_client.normalize_date_series(pd.Series(dates)),
+        'normalize_diagnosis[uncached]': lambda: [uncached_diagnosis(value) for value in diagnoses],
+        'normalize_diagnosis[cached]': lambda: [llm_client.normalize_diagnosis(value) for value in diagnoses],
+    }
+    return {name: stats(measure(fn), batch=MICRO_BATCH) for name, fn in benchmarks.items()}
+
+
+# ==================== REPORT ====================
+
+def git_commit() -> tuple[str | None, bool]:
+    """(commit HEAD, ada perubahan belum di-commit?) atau (None, False) di luar git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def run_suite(sizes: list[int], seed: int = DEFAULT_SEED) -> dict:
+    """Jalankan semua benchmark; return dokumen hasil (siap json.dump)"""
+    commit, dirty = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'seed': seed,
+            'sizes': sizes,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'results': [],
+    }
+
+    def add(group: str, size: int | None, results: dict):
+        for name, values in results.items():
+            report['results'].append({'group': group, 'size': size, 'name': name, **values})
+            print(f"  {group:>9} | {name:<48} | median {values['median_ms']:10.3f} ms | p95 {values['p95_ms']:10.3f} ms")
+
+    print("📝 parsing")
+    add('parsing', None, bench_parsing(seed))
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            df = build_db(os.path.join(tmp, "bench.db"), size, seed)
+            print(f"\n🗄️  {size:,} surat ({df['nik'].nunique():,} NIK) dibangun dalam {time.perf_counter() - start:.1f} detik")
+            rng = random.Random(seed)
+
+            add('dashboard', size, bench_dashboard())
+            add('review', size, bench_review())
+            add('records', size, bench_records())
+            add('upload', size, bench_upload(df, rng))
+
+            database.close_connections()
+
+    return report
+
+
+def compare(report: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list[dict]:
+    """
+    Bandingkan median dengan hasil sebelumnya; return benchmark yang lebih lambat
+    dari threshold (dan setidaknya REGRESSION_MIN_MS lebih lambat)
+    """
+    base = {(row['group'], row['size'], row['name']): row for row in baseline['results']}
+    regressions = []
+    print(f"\n📊 Dibandingkan dengan {baseline['meta'].get('commit') or '?'} ({baseline['meta'].get('created_at')})")
+    for row in report['results']:
+        old = base.get((row['group'], row['size'], row['name']))
+        if old is None or not old['median_ms']:
+            continue
+        ratio = row['median_ms'] / old['median_ms']
+        slower = ratio >= threshold and row['median_ms'] - old['median_ms'] >= REGRESSION_MIN_MS
+        faster = ratio <= 1 / threshold and old['median_ms'] - row['median_ms'] >= REGRESSION_MIN_MS
+        marker = "🔴" if slower else "🟢" if faster else "  "
+        print(f"{marker} {row['group']:>9} | {str(row['size'] or '-'):>9} | {row['name']:<48} | "
+              f"{old['median_ms']:10.3f} → {row['median_ms']:10.3f} ms ({ratio:5.2f}×)")
+        if slower:
+            regressions.append({**row, 'baseline_median_ms': old['median_ms'], 'ratio': round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite hot path dengan data sintetis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Jumlah surat per database")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed generator data")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="File JSON hasil")
+    parser.add_argument("--compare", help="JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Rasio median baru/lama yang dianggap regresi")
+    args = parser.parse_args()
+
+    report = run_suite(args.sizes, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ {len(report['results'])} hasil ditulis ke {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark lebih lambat ≥ {args.threshold}×")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Fixture pytest bersama untuk test database
+"""
+
+import pytest
+
+import database
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Database SQLite baru di tmp_path; pool koneksi ditutup sesudah test"""
+    database.close_connections()
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "test.db"))
+    database.init_db()
+    yield tmp_path
+    database.close_connections()
@@ -0,0 +1,1657 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+import pandas as pd
+from datetime import datetime, timedelta
+
+from identity import (
+    NIK_LENGTH,
+    NIK_MAX_DISTANCE,
+    NAME_MIN_SIMILARITY,
+    normalize_nik,
+    nik_block_keys,
+    nik_probe_keys,
+    levenshtein,
+    name_similarity,
+    match_identity,
+    cluster_identities
+)
+
+# ==================== DATABASE SETUP ====================
+
+DB_PATH = "surat_izin.db"
+
+# Kolom surat_izin (raw_text disimpan di surat_izin_raw)
+SURAT_IZIN_COLUMNS = (
+    'surat_id', 'nik', 'nama', 'tanggal_izin', 'durasi', 'diagnosa', 'dokter',
+    'rumah_sakit', 'is_reimburseable', 'kategori', 'is_duplicate', 'duplicate_score',
+    'duplicate_note', 'warning_flag', 'warning_reason', 'upload_date', 'master_version'
+)
+
+# Tuning koneksi SQLite
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+POOL_MAX_IDLE = 8
+
+# Bobot scoring duplikasi
+NIK_WEIGHT = 50
+TANGGAL_WEIGHT = 30
+DIAGNOSA_WEIGHT = 20
+DUPLICATE_THRESHOLD = 80
+
+# Batas extraction cache
+EXTRACTION_CACHE_MAX_AGE_DAYS = 30
+EXTRACTION_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Retensi timing span (lihat metrics.py)
+PERF_SPANS_MAX_AGE_DAYS = 30
+
+
+# ==================== CONNECTION MANAGER ====================
+
+_pools: dict[str, queue.LifoQueue] = {}
+_pools_lock = threading.Lock()
+
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    """Buka koneksi baru dengan WAL dan pragma yang sudah di-tuning"""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=CACHED_STATEMENTS,
+        check_same_thread=False
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@contextmanager
+def get_connection():
+    """
+    Pinjam koneksi dari pool proses untuk DB_PATH.
+
+    Selama dipinjam, koneksi hanya dipakai oleh thread pemanggil. Setelah
+    selesai, koneksi di-commit (atau rollback jika error) lalu dikembalikan
+    ke pool, sehingga rerun Streamlit berikutnya memakai koneksi yang sama
+    beserta cache prepared statement-nya.
+    """
+    db_path = DB_PATH
+    with _pools_lock:
+        pool = _pools.setdefault(db_path, queue.LifoQueue())
+
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open_connection(db_path)
+
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        if pool.qsize() < POOL_MAX_IDLE:
+            pool.put(conn)
+        else:
+            conn.close()
+
+
+def close_connections():
+    """Tutup semua koneksi idle di pool (mis. sebelum menghapus file database)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def init_db():
+    """Inisialisasi database"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS surat_izin (
+            surat_id TEXT PRIMARY KEY,
+            nik TEXT,
+            nama TEXT,
+            tanggal_izin TEXT,
+            durasi INTEGER,
+            diagnosa TEXT,
+            dokter TEXT,
+            rumah_sakit TEXT,
+            is_reimburseable BOOLEAN,
+            kategori TEXT,
+            is_duplicate BOOLEAN,
+            duplicate_score FLOAT,
+            duplicate_note TEXT,
+            warning_flag BOOLEAN,
+            warning_reason TEXT,
+            upload_date TEXT,
+            master_version INTEGER
+        )
+        ''')
+
+        # raw_text terpisah & terkompresi, lihat RAW TEXT STORAGE
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS surat_izin_raw (
+            surat_id TEXT PRIMARY KEY,
+            raw_text_z BLOB
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_surat_izin_raw_delete AFTER DELETE ON surat_izin
+        BEGIN
+            DELETE FROM surat_izin_raw WHERE surat_id = OLD.surat_id;
+        END
+        ''')
+
+        _migrate_raw_text(conn)
+
+        # Versi master penyakit yang dipakai saat klasifikasi (database lama belum punya kolom ini)
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(surat_izin)")]
+        if 'master_version' not in columns:
+            cursor.execute("ALTER TABLE surat_izin ADD COLUMN master_version INTEGER")
+
+        # Composite index untuk candidate retrieval duplikasi
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_surat_izin_dedup
+        ON surat_izin (nik, tanggal_izin, diagnosa)
+        ''')
+
+        # Index untuk filter periode di dashboard dan urutan keyset Review Data
+        cursor.execute("DROP INDEX IF EXISTS idx_surat_izin_upload_date")
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_surat_izin_upload_order
+        ON surat_izin (upload_date, surat_id)
+        ''')
+
+        # Index filter flag Review Data, urutannya sama dengan keyset pagination
+        for flag in ('is_reimburseable', 'is_duplicate', 'warning_flag'):
+            cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_surat_izin_{flag}
+            ON surat_izin ({flag}, upload_date, surat_id)
+            ''')
+
+        # Cache hasil ekstraksi Gemini, key = SHA-256(file bytes + versi prompt)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            cache_key TEXT PRIMARY KEY,
+            raw_text TEXT,
+            size_bytes INTEGER,
+            created_at TEXT,
+            last_used TEXT
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_used
+        ON extraction_cache (last_used)
+        ''')
+
+        # Timing span per tahap upload / query dashboard (ditulis per batch oleh metrics.py)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS perf_spans (
+            trace_id TEXT,
+            kind TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            label TEXT,
+            started_at TEXT NOT NULL,
+            duration_ms REAL NOT NULL
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_perf_spans_started_at
+        ON perf_spans (started_at)
+        ''')
+
+        # Rollup bulanan untuk dashboard, dijaga trigger di transaksi yang sama
+        # dengan INSERT/UPDATE/DELETE surat_izin. NULL disimpan sebagai ''/-1
+        # agar kombinasi key tetap unik untuk UPSERT.
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS surat_izin_monthly (
+            upload_month TEXT NOT NULL,
+            izin_month TEXT NOT NULL,
+            diagnosa TEXT NOT NULL,
+            kategori TEXT NOT NULL,
+            is_reimburseable INTEGER NOT NULL,
+            is_duplicate INTEGER NOT NULL,
+            warning_flag INTEGER NOT NULL,
+            jumlah INTEGER NOT NULL,
+            total_durasi INTEGER NOT NULL,
+            PRIMARY KEY (upload_month, izin_month, diagnosa, kategori,
+                         is_reimburseable, is_duplicate, warning_flag)
+        )
+        ''')
+
+        # Index blocking NIK untuk fuzzy matching identitas (lihat identity.py).
+        # Diisi oleh penulis dari rowid terakhir (_sync_nik_blocks): save_to_db
+        # di transaksinya sendiri, import massal sekali di akhir (per NIK unik,
+        # bukan lewat trigger yang membayar 15 insert index per baris).
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS nik_blocks (
+            block TEXT NOT NULL,
+            nik TEXT NOT NULL,
+            PRIMARY KEY (block, nik)
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS nik_blocks_sync (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_rowid INTEGER NOT NULL
+        )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO nik_blocks_sync VALUES (1, 0)")
+
+        # Hasil batch cluster identitas: NIK → NIK kanonik (hanya cluster > 1 NIK)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS identity_clusters (
+            nik TEXT PRIMARY KEY,
+            cluster_nik TEXT NOT NULL,
+            nik_distance INTEGER,
+            name_similarity REAL
+        ) WITHOUT ROWID
+        ''')
+
+        # Selama ada baris di sini (hanya di dalam transaksi insert_surat_batch)
+        # trigger rollup insert tidak jalan; rollup di-update sekali per batch
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS surat_izin_monthly_paused (
+            id INTEGER PRIMARY KEY CHECK (id = 1)
+        )
+        ''')
+        # Trigger insert versi lama (tanpa WHEN) diganti sekali
+        trigger_sql = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_surat_izin_monthly_insert'"
+        ).fetchone()
+        if trigger_sql and 'surat_izin_monthly_paused' not in trigger_sql[0]:
+            cursor.execute("DROP TRIGGER trg_surat_izin_monthly_insert")
+        for statement in _rollup_trigger_statements():
+            cursor.execute(statement)
+
+        # Master penyakit + versi (lihat DISEASE MASTER); diisi default saat pertama dibuat
+        for statement in _disease_master_statements():
+            cursor.execute(statement)
+        if cursor.execute("INSERT OR IGNORE INTO disease_master_version VALUES (1, 0)").rowcount:
+            _upsert_diseases(cursor, DEFAULT_DISEASE_MASTER)
+
+        rollup_empty = cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM surat_izin_monthly)").fetchone()[0]
+        has_records = cursor.execute("SELECT EXISTS (SELECT 1 FROM surat_izin)").fetchone()[0]
+        if rollup_empty and has_records:
+            _rebuild_monthly_rollup(cursor)
+
+        _sync_nik_blocks(conn)
+
+
+def get_all_records():
+    """Ambil semua record dari database"""
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM surat_izin ORDER BY upload_date DESC", conn)
+    return df
+
+
+# ==================== MONTHLY ROLLUP ====================
+
+def _rollup_key_exprs(prefix: str = "") -> list[str]:
+    """Ekspresi key rollup untuk satu baris surat_izin (prefix 'NEW.', 'OLD.' atau kosong)"""
+    return [
+        f"COALESCE(substr({prefix}upload_date, 1, 7), '')",
+        f"COALESCE(substr({prefix}tanggal_izin, 1, 7), '')",
+        f"COALESCE({prefix}diagnosa, '')",
+        f"COALESCE({prefix}kategori, '')",
+        f"COALESCE({prefix}is_reimburseable = 1, -1)",
+        f"COALESCE({prefix}is_duplicate = 1, -1)",
+        f"COALESCE({prefix}warning_flag = 1, -1)",
+    ]
+
+
+ROLLUP_KEYS = "upload_month, izin_month, diagnosa, kategori, is_reimburseable, is_duplicate, warning_flag"
+
+
+def _rollup_trigger_statements() -> list[str]:
+    """CREATE TRIGGER untuk menjaga surat_izin_monthly tetap sinkron"""
+    def add(prefix: str) -> str:
+        return f'''
+            INSERT INTO surat_izin_monthly ({ROLLUP_KEYS}, jumlah, total_durasi)
+            VALUES ({", ".join(_rollup_key_exprs(prefix))}, 1, COALESCE({prefix}durasi, 0))
+            ON CONFLICT ({ROLLUP_KEYS}) DO UPDATE SET
+                jumlah = jumlah + 1,
+                total_durasi = total_durasi + excluded.total_durasi;
+        '''
+
+    def remove(prefix: str) -> str:
+        match = " AND ".join(
+            f"{key.strip()} = {expr}"
+            for key, expr in zip(ROLLUP_KEYS.split(","), _rollup_key_exprs(prefix))
+        )
+        return f'''
+            UPDATE surat_izin_monthly
+            SET jumlah = jumlah - 1, total_durasi = total_durasi - COALESCE({prefix}durasi, 0)
+            WHERE {match};
+            DELETE FROM surat_izin_monthly WHERE jumlah <= 0;
+        '''
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_surat_izin_monthly_insert AFTER INSERT ON surat_izin "
+        f"WHEN NOT EXISTS (SELECT 1 FROM surat_izin_monthly_paused) BEGIN {add('NEW.')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_surat_izin_monthly_delete AFTER DELETE ON surat_izin "
+        f"BEGIN {remove('OLD.')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_surat_izin_monthly_update AFTER UPDATE OF "
+        f"upload_date, tanggal_izin, diagnosa, kategori, is_reimburseable, is_duplicate, warning_flag, durasi "
+        f"ON surat_izin BEGIN {remove('OLD.')} {add('NEW.')} END",
+    ]
+
+
+def _rebuild_monthly_rollup(cursor: sqlite3.Cursor):
+    """Hitung ulang seluruh surat_izin_monthly dari surat_izin"""
+    cursor.execute("DELETE FROM surat_izin_monthly")
+    cursor.execute(f'''
+    INSERT INTO surat_izin_monthly ({ROLLUP_KEYS}, jumlah, total_durasi)
+    SELECT {", ".join(_rollup_key_exprs())}, COUNT(*), COALESCE(SUM(durasi), 0)
+    FROM surat_izin
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+    ''')
+
+
+def rebuild_monthly_rollup() -> int:
+    """Full rebuild rollup bulanan (untuk backfill). Return jumlah baris rollup."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        _rebuild_monthly_rollup(cursor)
+        return cursor.execute("SELECT COUNT(*) FROM surat_izin_monthly").fetchone()[0]
+
+
+def _next_month(day: str) -> str:
+    """'YYYY-MM-DD' → tanggal 1 bulan berikutnya"""
+    year, month = int(day[:4]), int(day[5:7])
+    return f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+
+
+def _rollup_source(start: str = None, end: str = None) -> tuple[str, list]:
+    """
+    Subquery baris agregat untuk periode upload_date [start, end).
+
+    Bulan yang tercakup penuh dibaca dari surat_izin_monthly; sisa hari di
+    awal/akhir periode (jika tidak jatuh di awal bulan) dibaca dari
+    surat_izin lewat index upload_date. Kolom hasil: diagnosa, kategori,
+    izin_month, is_reimburseable, is_duplicate, warning_flag, jumlah, total_durasi.
+    """
+    full_start = None if start is None else (start if start[8:10] == "01" else _next_month(start))
+    full_end = None if end is None else end[:7] + "-01"
+
+    raw_select = '''
+        SELECT diagnosa, kategori, substr(tanggal_izin, 1, 7) AS izin_month,
+               is_reimburseable = 1 AS is_reimburseable, is_duplicate = 1 AS is_duplicate,
+               warning_flag = 1 AS warning_flag, 1 AS jumlah, durasi AS total_durasi
+        FROM surat_izin
+    '''
+
+    if full_start is not None and full_end is not None and full_start >= full_end:
+        where, params = _period_clause(start, end)
+        return f"{raw_select} {where}", params
+
+    parts, params = [], []
+
+    conditions = []
+    if full_start is not None:
+        conditions.append("upload_month >= ?")
+        params.append(full_start[:7])
+    if full_end is not None:
+        conditions.append("upload_month < ?")
+        params.append(full_end[:7])
+    parts.append(f'''
+        SELECT NULLIF(diagnosa, '') AS diagnosa, NULLIF(kategori, '') AS kategori,
+               NULLIF(izin_month, '') AS izin_month,
+               NULLIF(is_reimburseable, -1) AS is_reimburseable,
+               NULLIF(is_duplicate, -1) AS is_duplicate,
+               NULLIF(warning_flag, -1) AS warning_flag,
+               jumlah, total_durasi
+        FROM surat_izin_monthly
+        {("WHERE " + " AND ".join(conditions)) if conditions else ""}
+    ''')
+
+    for edge_start, edge_end in ((start, full_start), (full_end, end)):
+        if edge_start is not None and edge_end is not None and edge_start < edge_end:
+            where, edge_params = _period_clause(edge_start, edge_end)
+            parts.append(f"{raw_select} {where}")
+            params += edge_params
+
+    return " UNION ALL ".join(parts), params
+
+
+# ==================== DASHBOARD QUERIES ====================
+#
+# Semua agregasi dashboard dihitung di SQLite dengan filter periode
+# upload_date [start, end). Batas berupa string ISO (YYYY-MM-DD), jadi
+# bisa memakai idx_surat_izin_upload_order; None berarti tanpa batas.
+# Metric, top-5 dan trend bulanan dibaca dari surat_izin_monthly.
+
+def _period_clause(start: str = None, end: str = None) -> tuple[str, list]:
+    """Bangun klausa WHERE untuk filter periode upload_date"""
+    conditions, params = [], []
+    if start:
+        conditions.append("upload_date >= ?")
+        params.append(start)
+    if end:
+        conditions.append("upload_date < ?")
+        params.append(end)
+    return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def _and(where: str, condition: str) -> str:
+    """Tambah kondisi ke klausa WHERE (yang mungkin kosong)"""
+    return f"{where} AND {condition}" if where else f"WHERE {condition}"
+
+
+def get_upload_date_range() -> tuple[str, str] | tuple[None, None]:
+    """upload_date paling awal & paling akhir (None jika database kosong)"""
+    with get_connection() as conn:
+        row = conn.execute("SELECT MIN(upload_date), MAX(upload_date) FROM surat_izin").fetchone()
+    return row[0], row[1]
+
+
+def get_upload_periods() -> pd.DataFrame:
+    """Kombinasi (year, month) upload_date yang ada di database"""
+    with get_connection() as conn:
+        return pd.read_sql_query('''
+        SELECT DISTINCT CAST(substr(upload_month, 1, 4) AS INTEGER) AS year,
+                        CAST(substr(upload_month, 6, 2) AS INTEGER) AS month
+        FROM surat_izin_monthly
+        WHERE upload_month != ''
+        ORDER BY year DESC, month
+        ''', conn)
+
+
+def get_dashboard_summary(start: str = None, end: str = None) -> dict:
+    """Metric utama dashboard untuk satu periode"""
+    source, params = _rollup_source(start, end)
+    with get_connection() as conn:
+        row = conn.execute(f'''
+        SELECT COALESCE(SUM(jumlah), 0),
+               COALESCE(SUM(CASE WHEN is_reimburseable = 1 THEN jumlah END), 0),
+               COALESCE(SUM(CASE WHEN is_reimburseable = 0 THEN jumlah END), 0),
+               COALESCE(SUM(CASE WHEN is_duplicate = 1 THEN jumlah END), 0),
+               COALESCE(SUM(CASE WHEN warning_flag = 1 THEN jumlah END), 0)
+        FROM ({source})
+        ''', params).fetchone()
+
+    total, reimb_true, reimb_false, duplicates, warnings = row
+    return {
+        'total': total,
+        'reimb_true': reimb_true,
+        'reimb_false': reimb_false,
+        'duplicates': duplicates,
+        'warnings': warnings,
+    }
+
+
+def get_top_diagnoses(start: str = None, end: str = None, limit: int = 5,
+                      reimburseable: bool = None) -> pd.DataFrame:
+    """Diagnosa terbanyak (kolom: diagnosa, jumlah), opsional filter reimburseable"""
+    source, params = _rollup_source(start, end)
+    where = "WHERE diagnosa IS NOT NULL"
+    if reimburseable is not None:
+        where += " AND is_reimburseable = ?"
+        params.append(int(reimburseable))
+
+    with get_connection() as conn:
+        return pd.read_sql_query(f'''
+        SELECT diagnosa, SUM(jumlah) AS jumlah
+        FROM ({source}) {where}
+        GROUP BY diagnosa
+        ORDER BY jumlah DESC, diagnosa
+        LIMIT ?
+        ''', conn, params=params + [limit])
+
+
+def get_category_distribution(start: str = None, end: str = None) -> pd.DataFrame:
+    """Jumlah surat per kategori (kolom: kategori, jumlah)"""
+    source, params = _rollup_source(start, end)
+    with get_connection() as conn:
+        return pd.read_sql_query(f'''
+        SELECT kategori, SUM(jumlah) AS jumlah
+        FROM ({source})
+        WHERE kategori IS NOT NULL
+        GROUP BY kategori
+        ORDER BY jumlah DESC, kategori
+        ''', conn, params=params)
+
+
+def get_monthly_trend(start: str = None, end: str = None) -> pd.DataFrame:
+    """Jumlah surat per bulan tanggal_izin (kolom: month 'YYYY-MM', jumlah)"""
+    source, params = _rollup_source(start, end)
+    with get_connection() as conn:
+        return pd.read_sql_query(f'''
+        SELECT izin_month AS month, SUM(jumlah) AS jumlah
+        FROM ({source})
+        WHERE izin_month IS NOT NULL
+        GROUP BY izin_month
+        ORDER BY izin_month
+        ''', conn, params=params)
+
+
+def get_leave_events(start: str = None, end: str = None) -> pd.DataFrame:
+    """
+    Kolom yang dibutuhkan leave_patterns (nik, nama, tanggal_izin, durasi,
+    upload_date) untuk surat dengan NIK di periode upload. NIK yang sudah
+    di-cluster (rebuild_identity_clusters) diganti NIK kanoniknya.
+    """
+    where, params = _period_clause(start, end)
+    where = _and(where, "s.nik IS NOT NULL")
+    with get_connection() as conn:
+        return pd.read_sql_query(f'''
+        SELECT COALESCE(c.cluster_nik, s.nik) AS nik, s.nama, s.tanggal_izin, s.durasi, s.upload_date
+        FROM surat_izin s
+        LEFT JOIN identity_clusters c ON c.nik = s.nik
+        {where}
+        ''', conn, params=params)
+
+
+def get_duplicate_score_distribution(start: str = None, end: str = None) -> pd.DataFrame:
+    """Sebaran duplicate_score surat duplikat (kolom: duplicate_score, jumlah)"""
+    where, params = _period_clause(start, end)
+    where = _and(where, "is_duplicate = 1")
+    with get_connection() as conn:
+        return pd.read_sql_query(f'''
+        SELECT duplicate_score, COUNT(*) AS jumlah
+        FROM surat_izin {where}
+        GROUP BY duplicate_score
+        ORDER BY duplicate_score
+        ''', conn, params=params)
+
+
+# ==================== REVIEW DATA QUERIES ====================
+
+REVIEW_COLUMNS = (
+    'surat_id', 'nik', 'nama', 'tanggal_izin', 'durasi', 'diagnosa',
+    'is_reimburseable', 'kategori', 'is_duplicate', 'warning_flag', 'upload_date'
+)
+
+# Predikat status di halaman Review Data, berlaku untuk surat_izin maupun surat_izin_monthly
+REVIEW_STATUS_FILTERS = {
+    'eligible': "is_reimburseable = 1",
+    'not_eligible': "is_reimburseable = 0",
+    'review': "warning_flag = 1",
+}
+
+
+def _review_conditions(status: str = None, only_duplicate: bool = False,
+                       only_warning: bool = False) -> list[str]:
+    """Kondisi WHERE untuk filter Review Data"""
+    conditions = []
+    if status:
+        conditions.append(REVIEW_STATUS_FILTERS[status])
+    if only_duplicate:
+        conditions.append("is_duplicate = 1")
+    if only_warning:
+        conditions.append("warning_flag = 1")
+    return conditions
+
+
+def count_review_records(status: str = None, only_duplicate: bool = False,
+                         only_warning: bool = False) -> int:
+    """
+    Total surat untuk filter Review Data. Flag filter adalah key di
+    surat_izin_monthly, jadi dihitung dari rollup tanpa scan surat_izin.
+    """
+    conditions = _review_conditions(status, only_duplicate, only_warning)
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    with get_connection() as conn:
+        row = conn.execute(f"SELECT COALESCE(SUM(jumlah), 0) FROM surat_izin_monthly {where}").fetchone()
+    return row[0]
+
+
+def get_review_page(status: str = None, only_duplicate: bool = False, only_warning: bool = False,
+                    after: tuple[str, str] = None, page_size: int = 50) -> tuple[pd.DataFrame, tuple | None]:
+    """
+    Satu halaman Review Data, urut upload_date terbaru, dengan keyset pagination.
+
+    `after` adalah (upload_date, surat_id) baris terakhir halaman sebelumnya.
+    Return (DataFrame kolom REVIEW_COLUMNS, cursor halaman berikutnya atau None).
+    """
+    conditions = _review_conditions(status, only_duplicate, only_warning)
+    params = []
+    if after is not None:
+        conditions.append("(upload_date, surat_id) < (?, ?)")
+        params += list(after)
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+    with get_connection() as conn:
+        df = pd.read_sql_query(f'''
+        SELECT {", ".join(REVIEW_COLUMNS)}
+        FROM surat_izin {where}
+        ORDER BY upload_date DESC, surat_id DESC
+        LIMIT ?
+        ''', conn, params=params + [page_size + 1])
+
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        last = df.iloc[-1]
+        return df, (last['upload_date'], last['surat_id'])
+    return df, None
+
+
+# Export (payroll dll.): semua kolom surat_izin, raw_text hanya jika diminta
+EXPORT_BATCH_SIZE = 5000
+
+
+def export_columns(include_raw_text: bool = False) -> tuple[str, ...]:
+    """Urutan kolom tuple dari iter_review_export"""
+    return SURAT_IZIN_COLUMNS + (('raw_text',) if include_raw_text else ())
+
+
+def iter_review_export(status: str = None, only_duplicate: bool = False, only_warning: bool = False,
+                       start: str = None, end: str = None, include_raw_text: bool = False,
+                       batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Semua surat untuk filter Review Data (+ periode tanggal_izin [start, end)),
+    urutan sama dengan get_review_page. Yield list tuple (kolom export_columns)
+    per batch_size baris lewat fetchmany, tanpa membentuk DataFrame; satu
+    snapshot baca selama generator berjalan.
+    """
+    conditions = _review_conditions(status, only_duplicate, only_warning)
+    params = []
+    if start:
+        conditions.append("tanggal_izin >= ?")
+        params.append(start)
+    if end:
+        conditions.append("tanggal_izin < ?")
+        params.append(end)
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    columns = ", ".join(f"s.{column}" for column in SURAT_IZIN_COLUMNS)
+
+    with get_connection() as conn:
+        if include_raw_text:
+            cursor = conn.execute(f'''
+            SELECT {columns}, r.raw_text_z
+            FROM surat_izin s LEFT JOIN surat_izin_raw r ON r.surat_id = s.surat_id
+            {where}
+            ORDER BY s.upload_date DESC, s.surat_id DESC
+            ''', params)
+        else:
+            cursor = conn.execute(f'''
+            SELECT {columns} FROM surat_izin s {where}
+            ORDER BY s.upload_date DESC, s.surat_id DESC
+            ''', params)
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if include_raw_text:
+                rows = [(*row[:-1], decompress_text(row[-1]) if row[-1] is not None else None) for row in rows]
+            yield rows
+
+
+# ==================== DUPLICATE DETECTION ====================
+
+def find_duplicate_candidates(new_data: dict, top_k: int = 5) -> list[dict]:
+    """
+    Ambil record yang berpotensi duplikat, diurutkan berdasarkan score.
+
+    Score >= 80 hanya mungkin jika NIK (50) dan tanggal izin (30) sama,
+    jadi hanya baris dengan (nik, tanggal_izin) yang sama yang diambil
+    lewat index idx_surat_izin_dedup. Diagnosa menentukan 80 vs 100.
+    NIK yang beda 1-2 digit dengan nama mirip (find_identity_matches)
+    dihitung sebagai NIK sama.
+    """
+    nik = new_data.get('nik')
+    tanggal_izin = new_data.get('tanggal_izin')
+    if not nik or not tanggal_izin:
+        return []
+
+    diagnosa = new_data.get('diagnosa') or None
+    niks = {nik} | {match['nik'] for match in find_identity_matches(nik, new_data.get('nama'))}
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+
+        cursor.execute(f'''
+        SELECT surat_id, nik, nama, tanggal_izin, diagnosa,
+               ? + CASE WHEN diagnosa = ? THEN ? ELSE 0 END AS score
+        FROM surat_izin
+        WHERE nik IN ({", ".join("?" * len(niks))}) AND tanggal_izin = ?
+        ORDER BY score DESC, nik = ? DESC, upload_date DESC
+        LIMIT ?
+        ''', (
+            NIK_WEIGHT + TANGGAL_WEIGHT,
+            diagnosa, DIAGNOSA_WEIGHT,
+            *niks, tanggal_izin,
+            nik,
+            top_k
+        ))
+        candidates = [dict(row) for row in cursor.fetchall()]
+
+    return candidates
+
+
+def check_duplicate(new_data: dict) -> tuple[bool, float, str]:
+    """
+    Cek duplikasi dengan rule-based scoring
+
+    Kriteria bobot:
+    - NIK sama (atau mirip, lihat find_identity_matches): 50%
+    - Tanggal izin sama: 30%
+    - Diagnosa sama: 20%
+    """
+    candidates = find_duplicate_candidates(new_data)
+
+    if not candidates:
+        return False, 0.0, ""
+
+    highest_score = float(candidates[0]['score'])
+
+    same_nik = candidates[0]['nik'] == new_data['nik']
+    note_parts = ["NIK sama" if same_nik else f"NIK mirip ({candidates[0]['nik']})", "Tanggal sama"]
+    if highest_score >= NIK_WEIGHT + TANGGAL_WEIGHT + DIAGNOSA_WEIGHT:
+        note_parts.append("Diagnosa sama")
+
+    return True, highest_score, " & ".join(note_parts)
+
+
+def find_duplicate_keys(conn, rows: list[tuple]) -> dict[int, bool]:
+    """
+    Versi batch find_duplicate_candidates untuk import massal (hanya NIK persis sama).
+    rows: (surat_id, nik, tanggal_izin, diagnosa). Return {posisi di rows: diagnosa sama?}
+    untuk baris yang sudah punya surat lain dengan (nik, tanggal_izin) sama.
+    Satu query, lookup idx_surat_izin_dedup per baris.
+    """
+    if not rows:
+        return {}
+
+    cursor = conn.execute('''
+    SELECT j.key, MAX(s.diagnosa = json_extract(j.value, '$[3]'))
+    FROM json_each(?) j
+    JOIN surat_izin s
+      ON s.nik = json_extract(j.value, '$[1]')
+     AND s.tanggal_izin = json_extract(j.value, '$[2]')
+     AND s.surat_id != json_extract(j.value, '$[0]')
+    GROUP BY j.key
+    ''', (json.dumps(rows),))
+    return {key: bool(same) for key, same in cursor}
+
+
+# ==================== OVERLAP DETECTION ====================
+
+# Surat dianggap interval [tanggal_izin, tanggal_izin + durasi), durasi kosong/0 = 1 hari
+def _leave_days_expr(prefix: str = "") -> str:
+    return f"MAX(COALESCE({prefix}durasi, 1), 1)"
+
+
+def _leave_end_expr(prefix: str = "") -> str:
+    return f"date({prefix}tanggal_izin, '+' || {_leave_days_expr(prefix)} || ' days')"
+
+
+def _leave_days(durasi) -> int:
+    """Versi Python _leave_days_expr; durasi yang bukan angka (mis. hasil OCR "abc") = 1 hari"""
+    try:
+        return max(int(durasi or 1), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def find_overlapping_leaves(new_data: dict, limit: int = 10) -> list[dict]:
+    """
+    Surat dengan NIK sama yang rentang tanggalnya beririsan dengan surat baru.
+
+    Lookup memakai range scan (nik, tanggal_izin) di idx_surat_izin_dedup:
+    hanya surat yang mulai sebelum surat baru berakhir dan paling lama
+    durasi-maksimum-NIK-itu hari sebelum surat baru mulai yang dibaca.
+    """
+    nik = new_data.get('nik')
+    try:
+        start = datetime.strptime(new_data.get('tanggal_izin') or "", '%Y-%m-%d')
+    except ValueError:
+        return []
+    if not nik:
+        return []
+
+    end = start + timedelta(days=_leave_days(new_data.get('durasi')))
+    start, end = start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+
+        cursor.execute(f'''
+        SELECT surat_id, nik, nama, tanggal_izin, durasi, diagnosa,
+               date({_leave_end_expr()}, '-1 day') AS tanggal_selesai,
+               CAST(julianday(MIN({_leave_end_expr()}, :end)) - julianday(MAX(tanggal_izin, :start)) AS INTEGER) AS overlap_hari
+        FROM surat_izin
+        WHERE nik = :nik
+          AND tanggal_izin < :end
+          AND tanggal_izin >= date(:start, '-' || (
+              SELECT COALESCE(MAX({_leave_days_expr()}), 1) FROM surat_izin WHERE nik = :nik
+          ) || ' days')
+          AND {_leave_end_expr()} > :start
+        ORDER BY tanggal_izin
+        LIMIT :limit
+        ''', {'nik': nik, 'start': start, 'end': end, 'limit': limit})
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def find_overlapping_pairs() -> pd.DataFrame:
+    """
+    Semua pasangan surat dengan NIK sama yang rentang tanggalnya beririsan.
+
+    Setiap pasangan dilaporkan sekali: dari surat a ke surat b yang mulai di
+    dalam rentang a (tanggal mulai sama → urut rowid), sehingga join cukup
+    range scan idx_surat_izin_dedup per surat.
+    """
+    with get_connection() as conn:
+        return pd.read_sql_query(f'''
+        SELECT a.nik, a.nama,
+               a.surat_id AS surat_id_a, a.tanggal_izin AS tanggal_a, a.durasi AS durasi_a,
+               b.surat_id AS surat_id_b, b.tanggal_izin AS tanggal_b, b.durasi AS durasi_b,
+               CAST(julianday(MIN({_leave_end_expr('a.')}, {_leave_end_expr('b.')}))
+                    - julianday(b.tanggal_izin) AS INTEGER) AS overlap_hari
+        FROM surat_izin a
+        JOIN surat_izin b
+          ON b.nik = a.nik
+         AND b.tanggal_izin >= a.tanggal_izin
+         AND b.tanggal_izin < {_leave_end_expr('a.')}
+         AND (b.tanggal_izin > a.tanggal_izin OR b.rowid > a.rowid)
+        WHERE a.nik IS NOT NULL
+        ORDER BY a.nik, a.tanggal_izin, b.tanggal_izin
+        ''', conn)
+
+
+def find_first_overlaps(conn, rowids: list[int], earlier_only: bool = False) -> dict[int, tuple[str, int]]:
+    """
+    Untuk setiap surat tersimpan (rowid), surat lain dengan NIK sama yang
+    paling awal beririsan: {rowid: (surat_id, overlap_hari)}. Satu query untuk
+    semua rowid, range scan idx_surat_izin_dedup per surat seperti
+    find_overlapping_leaves. earlier_only: hanya surat yang disimpan lebih
+    dulu (seperti saat upload).
+    """
+    if not rowids:
+        return {}
+
+    rows = conn.execute(f'''
+    SELECT t.rowid, b.surat_id,
+           CAST(julianday(MIN({_leave_end_expr('b.')}, {_leave_end_expr('t.')}))
+                - julianday(MAX(b.tanggal_izin, t.tanggal_izin)) AS INTEGER) AS overlap_hari
+    FROM surat_izin t
+    JOIN surat_izin b
+      ON b.nik = t.nik
+     AND b.rowid {"<" if earlier_only else "!="} t.rowid
+     AND b.tanggal_izin < {_leave_end_expr('t.')}
+     AND b.tanggal_izin >= date(t.tanggal_izin, '-' || (
+         SELECT COALESCE(MAX({_leave_days_expr()}), 1) FROM surat_izin WHERE nik = t.nik
+     ) || ' days')
+     AND {_leave_end_expr('b.')} > t.tanggal_izin
+    WHERE t.rowid IN (SELECT value FROM json_each(?))
+    ORDER BY t.rowid, b.tanggal_izin, b.rowid
+    ''', (json.dumps(rowids),)).fetchall()
+
+    overlaps = {}
+    for rowid, surat_id, overlap_hari in rows:
+        overlaps.setdefault(rowid, (surat_id, overlap_hari))
+    return overlaps
+
+
+# ==================== FUZZY IDENTITY MATCHING ====================
+
+# Jumlah NIK per executemany saat sinkronisasi (memori tetap kecil setelah import besar)
+NIK_BLOCK_SYNC_BATCH = 20_000
+
+
+def _insert_nik_blocks(cursor, niks):
+    """Tambahkan key blocking untuk NIK (diurutkan dulu agar insert ke B-tree berurutan)"""
+    rows = sorted({(key, nik) for nik in niks for key in nik_block_keys(nik)})
+    cursor.executemany("INSERT OR IGNORE INTO nik_blocks (block, nik) VALUES (?, ?)", rows)
+
+
+def _sync_nik_blocks(conn):
+    """
+    Index NIK dari surat yang di-insert sejak sinkronisasi terakhir. Dipanggil
+    di sisi tulis (save_to_db, sync_nik_blocks sesudah import, init_db), tidak
+    saat pencarian. Jika tidak ada surat baru, cukup satu query tanpa lock tulis.
+    NIK yang diubah lewat UPDATE baru ter-index saat rebuild_identity_clusters.
+    """
+    check = "SELECT last_rowid, (SELECT COALESCE(MAX(rowid), 0) FROM surat_izin) FROM nik_blocks_sync WHERE id = 1"
+    last_rowid, max_rowid = conn.execute(check).fetchone()
+    if max_rowid <= last_rowid:
+        return
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    last_rowid, max_rowid = conn.execute(check).fetchone()
+
+    cursor = conn.execute(
+        "SELECT DISTINCT nik FROM surat_izin WHERE rowid > ? AND nik IS NOT NULL", (last_rowid,)
+    )
+    while True:
+        niks = [row[0] for row in cursor.fetchmany(NIK_BLOCK_SYNC_BATCH)]
+        if not niks:
+            break
+        _insert_nik_blocks(conn.cursor(), niks)
+    conn.execute("UPDATE nik_blocks_sync SET last_rowid = ? WHERE id = 1", (max_rowid,))
+
+
+def sync_nik_blocks():
+    """Sinkronkan nik_blocks (dipanggil setelah import massal agar upload berikutnya tetap cepat)"""
+    with get_connection() as conn:
+        _sync_nik_blocks(conn)
+
+
+def _nik_profiles(cursor, niks=None) -> dict[str, tuple[str, int]]:
+    """
+    {nik: (nama dari surat terbaru, jumlah surat)} untuk NIK yang masih punya
+    surat; niks=None berarti semua NIK.
+    """
+    # SQLite: kolom bare (nama) diambil dari baris yang memenuhi MAX(upload_date)
+    query = "SELECT nik, nama, COUNT(*), MAX(upload_date) FROM surat_izin WHERE {} GROUP BY nik"
+    if niks is None:
+        cursor.execute(query.format("nik IS NOT NULL"))
+        return {nik: (nama, jumlah) for nik, nama, jumlah, _ in cursor.fetchall()}
+
+    niks = list(niks)
+    profiles = {}
+    # Batas jumlah parameter SQLite
+    for i in range(0, len(niks), 500):
+        chunk = niks[i:i + 500]
+        cursor.execute(query.format(f"nik IN ({', '.join('?' * len(chunk))})"), chunk)
+        profiles.update({nik: (nama, jumlah) for nik, nama, jumlah, _ in cursor.fetchall()})
+    return profiles
+
+
+def find_identity_matches(nik: str, nama: str = None,
+                          max_distance: int = NIK_MAX_DISTANCE,
+                          min_name_similarity: float = NAME_MIN_SIMILARITY) -> list[dict]:
+    """
+    NIK tersimpan yang kemungkinan orang yang sama dengan (nik, nama),
+    termasuk NIK itu sendiri jika sudah ada. Kandidat hanya diambil dari
+    nik_blocks yang key-nya sama, lalu diverifikasi dengan edit distance.
+    Hanya membaca: nik_blocks sudah diisi saat surat disimpan.
+    """
+    if not nik:
+        return []
+
+    keys = nik_probe_keys(nik, max_distance)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        candidates = {nik}
+        if keys:
+            cursor.execute(
+                f"SELECT DISTINCT nik FROM nik_blocks WHERE block IN ({', '.join('?' * len(keys))})", keys
+            )
+            candidates.update(row[0] for row in cursor.fetchall())
+        profiles = _nik_profiles(cursor, candidates)
+
+    matches = []
+    for candidate, (candidate_nama, jumlah) in profiles.items():
+        is_match, distance, similarity = match_identity(
+            nik, nama, candidate, candidate_nama, max_distance, min_name_similarity
+        )
+        if is_match:
+            matches.append({
+                'nik': candidate,
+                'nama': candidate_nama,
+                'jumlah': jumlah,
+                'nik_distance': distance,
+                'name_similarity': round(similarity, 3),
+            })
+
+    return sorted(matches, key=lambda match: (match['nik_distance'], -match['jumlah'], match['nik']))
+
+
+def rebuild_identity_clusters(max_distance: int = NIK_MAX_DISTANCE,
+                              min_name_similarity: float = NAME_MIN_SIMILARITY) -> dict:
+    """
+    Batch job: bangun ulang nik_blocks, cluster semua NIK yang kemungkinan
+    orang yang sama lalu simpan ke identity_clusters.
+
+    Pasangan kandidat = NIK yang berbagi key di nik_blocks (self-join di
+    SQLite, menangkap salah baca digit). NIK yang panjangnya bukan 16 digit
+    (digit hilang/tersisip) juga dicari dengan key bergeser.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM nik_blocks")
+        cursor.execute("UPDATE nik_blocks_sync SET last_rowid = 0 WHERE id = 1")
+        _sync_nik_blocks(conn)
+
+        profiles = _nik_profiles(cursor)
+
+        pairs = set(cursor.execute('''
+        SELECT DISTINCT a.nik, b.nik
+        FROM nik_blocks a
+        JOIN nik_blocks b ON b.block = a.block AND b.nik > a.nik
+        ''').fetchall())
+
+        for nik in profiles:
+            if len(normalize_nik(nik)) == NIK_LENGTH:
+                continue
+            keys = nik_probe_keys(nik, max_distance)
+            cursor.execute(f"SELECT DISTINCT nik FROM nik_blocks WHERE block IN ({', '.join('?' * len(keys))})", keys)
+            pairs.update(tuple(sorted((nik, row[0]))) for row in cursor.fetchall() if row[0] != nik)
+
+        edges = []
+        for nik_a, nik_b in pairs:
+            if nik_a not in profiles or nik_b not in profiles:
+                continue
+            is_match, _, _ = match_identity(
+                nik_a, profiles[nik_a][0], nik_b, profiles[nik_b][0], max_distance, min_name_similarity
+            )
+            if is_match:
+                edges.append((nik_a, nik_b))
+
+        mapping = cluster_identities(edges, {nik: jumlah for nik, (_, jumlah) in profiles.items()})
+
+        # Jarak & kemiripan setiap NIK ke NIK kanonik cluster-nya (lewat rantai
+        # pasangan bisa lebih dari max_distance)
+        cursor.execute("DELETE FROM identity_clusters")
+        cursor.executemany(
+            "INSERT INTO identity_clusters (nik, cluster_nik, nik_distance, name_similarity) VALUES (?, ?, ?, ?)",
+            [(nik, canonical, levenshtein(normalize_nik(nik), normalize_nik(canonical)),
+              round(name_similarity(profiles[nik][0], profiles[canonical][0]), 3))
+             for nik, canonical in mapping.items()]
+        )
+
+    return {
+        'niks': len(profiles),
+        'compared': len(pairs),
+        'clusters': len(set(mapping.values())),
+        'merged_niks': len(mapping) - len(set(mapping.values())),
+    }
+
+
+def get_identity_clusters() -> pd.DataFrame:
+    """Isi identity_clusters beserta nama & jumlah surat per NIK"""
+    with get_connection() as conn:
+        return pd.read_sql_query('''
+        SELECT c.cluster_nik, c.nik, s.nama, COUNT(s.surat_id) AS jumlah,
+               c.nik_distance, c.name_similarity
+        FROM identity_clusters c
+        LEFT JOIN surat_izin s ON s.nik = c.nik
+        GROUP BY c.nik
+        ORDER BY c.cluster_nik, c.nik = c.cluster_nik DESC, c.nik
+        ''', conn)
+
+
+def save_to_db(record: dict):
+    """Simpan record ke database (raw_text ke surat_izin_raw, terkompresi)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(f'''
+        INSERT INTO surat_izin ({", ".join(SURAT_IZIN_COLUMNS)})
+        VALUES ({", ".join("?" * len(SURAT_IZIN_COLUMNS))})
+        ''', tuple(record.get(column) for column in SURAT_IZIN_COLUMNS))
+
+        if record.get('raw_text'):
+            cursor.execute(
+                "INSERT OR REPLACE INTO surat_izin_raw (surat_id, raw_text_z) VALUES (?, ?)",
+                (record['surat_id'], compress_text(record['raw_text']))
+            )
+
+        _sync_nik_blocks(conn)
+
+
+def insert_surat_batch(conn, records: list[tuple]) -> int:
+    """
+    Insert banyak surat sekaligus (tuple urut SURAT_IZIN_COLUMNS, tanpa raw_text)
+    dengan executemany di transaksi milik pemanggil. Return jumlah baris.
+
+    Trigger rollup insert dijeda lewat surat_izin_monthly_paused (tanpa DDL,
+    jadi prepared statement di koneksi pool lain tetap valid); surat_izin_monthly
+    di-update sekali per key dari baris baru (rowid > rowid terakhir sebelum
+    insert), lalu jeda dilepas di transaksi yang sama. Pemanggil menjalankan
+    sync_nik_blocks setelah batch terakhir.
+    """
+    if not records:
+        return 0
+
+    last_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM surat_izin").fetchone()[0]
+    conn.execute("INSERT INTO surat_izin_monthly_paused VALUES (1)")
+    conn.executemany(f'''
+    INSERT INTO surat_izin ({", ".join(SURAT_IZIN_COLUMNS)})
+    VALUES ({", ".join("?" * len(SURAT_IZIN_COLUMNS))})
+    ''', records)
+    conn.execute(f'''
+    INSERT INTO surat_izin_monthly ({ROLLUP_KEYS}, jumlah, total_durasi)
+    SELECT {", ".join(_rollup_key_exprs())}, COUNT(*), COALESCE(SUM(durasi), 0)
+    FROM surat_izin
+    WHERE rowid > ?
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+    ON CONFLICT ({ROLLUP_KEYS}) DO UPDATE SET
+        jumlah = jumlah + excluded.jumlah,
+        total_durasi = total_durasi + excluded.total_durasi
+    ''', (last_rowid,))
+    conn.execute("DELETE FROM surat_izin_monthly_paused")
+    return len(records)
+
+
+def find_existing_surat_ids(conn, surat_ids: list[str]) -> set[str]:
+    """surat_id yang sudah ada di database (untuk melanjutkan import yang terhenti)"""
+    cursor = conn.execute(
+        "SELECT surat_id FROM surat_izin WHERE surat_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(surat_ids),)
+    )
+    return {row[0] for row in cursor}
+
+
+def get_rowids(conn, surat_ids: list[str]) -> dict[str, int]:
+    """{surat_id: rowid} untuk surat yang tersimpan"""
+    cursor = conn.execute(
+        "SELECT surat_id, rowid FROM surat_izin WHERE surat_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(surat_ids),)
+    )
+    return dict(cursor.fetchall())
+
+
+# ==================== RAW TEXT STORAGE ====================
+#
+# raw_text hanya dibutuhkan saat membuka satu surat, jadi disimpan terpisah
+# di surat_izin_raw (zlib) agar query lain tidak ikut membaca kolom besar ini.
+
+RAW_TEXT_COMPRESSION_LEVEL = 6
+RAW_TEXT_MIGRATION_BATCH = 5000
+
+# Output Gemini pendek (~150-500 byte) sehingga zlib biasa hampir tidak
+# menghemat. Preset dictionary berisi label field & kosakata yang sering
+# muncul membuat ukurannya kira-kira separuh. Byte pertama blob = versi
+# format; jangan ubah isi dictionary tanpa menambah versi baru.
+RAW_TEXT_FORMAT_ZDICT_V1 = b"\x01"
+RAW_TEXT_ZDICT_V1 = (
+    "Januari Februari Maret April Mei Juni Juli Agustus September Oktober November Desember "
+    "January February March May June July August October December "
+    "TIDAK_DITEMUKAN DEMAM BERDARAH TIPES DIARE ASMA HIPERTENSI DIABETES PILEK BATUK SAKIT KEPALA "
+    "Klinik Puskesmas RSUD RS dr. Sp.PD Sp.A hari\n"
+    "NIK: \nNama: \nTanggal Izin: \nDurasi: \nDiagnosa: \nDokter: dr. \nRumah Sakit: "
+).encode("utf-8")
+
+
+def compress_text(text: str) -> bytes:
+    """Kompres raw_text: raw deflate dengan preset dictionary, diawali byte versi"""
+    compressor = zlib.compressobj(RAW_TEXT_COMPRESSION_LEVEL, zlib.DEFLATED, -15, zdict=RAW_TEXT_ZDICT_V1)
+    return RAW_TEXT_FORMAT_ZDICT_V1 + compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def decompress_text(blob: bytes) -> str:
+    if blob[:1] != RAW_TEXT_FORMAT_ZDICT_V1:
+        raise ValueError(f"Format raw_text tidak dikenal: {blob[:1]!r}")
+    decompressor = zlib.decompressobj(-15, zdict=RAW_TEXT_ZDICT_V1)
+    return (decompressor.decompress(blob[1:]) + decompressor.flush()).decode("utf-8")
+
+
+def _migrate_raw_text(conn: sqlite3.Connection) -> int:
+    """
+    Pindahkan kolom raw_text lama di surat_izin ke surat_izin_raw (terkompresi),
+    lalu drop kolomnya. Return jumlah baris yang dipindahkan (0 jika sudah migrasi).
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(surat_izin)")]
+    if 'raw_text' not in columns:
+        return 0
+
+    moved = 0
+    rows = conn.execute("SELECT surat_id, raw_text FROM surat_izin WHERE raw_text IS NOT NULL")
+    while True:
+        batch = rows.fetchmany(RAW_TEXT_MIGRATION_BATCH)
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT OR REPLACE INTO surat_izin_raw (surat_id, raw_text_z) VALUES (?, ?)",
+            [(surat_id, compress_text(raw_text)) for surat_id, raw_text in batch]
+        )
+        moved += len(batch)
+
+    try:
+        conn.execute("ALTER TABLE surat_izin DROP COLUMN raw_text")
+    except sqlite3.OperationalError:
+        # SQLite < 3.35 belum punya DROP COLUMN: kosongkan saja isinya
+        conn.execute("UPDATE surat_izin SET raw_text = NULL")
+    return moved
+
+
+def get_raw_text(surat_id: str) -> str | None:
+    """Ambil raw_text satu surat (didekompresi), None jika tidak ada"""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT raw_text_z FROM surat_izin_raw WHERE surat_id = ?", (surat_id,)
+        ).fetchone()
+    return decompress_text(row[0]) if row else None
+
+
+# ==================== DISEASE MASTER ====================
+#
+# Master penyakit disimpan di tabel disease_master dan bisa diubah dari
+# halaman Konfigurasi. Setiap perubahan menaikkan disease_master_version
+# (lewat trigger), yang dipakai llm_client untuk tahu kapan snapshot
+# in-memory harus dimuat ulang.
+
+DISEASE_CATEGORIES = ('RINGAN', 'SEDANG', 'BERAT')
+
+# Isi awal tabel disease_master untuk database baru
+DEFAULT_DISEASE_MASTER = {
+    'DEMAM': {'reimburseable': False, 'kategori': 'RINGAN', 'reimburseable_male': False,
+              'reimburseable_female': False, 'catatan': 'Penyakit ringan, tidak direimburse'},
+    'PILEK': {'reimburseable': False, 'kategori': 'RINGAN', 'reimburseable_male': False,
+              'reimburseable_female': False, 'catatan': 'Penyakit ringan, tidak direimburse'},
+    'BATUK': {'reimburseable': False, 'kategori': 'RINGAN', 'reimburseable_male': False,
+              'reimburseable_female': False, 'catatan': 'Penyakit ringan, tidak direimburse'},
+    'SAKIT KEPALA': {'reimburseable': False, 'kategori': 'RINGAN', 'reimburseable_male': False,
+                     'reimburseable_female': False, 'catatan': 'Penyakit ringan, tidak direimburse'},
+    'TIPES': {'reimburseable': True, 'kategori': 'SEDANG', 'reimburseable_male': True,
+              'reimburseable_female': True, 'catatan': 'Penyakit menular, bisa direimburse semua gender'},
+    'DBD': {'reimburseable': True, 'kategori': 'BERAT', 'reimburseable_male': True,
+            'reimburseable_female': True, 'catatan': 'Penyakit berat, bisa direimburse semua gender'},
+    'DIARE': {'reimburseable': True, 'kategori': 'SEDANG', 'reimburseable_male': True,
+              'reimburseable_female': True, 'catatan': 'Penyakit menular, bisa direimburse semua gender'},
+    'ASMA': {'reimburseable': True, 'kategori': 'SEDANG', 'reimburseable_male': True,
+             'reimburseable_female': True, 'catatan': 'Penyakit kronis, bisa direimburse semua gender'},
+    'HIPERTENSI': {'reimburseable': True, 'kategori': 'SEDANG', 'reimburseable_male': True,
+                   'reimburseable_female': True, 'catatan': 'Penyakit kronis, bisa direimburse semua gender'},
+    'DIABETES': {'reimburseable': True, 'kategori': 'BERAT', 'reimburseable_male': True,
+                 'reimburseable_female': True, 'catatan': 'Penyakit kronis berat, bisa direimburse semua gender'},
+}
+
+DISEASE_MASTER_FIELDS = ('reimburseable', 'kategori', 'reimburseable_male', 'reimburseable_female', 'catatan')
+
+
+def _disease_master_statements() -> list[str]:
+    """CREATE TABLE & trigger versi untuk disease_master"""
+    statements = [
+        '''
+        CREATE TABLE IF NOT EXISTS disease_master (
+            diagnosa TEXT PRIMARY KEY,
+            reimburseable BOOLEAN NOT NULL,
+            kategori TEXT NOT NULL,
+            reimburseable_male BOOLEAN NOT NULL,
+            reimburseable_female BOOLEAN NOT NULL,
+            catatan TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS disease_master_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        ''',
+    ]
+    # Log diagnosa yang berubah per versi, untuk klasifikasi ulang (reclassify.py)
+    statements.append('''
+        CREATE TABLE IF NOT EXISTS disease_master_changes (
+            diagnosa TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (diagnosa, version)
+        ) WITHOUT ROWID
+        ''')
+
+    log = "INSERT INTO disease_master_changes SELECT {}.diagnosa, version FROM disease_master_version WHERE id = 1"
+    changes = {
+        'INSERT': f"{log.format('NEW')};",
+        # Diagnosa lama ikut dicatat jika baris di-rename
+        'UPDATE': f"{log.format('NEW')}; {log.format('OLD')} AND OLD.diagnosa IS NOT NEW.diagnosa;",
+        'DELETE': f"{log.format('OLD')};",
+    }
+    for event, statement in changes.items():
+        # Trigger versi lama belum mencatat disease_master_changes
+        statements.append(f"DROP TRIGGER IF EXISTS trg_disease_master_{event.lower()}")
+        statements.append(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_disease_master_version_{event.lower()} AFTER {event} ON disease_master
+        BEGIN
+            UPDATE disease_master_version SET version = version + 1 WHERE id = 1;
+            {statement}
+        END
+        ''')
+    return statements
+
+
+def _upsert_diseases(cursor, diseases: dict):
+    """INSERT/UPDATE penyakit; baris yang isinya sama tidak di-update (versi tidak naik)"""
+    assignments = ", ".join(f"{field} = excluded.{field}" for field in DISEASE_MASTER_FIELDS)
+    changed = " OR ".join(f"{field} IS NOT excluded.{field}" for field in DISEASE_MASTER_FIELDS)
+    cursor.executemany(f'''
+    INSERT INTO disease_master (diagnosa, {", ".join(DISEASE_MASTER_FIELDS)})
+    VALUES (?, {", ".join("?" * len(DISEASE_MASTER_FIELDS))})
+    ON CONFLICT (diagnosa) DO UPDATE SET {assignments}
+    WHERE {changed}
+    ''', [
+        (name, *(info[field] for field in DISEASE_MASTER_FIELDS))
+        for name, info in diseases.items()
+    ])
+
+
+def get_disease_master_version() -> int:
+    """Versi disease_master saat ini (satu lookup primary key)"""
+    with get_connection() as conn:
+        row = conn.execute("SELECT version FROM disease_master_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def load_disease_master() -> tuple[int, dict]:
+    """Baca (versi, {diagnosa: info}) dari satu snapshot transaksi yang sama"""
+    with get_connection() as conn:
+        conn.execute("BEGIN")
+        row = conn.execute("SELECT version FROM disease_master_version WHERE id = 1").fetchone()
+        rows = conn.execute(
+            f"SELECT diagnosa, {', '.join(DISEASE_MASTER_FIELDS)} FROM disease_master ORDER BY diagnosa"
+        ).fetchall()
+
+    diseases = {}
+    for name, reimburseable, kategori, male, female, catatan in rows:
+        diseases[name] = {
+            'reimburseable': bool(reimburseable),
+            'kategori': kategori,
+            'reimburseable_male': bool(male),
+            'reimburseable_female': bool(female),
+            'catatan': catatan or '',
+        }
+    return (row[0] if row else 0), diseases
+
+
+def save_disease_master(diseases: dict) -> int:
+    """
+    Ganti seluruh isi disease_master dengan `diseases` ({diagnosa: info}).
+    Hanya baris yang berubah yang ditulis. Raise ValueError jika data tidak
+    valid. Return versi baru.
+    """
+    cleaned = {}
+    for name, info in diseases.items():
+        name = (name or "").upper().strip()
+        if not name:
+            raise ValueError("Nama penyakit tidak boleh kosong")
+        if name in cleaned:
+            raise ValueError(f"Penyakit {name} tercantum lebih dari sekali")
+        if info.get('kategori') not in DISEASE_CATEGORIES:
+            raise ValueError(f"Kategori {name} harus salah satu dari {', '.join(DISEASE_CATEGORIES)}")
+        cleaned[name] = {
+            'reimburseable': bool(info.get('reimburseable')),
+            'kategori': info['kategori'],
+            'reimburseable_male': bool(info.get('reimburseable_male')),
+            'reimburseable_female': bool(info.get('reimburseable_female')),
+            'catatan': (info.get('catatan') or '').strip(),
+        }
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+
+        existing = [row[0] for row in cursor.execute("SELECT diagnosa FROM disease_master")]
+        cursor.executemany(
+            "DELETE FROM disease_master WHERE diagnosa = ?",
+            [(name,) for name in existing if name not in cleaned]
+        )
+        _upsert_diseases(cursor, cleaned)
+
+        return cursor.execute("SELECT version FROM disease_master_version WHERE id = 1").fetchone()[0]
+
+
+# ==================== RECLASSIFICATION ====================
+#
+# Surat perlu diklasifikasi ulang jika belum punya master_version, atau jika
+# diagnosanya berubah di disease_master sesudah versi yang dipakai surat itu.
+# Versi yang lebih tua dari awal log perubahan (database dari sebelum log ada)
+# selalu dianggap perlu diklasifikasi ulang.
+
+RECLASSIFY_COLUMNS = (
+    'surat_id', 'nik', 'tanggal_izin', 'durasi', 'diagnosa', 'is_reimburseable', 'kategori',
+    'is_duplicate', 'duplicate_score', 'warning_flag', 'warning_reason', 'master_version'
+)
+
+
+def _stale_clause() -> str:
+    return '''
+    (master_version IS NULL
+     OR master_version < :log_start
+     OR (master_version < :version AND EXISTS (
+         SELECT 1 FROM disease_master_changes c
+         WHERE c.diagnosa = surat_izin.diagnosa AND c.version > surat_izin.master_version AND c.version <= :version
+     )))
+    '''
+
+
+def _change_log_start(conn) -> int:
+    """Versi tertua yang perubahannya masih bisa dilacak dari disease_master_changes"""
+    row = conn.execute("SELECT MIN(version) FROM disease_master_changes").fetchone()
+    return (row[0] - 1) if row[0] is not None else conn.execute(
+        "SELECT version FROM disease_master_version WHERE id = 1"
+    ).fetchone()[0]
+
+
+def count_stale_classifications(version: int) -> int:
+    """Jumlah surat yang klasifikasinya perlu dihitung ulang untuk master versi `version`"""
+    with get_connection() as conn:
+        params = {'version': version, 'log_start': _change_log_start(conn)}
+        return conn.execute(f"SELECT COUNT(*) FROM surat_izin WHERE {_stale_clause()}", params).fetchone()[0]
+
+
+def read_stale_classifications(conn, version: int, after_rowid: int = 0, limit: int = 5000) -> pd.DataFrame:
+    """
+    Chunk berikutnya (urut rowid, sesudah after_rowid) dari surat yang perlu
+    diklasifikasi ulang. Dipanggil di dalam transaksi tulis yang sama dengan
+    write_classifications agar chunk tidak berubah di antara baca & tulis.
+    """
+    params = {'version': version, 'log_start': _change_log_start(conn), 'after': after_rowid, 'limit': limit}
+    return pd.read_sql_query(f'''
+    SELECT rowid, {", ".join(RECLASSIFY_COLUMNS)}
+    FROM surat_izin
+    WHERE rowid > :after AND {_stale_clause()}
+    ORDER BY rowid
+    LIMIT :limit
+    ''', conn, params=params)
+
+
+def write_classifications(conn, version: int, updates: list[tuple], unchanged_rowids: list[int]):
+    """
+    Tulis hasil klasifikasi ulang dengan executemany.
+    updates: (is_reimburseable, kategori, warning_flag, warning_reason, rowid).
+    Surat yang hasilnya tidak berubah hanya dicap master_version, agar
+    trigger rollup tidak ikut jalan.
+    """
+    conn.executemany(
+        '''UPDATE surat_izin
+        SET is_reimburseable = ?, kategori = ?, warning_flag = ?, warning_reason = ?, master_version = ?
+        WHERE rowid = ?''',
+        [(*values[:4], version, values[4]) for values in updates]
+    )
+    conn.executemany(
+        "UPDATE surat_izin SET master_version = ? WHERE rowid = ?",
+        [(version, rowid) for rowid in unchanged_rowids]
+    )
+
+
+# ==================== EXTRACTION CACHE ====================
+
+def get_cached_extraction(cache_key: str) -> str | None:
+    """Ambil raw_text dari extraction cache, None jika belum ada"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT raw_text FROM extraction_cache WHERE cache_key = ?", (cache_key,))
+        row = cursor.fetchone()
+
+        if row is not None:
+            cursor.execute(
+                "UPDATE extraction_cache SET last_used = ? WHERE cache_key = ?",
+                (datetime.now().isoformat(), cache_key)
+            )
+
+    return row[0] if row else None
+
+
+def save_extraction_cache(cache_key: str, raw_text: str):
+    """Simpan hasil ekstraksi ke cache lalu jalankan eviction"""
+    now = datetime.now().isoformat()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        INSERT OR REPLACE INTO extraction_cache VALUES (?, ?, ?, ?, ?)
+        ''', (cache_key, raw_text, len(raw_text.encode('utf-8')), now, now))
+
+    evict_extraction_cache()
+
+
+def evict_extraction_cache(max_age_days: int = EXTRACTION_CACHE_MAX_AGE_DAYS,
+                           max_bytes: int = EXTRACTION_CACHE_MAX_BYTES) -> int:
+    """
+    Hapus entry cache yang lebih tua dari max_age_days, lalu entry yang
+    paling lama tidak dipakai sampai total ukuran <= max_bytes.
+    Return jumlah entry yang dihapus.
+    """
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("DELETE FROM extraction_cache WHERE last_used < ?", (cutoff,))
+        deleted = cursor.rowcount
+
+        cursor.execute('''
+        DELETE FROM extraction_cache WHERE cache_key IN (
+            SELECT cache_key FROM (
+                SELECT cache_key,
+                       SUM(size_bytes) OVER (ORDER BY last_used DESC, cache_key) AS running_bytes
+                FROM extraction_cache
+            )
+            WHERE running_bytes > ?
+        )
+        ''', (max_bytes,))
+        deleted += cursor.rowcount
+
+    return deleted
+
+
+# ==================== PERFORMANCE METRICS ====================
+
+def save_perf_spans(spans: list[tuple]):
+    """
+    Simpan batch span (trace_id, kind, stage, label, started_at, duration_ms)
+    lalu hapus span yang lebih tua dari PERF_SPANS_MAX_AGE_DAYS
+    """
+    cutoff = (datetime.now() - timedelta(days=PERF_SPANS_MAX_AGE_DAYS)).isoformat()
+
+    with get_connection() as conn:
+        conn.executemany("INSERT INTO perf_spans VALUES (?, ?, ?, ?, ?, ?)", spans)
+        conn.execute("DELETE FROM perf_spans WHERE started_at < ?", (cutoff,))
+
+
+def get_perf_spans(since: str = None, kind: str = None) -> pd.DataFrame:
+    """Span sejak `since` (ISO datetime), started_at sebagai datetime"""
+    where, params = "", []
+    if since:
+        where = _and(where, "started_at >= ?")
+        params.append(since)
+    if kind:
+        where = _and(where, "kind = ?")
+        params.append(kind)
+
+    with get_connection() as conn:
+        spans = pd.read_sql_query(f'''
+        SELECT trace_id, kind, stage, label, started_at, duration_ms
+        FROM perf_spans {where}
+        ORDER BY started_at
+        ''', conn, params=params)
+
+    spans['started_at'] = pd.to_datetime(spans['started_at'], format='ISO8601')
+    return spans
+
+
+def _records_memory_mb() -> float:
+    """Memori DataFrame get_all_records() dalam MB"""
+    return get_all_records().memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def _storage_stats() -> dict:
+    """Ukuran file, byte raw_text tersimpan, dan ukuran per tabel (jika dbstat tersedia)"""
+    with get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(surat_izin)")]
+        if 'raw_text' in columns:
+            raw_bytes = conn.execute("SELECT SUM(length(CAST(raw_text AS BLOB))) FROM surat_izin").fetchone()[0]
+        else:
+            raw_bytes = conn.execute("SELECT SUM(length(raw_text_z)) FROM surat_izin_raw").fetchone()[0]
+        try:
+            tables = dict(conn.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('surat_izin', 'surat_izin_raw') GROUP BY name"
+            ).fetchall())
+        except sqlite3.OperationalError:
+            tables = {}
+
+    mb = 1024 * 1024
+    return {
+        'file': os.path.getsize(DB_PATH) / mb,
+        'raw_text': (raw_bytes or 0) / mb,
+        'surat_izin': tables.get('surat_izin', 0) / mb,
+        'surat_izin_raw': tables.get('surat_izin_raw', 0) / mb,
+        'dataframe': _records_memory_mb(),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintenance database surat izin")
+    parser.add_argument("command", choices=["rebuild-rollups", "migrate-raw-text", "overlaps", "cluster-identities"])
+    parser.add_argument("--db", default=DB_PATH, help="Path database SQLite")
+    parser.add_argument("--output", help="overlaps: simpan pasangan ke file CSV")
+    args = parser.parse_args()
+
+    DB_PATH = args.db
+
+    if args.command == "rebuild-rollups":
+        init_db()
+        rows = rebuild_monthly_rollup()
+        print(f"✅ Rollup bulanan dibangun ulang: {rows} baris")
+
+    elif args.command == "overlaps":
+        init_db()
+        pairs = find_overlapping_pairs()
+        if args.output:
+            pairs.to_csv(args.output, index=False)
+            print(f"✅ {len(pairs)} pasangan surat overlap disimpan ke {args.output}")
+        else:
+            if len(pairs):
+                print(pairs.to_string(index=False))
+                print(f"\n{len(pairs)} pasangan surat overlap, {pairs['nik'].nunique()} karyawan")
+            else:
+                print("✅ Tidak ada surat yang overlap")
+
+    elif args.command == "cluster-identities":
+        init_db()
+        stats = rebuild_identity_clusters()
+        print(f"✅ {stats['niks']} NIK, {stats['compared']} pasangan kandidat dibandingkan: "
+              f"{stats['clusters']} cluster, {stats['merged_niks']} NIK digabung")
+        clusters = get_identity_clusters()
+        if len(clusters):
+            print(clusters.to_string(index=False))
+
+    elif args.command == "migrate-raw-text":
+        before = _storage_stats()
+
+        init_db()  # menjalankan _migrate_raw_text
+        with get_connection() as conn:
+            conn.execute("VACUUM")
+
+        after = _storage_stats()
+        close_connections()
+
+        labels = {
+            'file': "Ukuran file database (MB)",
+            'raw_text': "raw_text tersimpan (MB)",
+            'surat_izin': "Tabel surat_izin (MB)",
+            'surat_izin_raw': "Tabel surat_izin_raw (MB)",
+            'dataframe': "DataFrame get_all_records (MB)",
+        }
+        print(f"{'':>31} {'sebelum':>10} {'sesudah':>10}")
+        for key, label in labels.items():
+            print(f"{label:>31} {before[key]:10.2f} {after[key]:10.2f}")
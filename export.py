@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Export surat izin (mis. untuk payroll) ke CSV / Excel (.xlsx) / Parquet
+
+Filter sama dengan halaman Review Data, ditambah periode tanggal izin.
+Baris di-stream dari cursor SQLite (iter_review_export) langsung ke writer
+per batch, tanpa membentuk DataFrame. raw_text tidak ikut kecuali
+--include-raw-text.
+
+Usage:
+    python export.py --status eligible --start 2026-01-01 --end 2026-02-01 -o payroll_januari.xlsx
+    python export.py --only-warning --format csv > perlu_review.csv
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+import database
+from database import export_columns, iter_review_export, REVIEW_STATUS_FILTERS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_SUPPORT = True
+except ImportError:
+    PARQUET_SUPPORT = False
+
+try:
+    import openpyxl
+    EXCEL_SUPPORT = True
+except ImportError:
+    EXCEL_SUPPORT = False
+
+# Format → (ekstensi, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Tipe kolom untuk Parquet/Excel (SQLite mengembalikan BOOLEAN sebagai 0/1)
+BOOLEAN_COLUMNS = ('is_reimburseable', 'is_duplicate', 'warning_flag')
+INTEGER_COLUMNS = ('durasi', 'master_version')
+FLOAT_COLUMNS = ('duplicate_score',)
+
+
+def _as_bool(value):
+    return None if value is None else bool(value)
+
+
+def _typed_rows(columns: tuple[str, ...], rows: list[tuple]) -> list[tuple]:
+    """0/1 di kolom boolean → True/False"""
+    positions = [columns.index(column) for column in BOOLEAN_COLUMNS]
+    typed = []
+    for row in rows:
+        row = list(row)
+        for position in positions:
+            row[position] = _as_bool(row[position])
+        typed.append(tuple(row))
+    return typed
+
+
+# ==================== WRITERS ====================
+
+def _write_csv(out, columns, batches) -> int:
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(columns)
+        count = 0
+        for rows in batches:
+            writer.writerows(rows)
+            count += len(rows)
+        text.flush()
+        return count
+    finally:
+        # Jangan ikut menutup `out` milik pemanggil
+        text.detach()
+
+
+def _parquet_schema(columns) -> "pa.Schema":
+    def field_type(column):
+        if column in BOOLEAN_COLUMNS:
+            return pa.bool_()
+        if column in INTEGER_COLUMNS:
+            return pa.int64()
+        if column in FLOAT_COLUMNS:
+            return pa.float64()
+        return pa.string()
+
+    return pa.schema([(column, field_type(column)) for column in columns])
+
+
+def _write_parquet(out, columns, batches) -> int:
+    if not PARQUET_SUPPORT:
+        raise RuntimeError("pyarrow tidak terinstall (pip install pyarrow)")
+    schema = _parquet_schema(columns)
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in batches:
+            values = list(zip(*_typed_rows(columns, rows)))
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(values, schema)], schema=schema
+            ))
+            count += len(rows)
+        if not count:
+            writer.write_table(schema.empty_table())
+    return count
+
+
+def _write_xlsx(out, columns, batches) -> int:
+    """Workbook write-only openpyxl: baris langsung ditulis ke file sementara, tidak disimpan di memori"""
+    if not EXCEL_SUPPORT:
+        raise RuntimeError("openpyxl tidak terinstall (pip install openpyxl)")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("surat_izin")
+    sheet.append(list(columns))
+    count = 0
+    for rows in batches:
+        for row in _typed_rows(columns, rows):
+            sheet.append(row)
+        count += len(rows)
+    workbook.save(out)
+    return count
+
+
+WRITERS = {'csv': _write_csv, 'xlsx': _write_xlsx, 'parquet': _write_parquet}
+
+
+def write_export(out, file_format: str, status: str = None, only_duplicate: bool = False,
+                 only_warning: bool = False, start: str = None, end: str = None,
+                 include_raw_text: bool = False) -> int:
+    """
+    Tulis export ke file biner `out` (file terbuka atau path untuk xlsx/parquet).
+    Return jumlah baris.
+    """
+    if file_format not in WRITERS:
+        raise ValueError(f"Format tidak didukung: {file_format} (pilih {', '.join(WRITERS)})")
+    batches = iter_review_export(status, only_duplicate, only_warning, start, end, include_raw_text)
+    try:
+        return WRITERS[file_format](out, export_columns(include_raw_text), batches)
+    finally:
+        batches.close()
+
+
+def export_bytes(file_format: str, **filters) -> bytes:
+    """
+    Isi file export sebagai bytes, untuk tombol download Streamlit (yang selalu
+    butuh file utuh). Baris di-stream ke file sementara dulu, jadi hanya hasil
+    akhir yang dibaca ke memori.
+    """
+    with tempfile.TemporaryFile() as out:
+        write_export(out, file_format, **filters)
+        out.seek(0)
+        return out.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export surat izin ke CSV/Excel/Parquet")
+    parser.add_argument("-o", "--output", help="File tujuan (default: stdout, format dari ekstensi)")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), help="Format export (default: dari ekstensi output, atau csv)")
+    parser.add_argument("--db", default=database.DB_PATH, help="Path database SQLite")
+    parser.add_argument("--status", choices=list(REVIEW_STATUS_FILTERS), help="Filter status seperti di Review Data")
+    parser.add_argument("--only-duplicate", action="store_true", help="Hanya surat duplikat")
+    parser.add_argument("--only-warning", action="store_true", help="Hanya surat dengan warning")
+    parser.add_argument("--start", help="Tanggal izin mulai (YYYY-MM-DD, inklusif)")
+    parser.add_argument("--end", help="Tanggal izin akhir (YYYY-MM-DD, eksklusif)")
+    parser.add_argument("--include-raw-text", action="store_true", help="Sertakan raw text OCR")
+    args = parser.parse_args()
+
+    file_format = args.format
+    if file_format is None:
+        extension = os.path.splitext(args.output or "")[1].lower()
+        file_format = next((name for name, (ext, _) in EXPORT_FORMATS.items() if ext == extension), 'csv')
+    if args.output is None and file_format != 'csv':
+        print("❌ Format xlsx/parquet butuh --output")
+        sys.exit(1)
+
+    database.DB_PATH = args.db
+    filters = dict(status=args.status, only_duplicate=args.only_duplicate, only_warning=args.only_warning,
+                   start=args.start, end=args.end, include_raw_text=args.include_raw_text)
+    start = time.perf_counter()
+
+    try:
+        if args.output:
+            with open(args.output, "wb") as out:
+                count = write_export(out, file_format, **filters)
+        else:
+            count = write_export(sys.stdout.buffer, file_format, **filters)
+    except RuntimeError as e:
+        if args.output:
+            os.remove(args.output)
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.output:
+        print(f"✅ {count:,} surat diekspor ke {args.output} dalam {time.perf_counter() - start:.1f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Server Gemini palsu untuk load test & reproduksi timeout tanpa memakai kuota
+
+Menerima request generateContent dengan bentuk yang sama seperti API asli
+(inlineData base64 + prompt, generationConfig.responseMimeType untuk mode
+"json") dan membalas dengan candidates[0].content.parts[0].text serta
+usageMetadata. Jawaban diambil dari fixture: file gambar di --fixtures yang
+punya pasangan .json (field hasil ekstraksi, mis. surat_01.jpg +
+surat_01.json). Gambar lain mendapat record sintetis yang deterministik
+dari hash gambarnya.
+
+Gangguan yang bisa diatur (FaultProfile):
+- latency: lognormal dengan median --latency-ms dan sebaran --latency-sigma
+- error: --error-rate request dibalas 500/503
+- 429 burst: selama --burst-duration detik di awal setiap --burst-period detik,
+  semua request dibalas 429 dengan Retry-After
+- slow drip: --drip-rate response dikirim per DRIP_CHUNK_BYTES byte dengan jeda
+  --drip-interval-ms (menguji read timeout)
+
+Statistik request tersedia di GET /stats.
+
+Usage:
+    python fake_gemini.py --port 8765
+    python fake_gemini.py --port 8765 --latency-ms 1500 --error-rate 0.05 --burst-period 30 --burst-duration 3
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta/models/fake-gemini:generateContent streamlit run app.py
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image, ImageDraw
+
+DEFAULT_PORT = 8765
+MODEL_NAME = "fake-gemini"
+DRIP_CHUNK_BYTES = 64
+IMAGE_TOKENS = 258  # token per gambar yang dilaporkan Gemini
+
+FIXTURE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+MONTHS_ID = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+             'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+
+FIRST_NAMES = ['Budi', 'Siti', 'Agus', 'Dewi', 'Rudi', 'Ani', 'Joko', 'Rina', 'Hendra', 'Wati']
+LAST_NAMES = ['Santoso', 'Wijaya', 'Pratama', 'Lestari', 'Saputra', 'Kusuma', 'Hidayat', 'Susanti']
+DIAGNOSES = ['Febris', 'Common Cold', 'Typhus', 'Demam Berdarah', 'Diare', 'Asma', 'Migrain', 'Gastritis']
+DOCTORS = ['dr. Andi Wijaya', 'dr. Maya Sari', 'dr. Bambang Hartono', 'dr. Citra Dewi']
+HOSPITALS = ['RS Sehat Sentosa', 'RS Medika', 'Klinik Pratama Sejahtera', 'RS Harapan Kita']
+
+ERROR_STATUS = {
+    400: "INVALID_ARGUMENT",
+    403: "PERMISSION_DENIED",
+    404: "NOT_FOUND",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+}
+
+
+class FaultProfile(NamedTuple):
+    """Latency & gangguan yang disuntikkan server"""
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.4
+    error_rate: float = 0.0
+    burst_period: float = 0.0
+    burst_duration: float = 0.0
+    drip_rate: float = 0.0
+    drip_interval_ms: float = 50.0
+
+
+# ==================== FIXTURES ====================
+
+def synthetic_record(seed: int) -> dict:
+    """Field hasil ekstraksi (format mode "json") yang deterministik untuk seed"""
+    rng = random.Random(seed)
+    return {
+        'nik': f"3175{rng.randrange(10 ** 12):012d}",
+        'nama': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'tanggal_izin': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        'durasi': rng.choice([1, 1, 2, 2, 3, 5]),
+        'diagnosa': rng.choice(DIAGNOSES),
+        'dokter': rng.choice(DOCTORS),
+        'rumah_sakit': rng.choice(HOSPITALS),
+    }
+
+
+def render_fixture(record: dict) -> Image.Image:
+    """Surat izin sintetis berisi field record"""
+    year, month, day = (int(part) for part in record['tanggal_izin'].split('-'))
+    lines = [
+        "SURAT KETERANGAN SAKIT",
+        "",
+        f"Nama      : {record['nama']}",
+        f"NIK       : {record['nik']}",
+        f"perlu beristirahat selama {record['durasi']} hari",
+        f"mulai tanggal {day} {MONTHS_ID[month - 1]} {year}",
+        f"Diagnosa  : {record['diagnosa']}",
+        "",
+        f"{record['dokter']} - {record['rumah_sakit']}",
+    ]
+    image = Image.new("RGB", (1240, 900), "white")
+    draw = ImageDraw.Draw(image)
+    for line, text in enumerate(lines):
+        draw.text((100, 100 + line * 50), text, fill="black")
+    return image
+
+
+def write_fixtures(directory: str, count: int, seed: int = 42) -> list[str]:
+    """Tulis `count` gambar fixture (JPEG) beserta .json-nya; return path gambar"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        record = synthetic_record(seed * 100_003 + i)
+        path = os.path.join(directory, f"surat_{i:03d}.jpg")
+        render_fixture(record).save(path, format="JPEG", quality=85)
+        with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        paths.append(path)
+    return paths
+
+
+def fixture_paths(directory: str) -> list[str]:
+    """Gambar di `directory` yang punya pasangan .json"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(FIXTURE_EXTENSIONS)
+        and os.path.exists(os.path.join(directory, os.path.splitext(name)[0] + ".json"))
+    )
+
+
+def load_fixture_record(image_path: str) -> dict:
+    with open(os.path.splitext(image_path)[0] + ".json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_fixtures(directory: str = None) -> dict[str, dict]:
+    """SHA-256 isi gambar → record, untuk semua fixture di `directory`"""
+    fixtures = {}
+    for path in fixture_paths(directory) if directory else []:
+        with open(path, "rb") as f:
+            fixtures[hashlib.sha256(f.read()).hexdigest()] = load_fixture_record(path)
+    return fixtures
+
+
+def extraction_text(record: dict, json_mode: bool) -> str:
+    """Jawaban model untuk record: JSON (mode "json") atau baris "Label: nilai" (mode "text")"""
+    if json_mode:
+        return json.dumps(record, ensure_ascii=False)
+    year, month, day = (int(part) for part in record['tanggal_izin'].split('-'))
+    return "\n".join([
+        f"NIK: {record['nik']}",
+        f"Nama: {record['nama']}",
+        f"Tanggal Izin: {day:02d} {MONTHS_ID[month - 1]} {year}",
+        f"Durasi: {record['durasi']} hari",
+        f"Diagnosa: {record['diagnosa']}",
+        f"Dokter: {record['dokter']}",
+        f"Rumah Sakit: {record['rumah_sakit']}",
+    ])
+
+
+# ==================== SERVER ====================
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    """HTTP server generateContent palsu; satu thread per koneksi (keep-alive)"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], profile: FaultProfile = FaultProfile(),
+                 fixtures: dict[str, dict] = None, seed: int = None, verbose: bool = False):
+        super().__init__(address, FakeGeminiHandler)
+        self.profile = profile
+        self.fixtures = fixtures or {}
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self.started = time.monotonic()
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """URL untuk GEMINI_BASE_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1beta/models/{MODEL_NAME}:generateContent"
+
+    def handle_error(self, request, client_address):
+        """Client yang memutus koneksi (mis. read timeout saat slow drip) bukan error server"""
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            self.count("client_disconnect")
+            return
+        super().handle_error(request, client_address)
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def burst_remaining(self) -> float:
+        """Sisa detik 429 burst yang sedang berjalan (0 jika tidak sedang burst)"""
+        profile = self.profile
+        if profile.burst_period <= 0 or profile.burst_duration <= 0:
+            return 0.0
+        into_period = (time.monotonic() - self.started) % profile.burst_period
+        return max(profile.burst_duration - into_period, 0.0)
+
+    def sample_latency(self) -> float:
+        """Latency (detik): lognormal dengan median latency_ms"""
+        profile = self.profile
+        if profile.latency_ms <= 0:
+            return 0.0
+        return profile.latency_ms * math.exp(self.rng.gauss(0, profile.latency_sigma)) / 1000
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeGeminiServer
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict, headers: dict = None, drip: bool = False):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if not drip:
+            self.wfile.write(data)
+            return
+        for start in range(0, len(data), DRIP_CHUNK_BYTES):
+            self.wfile.write(data[start:start + DRIP_CHUNK_BYTES])
+            self.wfile.flush()
+            time.sleep(self.server.profile.drip_interval_ms / 1000)
+
+    def _send_error(self, status: int, message: str, headers: dict = None):
+        self.server.count(str(status))
+        self._send_json(status, {
+            "error": {"code": status, "message": message, "status": ERROR_STATUS.get(status, "UNKNOWN")}
+        }, headers)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/stats":
+            self._send_error(404, f"Path tidak dikenal: {self.path}")
+            return
+        with self.server.stats_lock:
+            stats = dict(self.server.stats)
+        self._send_json(200, {'profile': self.server.profile._asdict(), 'counts': stats,
+                              'fixtures': len(self.server.fixtures)})
+
+    def do_POST(self):
+        server = self.server
+        profile = server.profile
+        server.count("requests")
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        url = urlsplit(self.path)
+        if not url.path.endswith(":generateContent"):
+            self._send_error(404, f"Method tidak dikenal: {url.path}")
+            return
+        if not parse_qs(url.query).get("key"):
+            self._send_error(403, "Method doesn't allow unregistered callers. Please use an API key.")
+            return
+
+        try:
+            payload = json.loads(body)
+            parts = payload["contents"][0]["parts"]
+            inline = next(part["inlineData"] for part in parts if "inlineData" in part)
+            image = base64.b64decode(inline["data"], validate=True)
+            prompt = " ".join(part.get("text", "") for part in parts)
+        except (ValueError, KeyError, IndexError, TypeError, StopIteration):
+            self._send_error(400, "Invalid JSON payload: contents[0].parts harus berisi inlineData base64")
+            return
+
+        remaining = server.burst_remaining()
+        if remaining > 0:
+            self._send_error(429, "Resource has been exhausted (e.g. check quota).",
+                             {"Retry-After": str(math.ceil(remaining))})
+            return
+        if server.rng.random() < profile.error_rate:
+            status = server.rng.choice([500, 503])
+            self._send_error(status, "The model is overloaded. Please try again later."
+                             if status == 503 else "An internal error has occurred.")
+            return
+
+        time.sleep(server.sample_latency())
+
+        digest = hashlib.sha256(image).hexdigest()
+        record = server.fixtures.get(digest)
+        server.count("fixture" if record is not None else "synthetic")
+        if record is None:
+            record = synthetic_record(int(digest[:12], 16))
+
+        json_mode = (payload.get("generationConfig") or {}).get("responseMimeType") == "application/json"
+        text = extraction_text(record, json_mode)
+
+        drip = server.rng.random() < profile.drip_rate
+        server.count("200")
+        if drip:
+            server.count("drip")
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": IMAGE_TOKENS + len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": IMAGE_TOKENS + len(prompt) // 4 + len(text) // 4,
+            },
+            "modelVersion": MODEL_NAME,
+        }, drip=drip)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, profile: FaultProfile = FaultProfile(),
+                 fixtures_dir: str = None, seed: int = None, verbose: bool = False) -> FakeGeminiServer:
+    """Jalankan server di thread background (port 0 = port bebas); hentikan dengan server.shutdown()"""
+    server = FakeGeminiServer((host, port), profile, load_fixtures(fixtures_dir), seed, verbose)
+    threading.Thread(target=server.serve_forever, name="fake-gemini", daemon=True).start()
+    return server
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    """Argumen FaultProfile (dipakai juga oleh bench_gemini_load.py)"""
+    defaults = FaultProfile()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Median latency response sukses")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma,
+                        help="Sebaran lognormal latency (0 = latency tetap)")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Peluang response 500/503")
+    parser.add_argument("--burst-period", type=float, default=defaults.burst_period,
+                        help="Periode 429 burst dalam detik (0 = tanpa burst)")
+    parser.add_argument("--burst-duration", type=float, default=defaults.burst_duration,
+                        help="Lama 429 burst di awal setiap periode (detik)")
+    parser.add_argument("--drip-rate", type=float, default=defaults.drip_rate, help="Peluang response slow-drip")
+    parser.add_argument("--drip-interval-ms", type=float, default=defaults.drip_interval_ms,
+                        help=f"Jeda antar {DRIP_CHUNK_BYTES} byte response slow-drip")
+    parser.add_argument("--fixtures", help="Folder gambar fixture + .json hasil ekstraksinya")
+    parser.add_argument("--seed", type=int, help="Seed gangguan acak")
+
+
+def profile_from_args(args: argparse.Namespace) -> FaultProfile:
+    return FaultProfile(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        burst_period=args.burst_period,
+        burst_duration=args.burst_duration,
+        drip_rate=args.drip_rate,
+        drip_interval_ms=args.drip_interval_ms,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server Gemini palsu untuk load & latency test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--verbose", action="store_true", help="Log setiap request")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer((args.host, args.port), profile_from_args(args), load_fixtures(args.fixtures),
+                              args.seed, args.verbose)
+    print(f"✅ Fake Gemini ({len(server.fixtures)} fixture) di {server.url}")
+    print(f"   GEMINI_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {dict(server.stats)}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Fuzzy matching identitas karyawan (NIK & nama salah baca OCR)
+
+Blocking NIK memakai pigeonhole: NIK 16 digit dibagi 6 segmen, dengan edit
+distance <= 2 minimal 4 segmen tetap utuh. Setiap NIK disimpan dengan key
+untuk setiap kombinasi 4 segmen (15 key), jadi kandidat cukup dicari lewat
+key yang sama, tanpa membandingkan ke semua NIK. Key selalu berisi >= 6 digit
+di luar kode wilayah (6 digit pertama), yang sama untuk hampir semua karyawan.
+"""
+
+import re
+from functools import lru_cache
+from itertools import combinations, product
+
+NIK_MAX_DISTANCE = 2
+NAME_MIN_SIMILARITY = 0.8
+
+NIK_LENGTH = 16
+# Kode wilayah | tanggal lahir | bulan lahir | tahun lahir | 4 digit nomor urut
+NIK_SEGMENTS = ((0, 6), (6, 8), (8, 10), (10, 12), (12, 14), (14, 16))
+NIK_SEGMENT_GROUPS = tuple(combinations(range(len(NIK_SEGMENTS)), len(NIK_SEGMENTS) - NIK_MAX_DISTANCE))
+NIK_STRIP_CHARS = (' ', '.', '-')
+
+
+def normalize_nik(nik: str) -> str:
+    """Buang spasi/titik/strip yang sering muncul dari OCR"""
+    nik = nik or ""
+    for char in NIK_STRIP_CHARS:
+        nik = nik.replace(char, "")
+    return nik
+
+
+def normalize_name(nama: str) -> str:
+    """Lowercase, hanya huruf & satu spasi antar kata"""
+    return " ".join(re.sub(r"[^a-z ]", " ", (nama or "").lower()).split())
+
+
+def levenshtein(a: str, b: str, max_distance: int = None) -> int:
+    """
+    Edit distance a ↔ b. Jika max_distance diisi, hanya diagonal selebar
+    max_distance yang dihitung dan hasilnya max_distance + 1 begitu jaraknya
+    pasti melebihi batas.
+    """
+    band = max(len(a), len(b)) if max_distance is None else max_distance
+    if abs(len(a) - len(b)) > band:
+        return band + 1
+
+    over = band + 1
+    previous = [j if j <= band else over for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, start=1):
+        low, high = max(1, i - band), min(len(b), i + band)
+        current = [i if i <= band else over] + [over] * len(b)
+        for j in range(low, high + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != b[j - 1])
+            )
+        if min(current[low - 1:high + 1]) > band:
+            return over
+        previous = current
+
+    return min(previous[-1], over)
+
+
+def name_similarity(a: str, b: str) -> float:
+    """1 - edit distance / panjang nama terpanjang (setelah normalize_name)"""
+    a, b = normalize_name(a), normalize_name(b)
+    if not a or not b:
+        return 0.0
+    return 1 - levenshtein(a, b) / max(len(a), len(b))
+
+
+def nik_block_keys(nik: str) -> list[str]:
+    """Key blocking untuk NIK tersimpan (segmen di posisi aslinya)"""
+    nik = normalize_nik(nik)
+    return [
+        "".join(map(str, group)) + ":" + "".join(nik[NIK_SEGMENTS[index][0]:NIK_SEGMENTS[index][1]] for index in group)
+        for group in NIK_SEGMENT_GROUPS
+    ]
+
+
+@lru_cache(maxsize=None)
+def _probe_slices(length: int, max_distance: int) -> tuple[tuple[str, tuple[slice, ...]], ...]:
+    """
+    (prefix key, slice tiap segmen) untuk semua pola pergeseran yang mungkin
+    pada NIK sepanjang `length`. Setiap sisipan/hapus digit mengubah
+    pergeseran segmen sesudahnya ±1, jadi total perubahan dari kiri ke kanan
+    maks. max_distance.
+    """
+    probes = []
+    for group in NIK_SEGMENT_GROUPS:
+        prefix = "".join(map(str, group)) + ":"
+        segments = [NIK_SEGMENTS[index] for index in group]
+
+        for shifts in product(range(-max_distance, max_distance + 1), repeat=len(group)):
+            changes = abs(shifts[0]) + sum(abs(b - a) for a, b in zip(shifts, shifts[1:]))
+            bounds = [(start + shift, end + shift) for (start, end), shift in zip(segments, shifts)]
+            if changes <= max_distance and bounds[0][0] >= 0 and bounds[-1][1] <= length:
+                probes.append((prefix, tuple(slice(start, end) for start, end in bounds)))
+
+    return tuple(probes)
+
+
+def nik_probe_keys(nik: str, max_distance: int = NIK_MAX_DISTANCE) -> list[str]:
+    """
+    Key blocking untuk mencari NIK tersimpan dalam edit distance max_distance.
+    Segmen yang utuh bisa bergeser akibat sisipan/hapus digit, jadi setiap
+    pola pergeseran yang mungkin ikut dicoba.
+    """
+    if max_distance > NIK_MAX_DISTANCE:
+        raise ValueError(f"nik_blocks hanya mendukung edit distance <= {NIK_MAX_DISTANCE}")
+
+    nik = normalize_nik(nik)
+    return list({
+        prefix + "".join([nik[part] for part in parts])
+        for prefix, parts in _probe_slices(len(nik), max_distance)
+    })
+
+
+def match_identity(nik_a: str, nama_a: str, nik_b: str, nama_b: str,
+                   max_distance: int = NIK_MAX_DISTANCE,
+                   min_name_similarity: float = NAME_MIN_SIMILARITY) -> tuple[bool, int, float]:
+    """
+    Apakah dua (NIK, nama) kemungkinan orang yang sama.
+    NIK identik selalu cocok; NIK beda 1-2 digit hanya cocok jika nama
+    cukup mirip (atau salah satu nama kosong).
+    Return (cocok, jarak NIK, kemiripan nama).
+    """
+    distance = levenshtein(normalize_nik(nik_a), normalize_nik(nik_b), max_distance)
+    if distance > max_distance:
+        return False, distance, 0.0
+
+    similarity = name_similarity(nama_a, nama_b)
+    if distance == 0:
+        return True, distance, similarity
+
+    names_known = bool(normalize_name(nama_a)) and bool(normalize_name(nama_b))
+    return (not names_known or similarity >= min_name_similarity), distance, similarity
+
+
+def cluster_identities(edges, weights: dict[str, int]) -> dict[str, str]:
+    """
+    Union-find atas pasangan NIK yang cocok. Return {nik: nik kanonik} hanya
+    untuk NIK yang masuk cluster berisi > 1 NIK; NIK kanonik = NIK dengan
+    surat terbanyak (seri → NIK 16 digit, lalu NIK terkecil).
+    """
+    parent = {}
+
+    def find(nik):
+        parent.setdefault(nik, nik)
+        while parent[nik] != nik:
+            parent[nik] = parent[parent[nik]]
+            nik = parent[nik]
+        return nik
+
+    for nik_a, nik_b in edges:
+        root_a, root_b = find(nik_a), find(nik_b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    members = {}
+    for nik in parent:
+        members.setdefault(find(nik), []).append(nik)
+
+    mapping = {}
+    for group in members.values():
+        canonical = min(group, key=lambda nik: (-weights.get(nik, 0), len(nik) != NIK_LENGTH, nik))
+        for nik in group:
+            mapping[nik] = canonical
+    return mapping
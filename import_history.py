@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Import data historis surat izin dari CSV / Excel (.xlsx) / Parquet
+
+File dibaca per chunk (memori tetap kecil berapa pun ukuran file), lalu per
+chunk secara vektor: normalisasi (normalize_date_series /
+normalize_diagnosis_series), klasifikasi penyakit (classify_diseases), cek
+duplikat (dalam chunk + ke database, satu query) dan tulis dengan
+executemany dalam satu transaksi. Overlap izin dicek sesudah insert.
+
+Header kolom dikenali lewat COLUMN_ALIASES (tidak case-sensitive). Baris
+tanpa NIK / nama / tanggal valid / diagnosa ditolak dan bisa ditulis ke
+file --rejects. upload_date dinormalisasi ke YYYY-MM-DDTHH:MM:SS; kosong atau
+tidak dikenali → tanggal izin jam 00:00:00.
+
+surat_id diambil dari kolom surat_id jika ada, selain itu dibuat dari hash
+file + nomor baris, jadi import yang terhenti cukup dijalankan ulang:
+baris yang sudah tersimpan dilewati.
+
+Cek duplikat di sini hanya memakai NIK yang persis sama (tanpa fuzzy
+matching NIK mirip seperti saat upload).
+
+Usage:
+    python import_history.py riwayat_2023.csv
+    python import_history.py riwayat.parquet --chunk-size 100000 --rejects ditolak.csv
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+import database
+from database import (
+    init_db,
+    find_duplicate_keys,
+    find_existing_surat_ids,
+    find_first_overlaps,
+    get_rowids,
+    insert_surat_batch,
+    sync_nik_blocks,
+    NIK_WEIGHT,
+    TANGGAL_WEIGHT,
+    DIAGNOSA_WEIGHT
+)
+from llm_client import classify_diseases, normalize_date_series, normalize_diagnosis_series, reload_disease_master
+
+try:
+    import pyarrow.parquet as pq
+    PARQUET_SUPPORT = True
+except ImportError:
+    PARQUET_SUPPORT = False
+
+try:
+    import openpyxl
+    EXCEL_SUPPORT = True
+except ImportError:
+    EXCEL_SUPPORT = False
+
+DEFAULT_CHUNK_SIZE = 50_000
+# Page cache SQLite selama import: insert acak ke 5 index surat_izin jauh lebih
+# cepat jika halaman index tidak terus-menerus dibuang dari cache default (2 MB)
+IMPORT_CACHE_KB = 256 * 1024
+REQUIRED_FIELDS = ('nik', 'nama', 'tanggal_izin', 'diagnosa')
+SUPPORTED_EXTENSIONS = ('.csv', '.parquet', '.xlsx', '.xlsm')
+# Jam opsional di upload_date: HH:MM[:SS] sesudah tanggal (spasi atau "T")
+TIME_PATTERN = r'(?:^|[T\s])(\d{1,2}):(\d{2})(?::(\d{2}))?'
+
+# Nama kolom standar → header yang dikenali (setelah lowercase, non-alfanumerik → "_")
+COLUMN_ALIASES = {
+    'surat_id': ('surat_id', 'id_surat', 'no_surat', 'nomor_surat'),
+    'nik': ('nik', 'no_nik', 'nomor_nik', 'nomor_induk_kependudukan'),
+    'nama': ('nama', 'nama_karyawan', 'nama_pegawai', 'name'),
+    'tanggal_izin': ('tanggal_izin', 'tgl_izin', 'tanggal', 'tanggal_mulai', 'tgl_mulai', 'date'),
+    'durasi': ('durasi', 'durasi_hari', 'lama_izin', 'jumlah_hari', 'hari'),
+    'diagnosa': ('diagnosa', 'diagnosis', 'penyakit'),
+    'dokter': ('dokter', 'nama_dokter', 'doctor'),
+    'rumah_sakit': ('rumah_sakit', 'rs', 'faskes', 'klinik', 'hospital'),
+    'upload_date': ('upload_date', 'tanggal_upload', 'tanggal_input'),
+}
+
+
+# ==================== READERS ====================
+
+def file_digest(path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 isi file, dibaca per blok (file historis bisa sangat besar)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_csv(path: str, chunk_size: int):
+    with pd.read_csv(path, dtype="string", chunksize=chunk_size, skipinitialspace=True) as reader:
+        yield from reader
+
+
+def _read_parquet(path: str, chunk_size: int):
+    if not PARQUET_SUPPORT:
+        raise RuntimeError("pyarrow tidak terinstall (pip install pyarrow)")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas().astype("string")
+
+
+def _read_excel(path: str, chunk_size: int):
+    """Sheet pertama, dibaca streaming (openpyxl read-only)"""
+    if not EXCEL_SUPPORT:
+        raise RuntimeError("openpyxl tidak terinstall (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value) if value is not None else f"kolom_{i}" for i, value in enumerate(next(rows, ()))]
+        batch = []
+        for row in rows:
+            batch.append(row[:len(header)])
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header).astype("string")
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header).astype("string")
+    finally:
+        workbook.close()
+
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Iterator DataFrame (semua kolom string) per chunk_size baris"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return _read_csv(path, chunk_size)
+    if extension == '.parquet':
+        return _read_parquet(path, chunk_size)
+    if extension in ('.xlsx', '.xlsm'):
+        return _read_excel(path, chunk_size)
+    raise ValueError(f"Format tidak didukung: {extension} (pilih {', '.join(SUPPORTED_EXTENSIONS)})")
+
+
+def map_columns(headers) -> dict[str, str]:
+    """{header asli: nama kolom standar}; error jika kolom wajib tidak ada"""
+    lookup = {alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+    mapping = {}
+    for header in headers:
+        column = lookup.get(re.sub(r'[^a-z0-9]+', '_', str(header).lower()).strip('_'))
+        if column and column not in mapping.values():
+            mapping[header] = column
+
+    missing = [field for field in REQUIRED_FIELDS if field not in mapping.values()]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)} (header: {', '.join(map(str, headers))})")
+    return mapping
+
+
+# ==================== CHUNK PROCESSING ====================
+
+def _text(values: pd.Series) -> pd.Series:
+    """Strip whitespace, string kosong → <NA>"""
+    values = values.astype("string").str.strip()
+    return values.mask(values == "")
+
+
+def normalize_upload_date(values: pd.Series) -> pd.Series:
+    """
+    upload_date → YYYY-MM-DDTHH:MM:SS. Tanggal dikenali seperti tanggal_izin
+    (normalize_date_series), jam tidak ada / tidak valid → 00:00:00.
+    Tanggal tidak dikenali → <NA>.
+    """
+    clock_parts = values.str.extract(TIME_PATTERN)
+    hour, minute, second = (pd.to_numeric(clock_parts[i]).fillna(0) for i in range(3))
+    valid = clock_parts[0].notna() & (hour < 24) & (minute < 60) & (second < 60)
+    clock = (clock_parts[0].str.zfill(2) + ":" + clock_parts[1] + ":"
+             + clock_parts[2].fillna("00")).where(valid, "00:00:00")
+    return normalize_date_series(values) + "T" + clock
+
+
+def normalize_chunk(frame: pd.DataFrame, source_id: str, first_row: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Normalisasi satu chunk seperti halaman Upload.
+    Return (baris valid, baris ditolak + kolom alasan). first_row = nomor baris
+    data pertama chunk di file (untuk surat_id default).
+    """
+    def column(name):
+        return _text(frame[name]) if name in frame else pd.Series(pd.NA, index=frame.index, dtype="string")
+
+    row_numbers = pd.Series(range(first_row, first_row + len(frame)), index=frame.index)
+    durasi = pd.to_numeric(column('durasi').str.extract(r'(\d+)', expand=False), errors='coerce')
+
+    data = pd.DataFrame({
+        'surat_id': column('surat_id').fillna(f"IMPORT_{source_id}_" + row_numbers.map('{:08d}'.format)),
+        'nik': column('nik').str.replace(r'\s+', '', regex=True),
+        'nama': column('nama').str.lower(),
+        'tanggal_izin': normalize_date_series(column('tanggal_izin')),
+        'durasi': durasi.fillna(1).clip(lower=1).astype('int64'),
+        'diagnosa': normalize_diagnosis_series(column('diagnosa')),
+        'dokter': column('dokter'),
+        'rumah_sakit': column('rumah_sakit'),
+        'upload_date': normalize_upload_date(column('upload_date')),
+    })
+
+    missing = data[list(REQUIRED_FIELDS)].isna()
+    invalid = missing.any(axis=1)
+    rejected = frame[invalid].copy()
+    fields = pd.Series("", index=rejected.index, dtype="string")
+    for field in REQUIRED_FIELDS:
+        fields += missing.loc[invalid, field].map({True: f", {field}", False: ""}).astype("string")
+    rejected['alasan'] = "Data tidak lengkap: " + fields.str[2:]
+    return data[~invalid], rejected
+
+
+def build_chunk_records(conn, data: pd.DataFrame, master) -> pd.DataFrame:
+    """
+    Klasifikasi & cek duplikat satu chunk (kolom sesuai SURAT_IZIN_COLUMNS).
+    Duplikat = (nik, tanggal_izin) sama dengan surat di database atau baris
+    sebelumnya di chunk yang sama; score & catatan sama dengan check_duplicate.
+    """
+    classified = classify_diseases(data['diagnosa'], master)
+
+    keys = list(zip(data['surat_id'], data['nik'], data['tanggal_izin'], data['diagnosa']))
+    existing = find_duplicate_keys(conn, keys)
+    positions = pd.Series(range(len(data)), index=data.index)
+    in_db = positions.isin(existing.keys())
+    same_in_db = positions.map(existing).fillna(False).astype(bool)
+
+    is_duplicate = in_db | data.duplicated(['nik', 'tanggal_izin'])
+    same_diagnosa = same_in_db | data.duplicated(['nik', 'tanggal_izin', 'diagnosa'])
+    score = ((NIK_WEIGHT + TANGGAL_WEIGHT + DIAGNOSA_WEIGHT * same_diagnosa) * is_duplicate).astype('float64')
+
+    note = pd.Series("NIK sama & Tanggal sama", index=data.index, dtype="string")
+    note = note.where(~same_diagnosa, note + " & Diagnosa sama").where(is_duplicate)
+    reason = classified['warning'].fillna(
+        ("Duplikasi (" + score.astype("string") + "%)").where(is_duplicate)
+    )
+
+    return data.assign(
+        is_reimburseable=classified['is_reimburseable'],
+        kategori=classified['kategori'],
+        is_duplicate=is_duplicate,
+        duplicate_score=score,
+        duplicate_note=note,
+        warning_flag=reason.notna(),
+        warning_reason=reason,
+        # Data historis tanpa tanggal upload: pakai tanggal izin
+        upload_date=data['upload_date'].fillna(data['tanggal_izin'] + "T00:00:00"),
+        master_version=master.version
+    )
+
+
+def _rows(records: pd.DataFrame) -> list[tuple]:
+    """DataFrame → tuple urut SURAT_IZIN_COLUMNS (<NA> → None) untuk executemany"""
+    columns = [records[column].astype(object).where(records[column].notna(), None)
+               for column in database.SURAT_IZIN_COLUMNS]
+    return list(zip(*columns))
+
+
+def flag_overlaps(conn, records: pd.DataFrame) -> int:
+    """
+    Warning overlap untuk surat yang baru di-insert tanpa warning lain,
+    terhadap surat yang tersimpan lebih dulu (sama seperti saat upload).
+    """
+    candidates = records.loc[records['warning_reason'].isna(), 'surat_id'].tolist()
+    if not candidates:
+        return 0
+
+    overlaps = find_first_overlaps(conn, list(get_rowids(conn, candidates).values()), earlier_only=True)
+    conn.executemany(
+        "UPDATE surat_izin SET warning_flag = 1, warning_reason = ? WHERE rowid = ?",
+        [(f"Overlap izin dengan {surat_id} ({overlap_hari} hari)", rowid)
+         for rowid, (surat_id, overlap_hari) in overlaps.items()]
+    )
+    return len(overlaps)
+
+
+# ==================== IMPORT ====================
+
+def import_history(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, rejects_path: str = None,
+                   progress=None) -> dict:
+    """
+    Import satu file historis. Satu transaksi (BEGIN IMMEDIATE) per chunk.
+    progress(summary) dipanggil setelah setiap chunk di-commit.
+    """
+    init_db()
+    master = reload_disease_master()
+    source_id = file_digest(path)[:12]
+    summary = {'rows': 0, 'inserted': 0, 'skipped': 0, 'rejected': 0, 'duplicates': 0, 'overlaps': 0}
+
+    # Satu koneksi untuk seluruh import: cache_size hanya berlaku per koneksi,
+    # jadi diset & dikembalikan di koneksi yang sama
+    with database.get_connection() as conn:
+        default_cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        conn.execute(f"PRAGMA cache_size = {-IMPORT_CACHE_KB}")
+        try:
+            mapping = _import_chunks(conn, path, chunk_size, rejects_path, master, source_id, summary, progress)
+        finally:
+            conn.execute(f"PRAGMA cache_size = {default_cache_size}")
+
+    if mapping is None:
+        raise ValueError("File kosong")
+
+    # Index NIK untuk fuzzy matching saat upload berikutnya (sekali, per NIK unik)
+    sync_nik_blocks()
+    return summary
+
+
+def _import_chunks(conn, path: str, chunk_size: int, rejects_path: str, master, source_id: str,
+                   summary: dict, progress) -> dict | None:
+    """Loop chunk import_history, satu transaksi per chunk; return mapping kolom (None jika file kosong)"""
+    mapping = None
+    rejects_header = True
+    for chunk in read_chunks(path, chunk_size):
+        if mapping is None:
+            mapping = map_columns(chunk.columns)
+        first_row = summary['rows'] + 1
+        summary['rows'] += len(chunk)
+
+        data, rejected = normalize_chunk(chunk[list(mapping)].rename(columns=mapping), source_id, first_row)
+        if rejects_path and not rejected.empty:
+            rejected.insert(0, 'baris', rejected.index - chunk.index[0] + first_row)
+            rejected.to_csv(rejects_path, mode='w' if rejects_header else 'a', header=rejects_header, index=False)
+            rejects_header = False
+        summary['rejected'] += len(rejected)
+
+        conn.execute("BEGIN IMMEDIATE")
+        existing = find_existing_surat_ids(conn, data['surat_id'].tolist())
+        new = ~data['surat_id'].isin(existing) & ~data['surat_id'].duplicated()
+        summary['skipped'] += int((~new).sum())
+
+        records = build_chunk_records(conn, data[new], master)
+        summary['inserted'] += insert_surat_batch(conn, _rows(records))
+        summary['duplicates'] += int(records['is_duplicate'].sum())
+        summary['overlaps'] += flag_overlaps(conn, records)
+        conn.commit()
+
+        if progress:
+            progress(summary)
+
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import data historis surat izin dari CSV/Excel/Parquet")
+    parser.add_argument("source", help="File .csv, .xlsx atau .parquet")
+    parser.add_argument("--db", default=database.DB_PATH, help="Path database SQLite")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Jumlah baris per chunk/transaksi")
+    parser.add_argument("--rejects", help="Tulis baris yang ditolak (beserta alasan) ke CSV ini")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ Source tidak ditemukan: {args.source}")
+        sys.exit(1)
+
+    database.DB_PATH = args.db
+    start = time.perf_counter()
+
+    def progress(summary):
+        elapsed = time.perf_counter() - start
+        print(f"[{summary['rows']:,} baris] {summary['inserted']:,} disimpan, {summary['rejected']:,} ditolak — "
+              f"{summary['rows'] / elapsed if elapsed else 0:,.0f} baris/detik", flush=True)
+
+    try:
+        summary = import_history(args.source, args.chunk_size, args.rejects, progress)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {summary['rows']:,} baris dalam {elapsed:.1f} detik ({summary['rows'] / elapsed:,.0f} baris/detik): "
+          f"{summary['inserted']:,} disimpan, {summary['skipped']:,} sudah ada, {summary['rejected']:,} ditolak")
+    print(f"⚠️  {summary['duplicates']:,} duplikat, {summary['overlaps']:,} overlap izin")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Bulk ingestion surat izin dokter dari folder atau ZIP (tanpa Streamlit)
+
+Pipeline per file sama dengan halaman Upload:
+read_image_with_gemini → parse_ocr_text → check_duplicate/overlap → classify_disease → save_to_db
+
+Usage:
+    python ingest.py /path/ke/folder
+    python ingest.py surat_januari.zip --http-workers 8 --render-workers 2
+
+File yang sudah berhasil dicatat di checkpoint (default: ingest_checkpoint.jsonl)
+dilewati saat command dijalankan ulang, jadi crash di tengah jalan tidak
+mengulang file yang sudah selesai. surat_id diturunkan dari digest file, jadi
+surat yang sudah tersimpan tapi belum sempat dicatat di checkpoint juga
+dilewati, bukan disimpan dua kali.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import database
+from database import (
+    init_db,
+    check_duplicate,
+    find_existing_surat_ids,
+    find_overlapping_leaves,
+    save_to_db,
+    get_cached_extraction,
+    save_extraction_cache
+)
+from llm_client import (
+    EXTRACTION_MODE,
+    EXTRACTION_MODES,
+    encode_image_file,
+    encode_image_bytes,
+    extract_with_gemini,
+    extraction_cache_key,
+    get_gemini_client,
+    parse_ocr_text,
+    classify_disease
+)
+
+SUPPORTED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.pdf')
+DEFAULT_CHECKPOINT = "ingest_checkpoint.jsonl"
+REQUIRED_FIELDS = ('nik', 'nama', 'tanggal_izin', 'diagnosa')
+
+
+# ==================== FILE DISCOVERY ====================
+
+def collect_files(source: str, extract_dir: str) -> list[tuple[str, str]]:
+    """
+    Kumpulkan file surat dari folder atau ZIP.
+    Return list (nama tampilan, path di disk). Isi ZIP diekstrak ke extract_dir.
+    """
+    files = []
+
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    continue
+                path = archive.extract(member, extract_dir)
+                files.append((f"{os.path.basename(source)}/{member.filename}", path))
+    else:
+        for root, _, names in os.walk(source):
+            for name in names:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    files.append((os.path.relpath(path, source), path))
+
+    return sorted(files)
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 isi file, dipakai sebagai key checkpoint"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def surat_id_for(digest: str) -> str:
+    """surat_id dari digest file: file yang sama selalu mendapat surat_id yang sama"""
+    return f"INGEST_{digest[:16]}"
+
+
+# ==================== CHECKPOINT ====================
+
+def load_checkpoint(path: str) -> set[str]:
+    """Ambil digest file yang sudah berhasil diproses"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # baris terakhir bisa terpotong saat crash
+            if entry.get('status') == 'ok':
+                done.add(entry['digest'])
+    return done
+
+
+def append_checkpoint(checkpoint_file, entry: dict):
+    """Tulis satu hasil ke checkpoint dan flush langsung ke disk"""
+    checkpoint_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    checkpoint_file.flush()
+    os.fsync(checkpoint_file.fileno())
+
+
+# ==================== PIPELINE ====================
+
+def extract_file(path: str, render_pool: ProcessPoolExecutor, mode: str = None) -> tuple[str, dict | None]:
+    """
+    Ekstrak raw_text satu file (jalan di thread pool HTTP).
+    PDF dirender di process pool; hasil Gemini disimpan ke extraction cache.
+    Return (raw_text, statistik call Gemini); statistik None jika dari cache.
+    """
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    cache_key = extraction_cache_key(file_bytes, mode)
+
+    raw_text = get_cached_extraction(cache_key)
+    if raw_text is not None:
+        return raw_text, None
+
+    if path.lower().endswith('.pdf'):
+        media_type, image_data = render_pool.submit(encode_image_file, path).result()
+    else:
+        media_type, image_data = encode_image_bytes(file_bytes, path)
+
+    raw_text = extract_with_gemini(media_type, image_data, mode)
+    if raw_text.startswith("Error"):
+        raise RuntimeError(raw_text[len("Error: "):])
+
+    save_extraction_cache(cache_key, raw_text)
+    return raw_text, get_gemini_client().last_call_stats
+
+
+def build_record(raw_text: str, surat_id: str) -> dict:
+    """Parse, cek duplikat/overlap & klasifikasi, lalu susun record seperti halaman Upload"""
+    extracted = parse_ocr_text(raw_text)
+
+    missing = [field for field in REQUIRED_FIELDS if not extracted[field]]
+    if missing:
+        raise ValueError(f"Data tidak lengkap: {', '.join(missing)}")
+
+    processed_data = {
+        'nik': extracted['nik'],
+        'nama': extracted['nama'].lower().strip(),
+        'tanggal_izin': extracted['tanggal_izin'],
+        'durasi': int(extracted['durasi'] or 1),
+        'diagnosa': extracted['diagnosa'].upper().strip(),
+        'dokter': extracted['dokter'],
+        'rumah_sakit': extracted['rumah_sakit'],
+    }
+
+    is_dup, dup_score, dup_note = check_duplicate(processed_data)
+    overlaps = find_overlapping_leaves(processed_data)
+    disease_info = classify_disease(processed_data['diagnosa'])
+
+    return {
+        'surat_id': surat_id,
+        **processed_data,
+        'is_reimburseable': disease_info['is_reimburseable'],
+        'kategori': disease_info['kategori'],
+        'is_duplicate': is_dup,
+        'duplicate_score': dup_score,
+        'duplicate_note': dup_note if is_dup else None,
+        'warning_flag': is_dup or bool(overlaps) or disease_info['warning'] is not None,
+        'warning_reason': disease_info['warning'] if disease_info['warning'] else (
+            f"Duplikasi ({dup_score}%)" if is_dup else
+            f"Overlap izin dengan {overlaps[0]['surat_id']} ({overlaps[0]['overlap_hari']} hari)" if overlaps else None
+        ),
+        'upload_date': datetime.now().isoformat(),
+        'master_version': disease_info['master_version'],
+        'raw_text': raw_text
+    }
+
+
+def ingest(source: str, checkpoint_path: str = DEFAULT_CHECKPOINT,
+           http_workers: int = 4, render_workers: int = 2, extraction_mode: str = None) -> dict:
+    """
+    Jalankan bulk ingestion. Ekstraksi (render PDF + Gemini) paralel,
+    sedangkan cek duplikat & simpan ke DB berurutan di thread utama agar
+    surat dalam batch yang sama juga saling terdeteksi sebagai duplikat.
+    """
+    init_db()
+    done = load_checkpoint(checkpoint_path)
+    summary = {'ok': 0, 'error': 0, 'skipped': 0, 'prompt_tokens': 0, 'response_tokens': 0}
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as extract_dir:
+        files = collect_files(source, extract_dir)
+        pending = []
+        for name, path in files:
+            digest = file_digest(path)
+            if digest in done:
+                summary['skipped'] += 1  # sudah diproses, atau file kembar dalam source yang sama
+            else:
+                done.add(digest)
+                pending.append((name, path, digest))
+
+        # Crash di antara save_to_db dan append_checkpoint: surat sudah tersimpan, cukup dicatat
+        with database.get_connection() as conn:
+            saved = find_existing_surat_ids(conn, [surat_id_for(digest) for _, _, digest in pending])
+        recovered = [(name, digest) for name, _, digest in pending if surat_id_for(digest) in saved]
+        pending = [item for item in pending if surat_id_for(item[2]) not in saved]
+        summary['skipped'] += len(recovered)
+
+        total = len(pending)
+        print(f"📂 {len(files)} file ditemukan, {summary['skipped']} sudah diproses, {total} akan diproses")
+
+        with ProcessPoolExecutor(max_workers=render_workers) as render_pool, \
+                ThreadPoolExecutor(max_workers=http_workers) as http_pool, \
+                open(checkpoint_path, "a", encoding="utf-8") as checkpoint_file:
+
+            for name, digest in recovered:
+                append_checkpoint(checkpoint_file, {
+                    'file': name, 'digest': digest, 'finished_at': datetime.now().isoformat(),
+                    'status': 'ok', 'surat_id': surat_id_for(digest)
+                })
+
+            futures = {
+                http_pool.submit(extract_file, path, render_pool, extraction_mode): (name, digest)
+                for name, path, digest in pending
+            }
+
+            for index, future in enumerate(as_completed(futures), start=1):
+                name, digest = futures[future]
+                entry = {'file': name, 'digest': digest, 'finished_at': datetime.now().isoformat()}
+
+                try:
+                    raw_text, call_stats = future.result()
+                    if call_stats:
+                        entry.update(latency_ms=round(call_stats['latency_ms']),
+                                     prompt_tokens=call_stats.get('prompt_tokens'),
+                                     response_tokens=call_stats.get('response_tokens'))
+                        summary['prompt_tokens'] += call_stats.get('prompt_tokens') or 0
+                        summary['response_tokens'] += call_stats.get('response_tokens') or 0
+
+                    record = build_record(raw_text, surat_id_for(digest))
+                    save_to_db(record)
+                    entry.update(status='ok', surat_id=record['surat_id'])
+                    summary['ok'] += 1
+                    note = " ⚠️ duplikat" if record['is_duplicate'] else ""
+                    print(f"[{index}/{total}] ✅ {name} → {record['surat_id']}{note}")
+                except Exception as e:
+                    entry.update(status='error', error=str(e))
+                    summary['error'] += 1
+                    print(f"[{index}/{total}] ❌ {name}: {e}")
+
+                append_checkpoint(checkpoint_file, entry)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Selesai dalam {elapsed:.1f} detik: {summary['ok']} berhasil, "
+          f"{summary['error']} gagal, {summary['skipped']} dilewati")
+    print(f"🔢 Token Gemini: {summary['prompt_tokens']:,} prompt + {summary['response_tokens']:,} response")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingestion surat izin dokter dari folder atau ZIP")
+    parser.add_argument("source", help="Folder atau file ZIP berisi JPG/PNG/PDF")
+    parser.add_argument("--db", default=database.DB_PATH, help="Path database SQLite")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="File checkpoint (JSON lines)")
+    parser.add_argument("--http-workers", type=int, default=4, help="Jumlah request Gemini paralel")
+    parser.add_argument("--render-workers", type=int, default=2, help="Jumlah proses render PDF")
+    parser.add_argument("--extraction-mode", choices=EXTRACTION_MODES, default=EXTRACTION_MODE,
+                        help="Mode ekstraksi Gemini (json: response schema, text: prompt lama)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ Source tidak ditemukan: {args.source}")
+        sys.exit(1)
+
+    database.DB_PATH = args.db
+    summary = ingest(args.source, args.checkpoint, args.http_workers, args.render_workers, args.extraction_mode)
+    sys.exit(1 if summary['error'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Analisis pola frekuensi izin sakit per karyawan (indikator fraud)
+
+Semua perhitungan memakai satu kali sort (kode NIK, tanggal_izin) lalu operasi
+vektor numpy/pandas, sehingga skala ke jutaan surat tanpa loop per NIK.
+Input cukup DataFrame dengan kolom nik, nama, tanggal_izin, durasi, upload_date
+(lihat database.get_leave_events).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Default aturan pola
+REPEAT_MIN_COUNT = 3
+ROLLING_WINDOW_DAYS = 90
+ROLLING_MIN_COUNT = 4
+WEEKEND_ADJACENT_MIN_COUNT = 3
+WEEKEND_ADJACENT_MIN_RATIO = 0.6  # baseline hari kerja acak = 2/5
+
+SUMMARY_COLUMNS = ['nik', 'nama', 'jumlah', 'total_durasi', 'first_izin', 'last_izin']
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Buang surat tanpa NIK, parse tanggal_izin, beri kode integer per NIK
+    (urutan kode = urutan NIK) lalu urutkan (nik_code, tanggal) sekali saja.
+    """
+    events = df.loc[df['nik'].notna(), ['nik', 'nama', 'tanggal_izin', 'durasi', 'upload_date']]
+    nik_code = pd.factorize(events['nik'], sort=True)[0]
+    tanggal = pd.to_datetime(events['tanggal_izin'], format='%Y-%m-%d', errors='coerce')
+
+    # NaT (-2^63) jatuh paling depan dalam tiap NIK
+    order = np.lexsort((tanggal.to_numpy().view('int64'), nik_code))
+    return events.assign(
+        nik_code=nik_code,
+        tanggal=tanggal,
+        durasi=pd.to_numeric(events['durasi'], errors='coerce').fillna(0).astype('int64'),
+        upload_date=events['upload_date'].fillna(''),
+    ).iloc[order].reset_index(drop=True)
+
+
+def summarize_employees(df: pd.DataFrame, min_count: int = REPEAT_MIN_COUNT) -> pd.DataFrame:
+    """
+    Ringkasan per karyawan dengan >= min_count surat dalam satu groupby:
+    nama (dari surat yang paling baru di-upload), jumlah, total_durasi,
+    first_izin & last_izin.
+    """
+    return _summarize(_prepare(df), min_count)
+
+
+def _summarize(events: pd.DataFrame, min_count: int) -> pd.DataFrame:
+    if events.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    grouped = events.groupby('nik_code', sort=True)
+    summary = grouped.agg(
+        nik=('nik', 'first'),
+        jumlah=('nik_code', 'size'),
+        total_durasi=('durasi', 'sum'),
+        first_izin=('tanggal', 'min'),
+        last_izin=('tanggal', 'max'),
+    )
+    summary['nama'] = events['nama'].iloc[grouped['upload_date'].idxmax().to_numpy()].array
+    summary = summary[summary['jumlah'] >= min_count]
+
+    return (summary.sort_values(['jumlah', 'nik'], ascending=[False, True], kind='stable', ignore_index=True)
+            [SUMMARY_COLUMNS])
+
+
+def max_rolling_counts(df: pd.DataFrame, window_days: int = ROLLING_WINDOW_DAYS) -> pd.DataFrame:
+    """
+    Jumlah surat terbanyak per NIK dalam jendela window_days hari manapun
+    (kolom: nik, max_window_count, window_start, window_end).
+
+    Tiap surat dijadikan ujung kanan jendela; awal jendela dicari dengan
+    searchsorted pada key gabungan (kode NIK, hari) sehingga jendela tidak
+    pernah melewati batas NIK.
+    """
+    return _rolling_counts(_prepare(df), window_days)
+
+
+def _rolling_counts(events: pd.DataFrame, window_days: int) -> pd.DataFrame:
+    events = events[events['tanggal'].notna()]
+    if events.empty:
+        return pd.DataFrame(columns=['nik', 'max_window_count', 'window_start', 'window_end'])
+
+    nik_codes = events['nik_code'].to_numpy('int64')
+    days = (events['tanggal'] - events['tanggal'].min()).dt.days.to_numpy('int64')
+    span = int(days.max()) + window_days + 1
+
+    keys = nik_codes * span + days
+    positions = np.arange(len(keys))
+    starts = np.searchsorted(keys, keys - (window_days - 1), side='left')
+    counts = positions - starts + 1
+
+    # Ambil jendela dengan jumlah terbanyak per NIK (jika seri, yang paling awal)
+    best = (pd.DataFrame({'code': nik_codes, 'count': counts, 'pos': positions})
+            .sort_values(['code', 'count', 'pos'], ascending=[True, False, True], kind='stable')
+            .drop_duplicates('code'))
+    best_pos = best['pos'].to_numpy()
+    tanggal = events['tanggal'].to_numpy()
+
+    return pd.DataFrame({
+        'nik': events['nik'].iloc[best_pos].array,
+        'max_window_count': best['count'].to_numpy(),
+        'window_start': tanggal[starts[best_pos]],
+        'window_end': tanggal[best_pos],
+    })
+
+
+def weekend_adjacent_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Jumlah & rasio surat yang jatuh di hari Senin/Jumat per NIK (kolom: nik, senin_jumat, senin_jumat_ratio)"""
+    return _weekend_counts(_prepare(df))
+
+
+def _weekend_counts(events: pd.DataFrame) -> pd.DataFrame:
+    events = events[events['tanggal'].notna()]
+    weekday = events['tanggal'].dt.dayofweek
+    grouped = weekday.isin([0, 4]).groupby(events['nik_code'], sort=True)
+
+    return pd.DataFrame({
+        'nik': events.groupby('nik_code', sort=True)['nik'].first(),
+        'senin_jumat': grouped.sum().astype('int64'),
+        'senin_jumat_ratio': grouped.mean(),
+    }).reset_index(drop=True)
+
+
+def detect_frequency_patterns(df: pd.DataFrame,
+                              min_count: int = REPEAT_MIN_COUNT,
+                              window_days: int = ROLLING_WINDOW_DAYS,
+                              window_min_count: int = ROLLING_MIN_COUNT,
+                              weekend_min_count: int = WEEKEND_ADJACENT_MIN_COUNT,
+                              weekend_min_ratio: float = WEEKEND_ADJACENT_MIN_RATIO) -> pd.DataFrame:
+    """
+    Gabungkan semua aturan pola untuk karyawan dengan >= min_count surat.
+    Flag: rolling_flag (>= window_min_count surat dalam window_days hari) dan
+    weekend_flag (>= weekend_min_count surat di Senin/Jumat dengan rasio
+    >= weekend_min_ratio).
+    """
+    events = _prepare(df)
+    summary = _summarize(events, min_count)
+    if summary.empty:
+        return summary.assign(max_window_count=pd.Series(dtype='int64'), window_start=pd.NaT, window_end=pd.NaT,
+                              senin_jumat=pd.Series(dtype='int64'), senin_jumat_ratio=pd.Series(dtype='float64'),
+                              rolling_flag=pd.Series(dtype='bool'), weekend_flag=pd.Series(dtype='bool'))
+
+    counts = np.bincount(events['nik_code'])
+    repeat = events[counts[events['nik_code']] >= min_count].reset_index(drop=True)
+    result = (summary
+              .merge(_rolling_counts(repeat, window_days), on='nik', how='left')
+              .merge(_weekend_counts(repeat), on='nik', how='left'))
+
+    result['max_window_count'] = result['max_window_count'].fillna(0).astype('int64')
+    result['senin_jumat'] = result['senin_jumat'].fillna(0).astype('int64')
+    result['senin_jumat_ratio'] = result['senin_jumat_ratio'].fillna(0.0)
+    result['rolling_flag'] = result['max_window_count'] >= window_min_count
+    result['weekend_flag'] = ((result['senin_jumat'] >= weekend_min_count)
+                              & (result['senin_jumat_ratio'] >= weekend_min_ratio))
+    return result
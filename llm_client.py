@@ -1,14 +1,29 @@
 import requests
 import os
 import base64
+import hashlib
+import json
+import random
 import re
 import io
-from datetime import datetime
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+from email.utils import parsedate_to_datetime
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
 from PIL import Image
 
+import database
+from metrics import span
+
 try:
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path, pdfinfo_from_bytes
     PDF_SUPPORT = True
 except ImportError:
     PDF_SUPPORT = False
@@ -18,85 +33,278 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
 
+# Naikkan setiap kali prompt ekstraksi berubah agar cache lama tidak dipakai
+PROMPT_VERSION = "v1"
+
+# "json": response schema, Gemini langsung mengembalikan JSON bertipe
+# "text": prompt lama dengan output "NIK: ..." per baris
+EXTRACTION_MODES = ("json", "text")
+EXTRACTION_MODE = os.getenv("GEMINI_EXTRACTION_MODE", "json")
+
+# ==================== GEMINI HTTP CLIENT ====================
+
+GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "60"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class GeminiClient:
+    """
+    HTTP client Gemini yang dipakai bersama: satu requests.Session dengan
+    keep-alive connection pool, timeout connect/read terpisah, dan retry
+    dengan jittered exponential backoff untuk 429/5xx (menghormati Retry-After).
+
+    Statistik call terakhir (latency, jumlah retry) tersedia per thread
+    lewat `last_call_stats`.
+    """
+
+    def __init__(self, base_url: str = None, api_key: str = None,
+                 connect_timeout: float = GEMINI_CONNECT_TIMEOUT,
+                 read_timeout: float = GEMINI_READ_TIMEOUT,
+                 max_retries: int = GEMINI_MAX_RETRIES,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 30.0,
+                 pool_size: int = 10):
+        self.base_url = base_url or GEMINI_BASE_URL
+        self.api_key = api_key or GEMINI_API_KEY
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self._local = threading.local()
+
+    @property
+    def last_call_stats(self) -> dict | None:
+        """Statistik call terakhir di thread ini"""
+        return getattr(self._local, "stats", None)
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        """Delay sebelum retry: Retry-After jika ada, selain itu full-jitter backoff"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    try:
+                        retry_at = parsedate_to_datetime(retry_after)
+                        delay = (retry_at - datetime.now(retry_at.tzinfo)).total_seconds()
+                        return min(max(delay, 0.0), self.backoff_max)
+                    except (TypeError, ValueError):
+                        pass
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def generate_content(self, payload: dict) -> requests.Response:
+        """
+        POST payload ke endpoint generateContent dengan retry.
+        Response terakhir dikembalikan apa adanya (termasuk status error);
+        exception koneksi/timeout di-raise setelah retry habis.
+        """
+        start = time.perf_counter()
+        retries = 0
+        response = None
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self.session.post(
+                        self.base_url,
+                        json=payload,
+                        params={"key": self.api_key},
+                        timeout=self.timeout
+                    )
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= self.max_retries:
+                        raise
+                    time.sleep(self._retry_delay(attempt))
+                    retries += 1
+                    continue
+
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+
+                time.sleep(self._retry_delay(attempt, response))
+                retries += 1
+
+            return response
+        finally:
+            self._local.stats = {
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "attempts": retries + 1,
+                "retries": retries,
+                "status_code": response.status_code if response is not None else None
+            }
+
+
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+
+
+def get_gemini_client() -> GeminiClient:
+    """Shared GeminiClient untuk satu proses (dibuat saat pertama dipakai)"""
+    global _gemini_client
+    if _gemini_client is None:
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                _gemini_client = GeminiClient()
+    return _gemini_client
+
+
 # ==================== GEMINI IMAGE READING ====================
 
 # ==================== PDF & IMAGE HANDLING ====================
 
-def convert_pdf_to_images(pdf_path: str) -> list:
+# Target jumlah pixel per halaman PDF (~2.5 MP sudah cukup untuk dibaca Gemini)
+PDF_PIXEL_BUDGET = 2_500_000
+PDF_MIN_DPI = 100
+PDF_MAX_DPI = 300
+PDF_DEFAULT_DPI = 200
+JPEG_QUALITY = 85
+
+
+def choose_pdf_dpi(pdf, pixel_budget: int = PDF_PIXEL_BUDGET) -> int:
+    """
+    Pilih DPI agar halaman pertama kira-kira berukuran pixel_budget pixel.
+    `pdf` bisa path atau bytes. Ukuran halaman dibaca dari pdfinfo (points, 72 per inch).
+    """
+    try:
+        if isinstance(pdf, str):
+            info = pdfinfo_from_path(pdf)
+        else:
+            info = pdfinfo_from_bytes(pdf)
+        page_size = info["Page size"]
+        width_pt, height_pt = (float(v) for v in page_size.split(" pts")[0].split(" x "))
+    except Exception:
+        return PDF_DEFAULT_DPI
+
+    area_in2 = (width_pt / 72) * (height_pt / 72)
+    if area_in2 <= 0:
+        return PDF_DEFAULT_DPI
+
+    dpi = int((pixel_budget / area_in2) ** 0.5)
+    return max(PDF_MIN_DPI, min(PDF_MAX_DPI, dpi))
+
+
+def convert_pdf_to_images(pdf, pages: list[int] = None,
+                          pixel_budget: int = PDF_PIXEL_BUDGET) -> list:
     """
-    Konversi PDF ke image list. Jika PDF_SUPPORT tidak tersedia, return empty list.
+    Konversi PDF (path atau bytes) ke image list. Jika PDF_SUPPORT tidak tersedia,
+    return empty list. Hanya halaman di `pages` (1-based, default halaman pertama)
+    yang dirender, dengan DPI adaptif sesuai pixel_budget.
     """
     if not PDF_SUPPORT:
         return []
     
     try:
-        images = convert_from_path(pdf_path, dpi=300)
+        dpi = choose_pdf_dpi(pdf, pixel_budget)
+        images = []
+        for page in pages or [1]:
+            if isinstance(pdf, str):
+                images.extend(convert_from_path(pdf, dpi=dpi, first_page=page, last_page=page))
+            else:
+                images.extend(convert_from_bytes(pdf, dpi=dpi, first_page=page, last_page=page))
         return images
     except Exception as e:
         print(f"Error converting PDF: {str(e)}")
         return []
 
 
-def read_image_with_gemini(image_path: str) -> str:
+def encode_pil_image(image: Image.Image) -> tuple[str, str]:
+    """Encode PIL image ke JPEG base64 (jauh lebih kecil dari PNG untuk hasil scan)"""
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return "image/jpeg", base64.standard_b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def extraction_cache_key(file_bytes: bytes, mode: str = None) -> str:
     """
-    Baca gambar surat izin dokter menggunakan Gemini API.
-    Support untuk JPG, PNG, dan PDF (akan dikonversi ke image dahulu)
+    Key extraction cache: SHA-256 dari isi file, versi prompt dan mode ekstraksi.
+    File yang sama (siapa pun yang upload) menghasilkan key yang sama.
     """
-    try:
-        # Handle PDF files
-        ext = image_path.lower().split('.')[-1]
+    mode = mode or EXTRACTION_MODE
+    digest = hashlib.sha256(file_bytes)
+    digest.update(PROMPT_VERSION.encode("utf-8"))
+    if mode != "text":
+        digest.update(f":{mode}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+MEDIA_TYPE_MAP = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp'
+}
+
+
+def encode_image_bytes(file_bytes, filename: str) -> tuple[str, str]:
+    """
+    Encode isi file gambar / PDF (bytes, bytearray, atau memoryview) ke base64
+    langsung di memori. Ekstensi `filename` menentukan media type.
+    Return (media_type, image_data). Raise ValueError jika file tidak bisa diproses.
+    """
+    ext = filename.lower().split('.')[-1]
+    
+    if ext == 'pdf':
+        if not PDF_SUPPORT:
+            raise ValueError("PDF support tidak tersedia. Install pdf2image dengan: pip install pdf2image")
         
-        if ext == 'pdf':
-            if not PDF_SUPPORT:
-                return "Error: PDF support tidak tersedia. Install pdf2image dengan: pip install pdf2image"
-            
-            # Convert PDF to images
-            images = convert_pdf_to_images(image_path)
-            if not images:
-                return "Error: Gagal mengkonversi PDF ke gambar"
-            
-            # Process first page only (most doctor's letters are single page)
-            image = images[0]
-            
-            # Convert PIL image to base64
-            # Ensure it's PNG format
-            if isinstance(image, Image.Image):
-                buffer = io.BytesIO()
-                image.save(buffer, format="PNG")
-                image_data = base64.standard_b64encode(buffer.getvalue()).decode("utf-8")
-                media_type = "image/png"
-            else:
-                return "Error: Gagal mengkonversi PDF"
-        else:
-            # Handle regular image files
-            with open(image_path, "rb") as image_file:
-                image_data = base64.standard_b64encode(image_file.read()).decode("utf-8")
-            
-            media_type_map = {
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'gif': 'image/gif',
-                'webp': 'image/webp'
-            }
-            media_type = media_type_map.get(ext, 'image/jpeg')
+        # Render first page only (most doctor's letters are single page)
+        with span("pdf_render"):
+            images = convert_pdf_to_images(bytes(file_bytes), pages=[1])
+        if not images:
+            raise ValueError("Gagal mengkonversi PDF ke gambar")
         
-        headers = {
-            "Content-Type": "application/json"
-        }
+        image = images[0]
+        
+        if isinstance(image, Image.Image):
+            with span("encode"):
+                return encode_pil_image(image)
+        raise ValueError("Gagal mengkonversi PDF")
+    
+    # base64 menerima buffer apa pun, jadi memoryview dari upload tidak perlu dicopy dulu
+    with span("encode"):
+        image_data = base64.standard_b64encode(file_bytes).decode("utf-8")
+    return MEDIA_TYPE_MAP.get(ext, 'image/jpeg'), image_data
+
+
+def encode_image_file(image_path: str) -> tuple[str, str]:
+    """
+    Baca file gambar / PDF dan encode ke base64.
+    Return (media_type, image_data). Raise ValueError jika file tidak bisa diproses.
+    """
+    if image_path.lower().endswith('.pdf'):
+        if not PDF_SUPPORT:
+            raise ValueError("PDF support tidak tersedia. Install pdf2image dengan: pip install pdf2image")
         
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "inlineData": {
-                                "mimeType": media_type,
-                                "data": image_data
-                            }
-                        },
-                        {
-                            "text": """Ekstrak data dari surat izin dokter ini:
+        # Poppler bisa membaca path langsung, tidak perlu load PDF ke memori
+        with span("pdf_render"):
+            images = convert_pdf_to_images(image_path, pages=[1])
+        if not images:
+            raise ValueError("Gagal mengkonversi PDF ke gambar")
+        with span("encode"):
+            return encode_pil_image(images[0])
+    
+    with span("read_file"), open(image_path, "rb") as image_file:
+        file_bytes = image_file.read()
+    return encode_image_bytes(file_bytes, image_path)
+
+
+TEXT_PROMPT = """Ekstrak data dari surat izin dokter ini:
                             
 Berikan output dalam format:
 NIK: [nilai]
@@ -108,34 +316,137 @@ Dokter: [nilai]
 Rumah Sakit: [nilai]
 
 Jika ada field yang tidak terlihat, tulis TIDAK_DITEMUKAN"""
+
+JSON_PROMPT = "Ekstrak data surat izin dokter ini. Field yang tidak terlihat isi null."
+
+# Field output = key dict hasil parse_ocr_text
+EXTRACTION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "nik": {"type": "STRING", "nullable": True, "description": "NIK 16 digit"},
+        "nama": {"type": "STRING", "nullable": True},
+        "tanggal_izin": {"type": "STRING", "nullable": True, "description": "Tanggal mulai izin, YYYY-MM-DD"},
+        "durasi": {"type": "INTEGER", "nullable": True, "description": "Lama izin dalam hari"},
+        "diagnosa": {"type": "STRING", "nullable": True},
+        "dokter": {"type": "STRING", "nullable": True},
+        "rumah_sakit": {"type": "STRING", "nullable": True},
+    },
+    "propertyOrdering": ["nik", "nama", "tanggal_izin", "durasi", "diagnosa", "dokter", "rumah_sakit"],
+}
+
+
+def build_extraction_payload(media_type: str, image_data: str, mode: str = None) -> dict:
+    """Payload generateContent untuk mode ekstraksi 'json' atau 'text'"""
+    mode = mode or EXTRACTION_MODE
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Mode ekstraksi tidak dikenal: {mode}")
+
+    payload = {
+        "contents": [
+            {
+                "parts": [
+                    {
+                        "inlineData": {
+                            "mimeType": media_type,
+                            "data": image_data
                         }
-                    ]
-                }
-            ]
+                    },
+                    {
+                        "text": JSON_PROMPT if mode == "json" else TEXT_PROMPT
+                    }
+                ]
+            }
+        ]
+    }
+
+    if mode == "json":
+        payload["generationConfig"] = {
+            "responseMimeType": "application/json",
+            "responseSchema": EXTRACTION_SCHEMA,
         }
+    return payload
+
+
+def extract_with_gemini(media_type: str, image_data: str, mode: str = None) -> str:
+    """
+    Kirim gambar (base64) ke Gemini dan ambil teks hasil ekstraksi
+    (JSON string untuk mode "json"). Jumlah token prompt/response dicatat
+    di last_call_stats client.
+    """
+    try:
+        payload = build_extraction_payload(media_type, image_data, mode)
         
-        response = requests.post(
-            GEMINI_BASE_URL,
-            headers=headers,
-            json=payload,
-            params={"key": GEMINI_API_KEY}
-        )
+        client = get_gemini_client()
+        with span("gemini"):
+            response = client.generate_content(payload)
         
         if response.status_code != 200:
             return f"Error: {response.status_code} - {response.text}"
         
         data = response.json()
+        
+        usage = data.get("usageMetadata") or {}
+        if client.last_call_stats is not None:
+            client.last_call_stats.update(
+                prompt_tokens=usage.get("promptTokenCount"),
+                response_tokens=usage.get("candidatesTokenCount")
+            )
+        
         return data["candidates"][0]["content"]["parts"][0]["text"]
     
     except Exception as e:
         return f"Error: {str(e)}"
 
 
+def read_image_bytes_with_gemini(file_bytes, filename: str, mode: str = None) -> str:
+    """
+    Baca surat izin dokter dari bytes / buffer (mis. hasil upload) tanpa menulis
+    file sementara. Support untuk JPG, PNG, dan PDF.
+    """
+    try:
+        media_type, image_data = encode_image_bytes(file_bytes, filename)
+    except Exception as e:
+        return f"Error: {str(e)}"
+    
+    return extract_with_gemini(media_type, image_data, mode)
+
+
+def read_image_with_gemini(image_path: str, mode: str = None) -> str:
+    """
+    Baca gambar surat izin dokter menggunakan Gemini API.
+    Support untuk JPG, PNG, dan PDF (akan dikonversi ke image dahulu)
+    """
+    try:
+        media_type, image_data = encode_image_file(image_path)
+    except Exception as e:
+        return f"Error: {str(e)}"
+    
+    return extract_with_gemini(media_type, image_data, mode)
+
+
 # ==================== DATA PARSING & NORMALIZATION ====================
 
+NOT_FOUND = "TIDAK_DITEMUKAN"
+
+# Label baris output mode "text" → field
+TEXT_FIELD_LABELS = {
+    'nik': 'nik',
+    'nama': 'nama',
+    'tanggal izin': 'tanggal_izin',
+    'durasi': 'durasi',
+    'diagnosa': 'diagnosa',
+    'dokter': 'dokter',
+    'rumah sakit': 'rumah_sakit',
+}
+
+ISO_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
 def parse_ocr_text(raw_text: str) -> dict:
     """
-    Parse raw OCR text ke structured format
+    Parse output Gemini ke structured format.
+    Output mode "json" cukup divalidasi; output mode "text" (dan raw_text lama)
+    di-parse per baris "Label: nilai".
     """
     result = {
         "nik": None,
@@ -148,70 +459,153 @@ def parse_ocr_text(raw_text: str) -> dict:
         "raw_text": raw_text
     }
     
+    stripped = raw_text.strip()
+    if stripped.startswith('{'):
+        try:
+            data = json.loads(stripped)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            for field in TEXT_FIELD_LABELS.values():
+                result[field] = validate_field(field, data.get(field))
+            return result
+    
     lines = raw_text.split('\n')
     
     for line in lines:
         line = line.strip()
         if ':' in line:
             key, value = line.split(':', 1)
-            key = key.strip().lower()
-            value = value.strip()
-            
-            if key == 'nik' and value != "TIDAK_DITEMUKAN":
-                result['nik'] = value
-            elif key == 'nama' and value != "TIDAK_DITEMUKAN":
-                result['nama'] = value
-            elif key == 'tanggal izin' and value != "TIDAK_DITEMUKAN":
-                result['tanggal_izin'] = normalize_date(value)
-            elif key == 'durasi' and value != "TIDAK_DITEMUKAN":
-                result['durasi'] = extract_duration(value)
-            elif key == 'diagnosa' and value != "TIDAK_DITEMUKAN":
-                result['diagnosa'] = normalize_diagnosis(value)
-            elif key == 'dokter' and value != "TIDAK_DITEMUKAN":
-                result['dokter'] = value
-            elif key == 'rumah sakit' and value != "TIDAK_DITEMUKAN":
-                result['rumah_sakit'] = value
+            field = TEXT_FIELD_LABELS.get(key.strip().lower())
+            if field:
+                result[field] = validate_field(field, value)
     
     return result
 
 
-def normalize_date(date_str: str) -> str:
+def validate_field(field: str, value):
     """
-    Konversi ke format YYYY-MM-DD
-    """
-    months = {
-        'januari': '01', 'january': '01', 'jan': '01',
-        'februari': '02', 'february': '02', 'feb': '02',
-        'maret': '03', 'march': '03', 'mar': '03',
-        'april': '04', 'apr': '04',
-        'mei': '05', 'may': '05',
-        'juni': '06', 'june': '06', 'jun': '06',
-        'juli': '07', 'july': '07', 'jul': '07',
-        'agustus': '08', 'august': '08', 'aug': '08',
-        'september': '09', 'sept': '09', 'sep': '09',
-        'oktober': '10', 'october': '10', 'oct': '10',
-        'november': '11', 'nov': '11',
-        'desember': '12', 'december': '12', 'dec': '12'
-    }
-    
-    date_str = date_str.lower()
+    Validasi & normalisasi satu field hasil ekstraksi.
+    Nilai kosong / TIDAK_DITEMUKAN → None; tanggal dan durasi yang sudah
+    bertipe benar (mode "json") hanya dicek, tidak di-parse ulang.
+    """
+    if value is None or isinstance(value, bool):
+        return None
     
-    # Try format: DD MMMM YYYY
-    for month_name, month_num in months.items():
-        if month_name in date_str:
-            parts = date_str.split()
-            try:
-                day = parts[0].zfill(2)
-                year = parts[-1]
-                return f"{year}-{month_num}-{day}"
-            except:
-                pass
+    if field == 'durasi':
+        if isinstance(value, int):
+            return value if value > 0 else None
+        return extract_duration(str(value))
     
-    # Try format: YYYY-MM-DD
-    if re.match(r'\d{4}-\d{2}-\d{2}', date_str):
-        return date_str
+    value = str(value).strip()
+    if not value or value == NOT_FOUND:
+        return None
     
-    return None
+    if field == 'tanggal_izin':
+        if ISO_DATE_PATTERN.fullmatch(value):
+            try:
+                return date.fromisoformat(value).isoformat()
+            except ValueError:
+                return None
+        return normalize_date(value)
+    if field == 'diagnosa':
+        return normalize_diagnosis(value)
+    return value
+
+
+MONTH_NAMES = {
+    'januari': 1, 'january': 1, 'jan': 1,
+    'februari': 2, 'pebruari': 2, 'february': 2, 'feb': 2, 'peb': 2,
+    'maret': 3, 'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'mei': 5, 'may': 5,
+    'juni': 6, 'june': 6, 'jun': 6,
+    'juli': 7, 'july': 7, 'jul': 7,
+    'agustus': 8, 'august': 8, 'agu': 8, 'agt': 8, 'ags': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9,
+    'oktober': 10, 'october': 10, 'okt': 10, 'oct': 10,
+    'november': 11, 'nopember': 11, 'nov': 11, 'nop': 11,
+    'desember': 12, 'december': 12, 'des': 12, 'dec': 12,
+}
+
+WEEKDAY_NAMES = (
+    'senin', 'selasa', 'rabu', 'kamis', "jum'at", 'jumat', 'sabtu', 'minggu', 'ahad',
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+)
+
+
+def _alternation(words) -> str:
+    """Alternation regex, kata terpanjang dulu agar 'maret' tidak terpotong jadi 'mar'"""
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+# Satu regex untuk semua format: [hari,] DD[-DD] MMMM YYYY | DD/MM/YYYY | DD-MM-YY | YYYY-MM-DD.
+# Rentang hari dalam satu bulan ("10-12 Januari", "10 s/d 12 Januari") → hari pertama
+DATE_PATTERN = re.compile(rf"""
+    (?:(?:{_alternation(WEEKDAY_NAMES)})\s*,?\s*)?
+    (?<!\d)(?:
+        (?P<day>\d{{1,2}})(?:\s*(?:[-–]|s\.?/?d\.?|sampai(?:\s+dengan)?|hingga)\s*\d{{1,2}}(?!\d))?
+            \s*[-/.]?\s*(?P<month_name>{_alternation(MONTH_NAMES)})(?![a-z])\.?\s*[-/.,]?\s*(?P<year>\d{{4}}|\d{{2}})
+      | (?P<num_day>\d{{1,2}})(?P<sep>[/.-])(?P<num_month>\d{{1,2}})(?P=sep)(?P<num_year>\d{{4}}|\d{{2}})
+      | (?P<iso_year>\d{{4}})-(?P<iso_month>\d{{1,2}})-(?P<iso_day>\d{{1,2}})
+    )(?!\d)
+""", re.IGNORECASE | re.VERBOSE)
+
+
+def _full_year(year: str) -> int:
+    """Tahun 2 digit dianggap 20YY (surat izin selalu baru)"""
+    return int(year) + 2000 if len(year) == 2 else int(year)
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(date_str: str) -> str:
+    """
+    Konversi ke format YYYY-MM-DD.
+    Return None jika tidak ada tanggal yang dikenali atau tanggalnya tidak valid (mis. 31 Februari).
+    """
+    match = DATE_PATTERN.search(date_str)
+    if not match:
+        return None
+
+    if match['month_name']:
+        day, month, year = match['day'], MONTH_NAMES[match['month_name'].lower()], match['year']
+    elif match['num_day']:
+        day, month, year = match['num_day'], match['num_month'], match['num_year']
+    else:
+        day, month, year = match['iso_day'], match['iso_month'], match['iso_year']
+
+    try:
+        return date(_full_year(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def normalize_date_series(dates: pd.Series) -> pd.Series:
+    """
+    Versi vektor normalize_date: nilai unik di-parse dengan satu str.extract
+    DATE_PATTERN dan divalidasi lewat pd.to_datetime, lalu di-map balik.
+    Tanggal tidak dikenali / tidak valid → <NA>.
+    """
+    dates = dates.astype("string")
+    codes, uniques = pd.factorize(dates)
+    parts = pd.Series(uniques, dtype="string").str.extract(DATE_PATTERN)
+
+    def number(*columns) -> np.ndarray:
+        values = columns[0]
+        for column in columns[1:]:
+            values = values.fillna(column)
+        return pd.to_numeric(values, errors='coerce').to_numpy('float64', na_value=np.nan)
+
+    year = number(parts['year'], parts['num_year'], parts['iso_year'])
+    parsed = pd.to_datetime(pd.DataFrame({
+        'year': np.where(year < 100, year + 2000, year),
+        'month': number(parts['month_name'].str.lower().map(MONTH_NAMES).astype("string"),
+                        parts['num_month'], parts['iso_month']),
+        'day': number(parts['day'], parts['num_day'], parts['iso_day']),
+    }), errors='coerce')
+
+    normalized = pd.array(parsed.dt.strftime('%Y-%m-%d'), dtype="string")
+    return pd.Series(normalized.take(codes, allow_fill=True), index=dates.index, name=dates.name)
 
 
 def extract_duration(duration_str: str) -> int:
@@ -224,136 +618,172 @@ def extract_duration(duration_str: str) -> int:
     return None
 
 
+# Sinonim diagnosis → nama standar di DISEASE_MASTER
+DIAGNOSIS_SYNONYMS = {
+    'DEMAM': ['DEMAM', 'FEBRIS', 'PANAS', 'FEVER'],
+    'TIPES': ['TIPES', 'TYPHUS', 'TYPUS'],
+    'DBD': ['DBD', 'DENGUE', 'DEMAM BERDARAH'],
+    'PILEK': ['PILEK', 'COMMON COLD', 'RHINITIS'],
+    'BATUK': ['BATUK', 'COUGH'],
+    'SAKIT KEPALA': ['SAKIT KEPALA', 'HEADACHE', 'MIGRAIN'],
+    'DIARE': ['DIARE', 'DIARRHEA'],
+    'ASMA': ['ASMA', 'ASTHMA'],
+    'HIPERTENSI': ['HIPERTENSI', 'HYPERTENSION'],
+    'DIABETES': ['DIABETES'],
+}
+
+
+def build_diagnosis_matcher(synonyms: dict) -> tuple[re.Pattern, dict]:
+    """
+    Compile tabel sinonim jadi satu regex alternation (varian terpanjang dulu)
+    di dalam lookahead, sehingga finditer mencoba setiap posisi awal dan
+    mengembalikan varian terpanjang di posisi itu. Return (pattern, varian → standar).
+    """
+    variant_map = {variant: standard for standard, variants in synonyms.items() for variant in variants}
+    alternation = "|".join(re.escape(variant) for variant in sorted(variant_map, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))"), variant_map
+
+
+_DIAGNOSIS_PATTERN, _DIAGNOSIS_VARIANTS = build_diagnosis_matcher(DIAGNOSIS_SYNONYMS)
+
+
+@lru_cache(maxsize=4096)
 def normalize_diagnosis(diagnosis: str) -> str:
     """
-    Normalisasi diagnosis
+    Normalisasi diagnosis ke nama standar.
+    Varian terpanjang yang ditemukan yang menang (DEMAM BERDARAH → DBD, bukan DEMAM).
     """
     diagnosis = diagnosis.upper().strip()
-    
-    # Mapping sinonim
-    synonyms = {
-        'DEMAM': ['DEMAM', 'FEBRIS', 'PANAS', 'FEVER'],
-        'TIPES': ['TIPES', 'TYPHUS', 'TYPUS'],
-        'DBD': ['DBD', 'DENGUE', 'DEMAM BERDARAH'],
-        'PILEK': ['PILEK', 'COMMON COLD', 'RHINITIS'],
-        'BATUK': ['BATUK', 'COUGH'],
-        'SAKIT KEPALA': ['SAKIT KEPALA', 'HEADACHE', 'MIGRAIN'],
-        'DIARE': ['DIARE', 'DIARRHEA'],
-        'ASMA': ['ASMA', 'ASTHMA'],
-        'HIPERTENSI': ['HIPERTENSI', 'HYPERTENSION'],
-        'DIABETES': ['DIABETES'],
-    }
-    
-    for standard, variants in synonyms.items():
-        for variant in variants:
-            if variant in diagnosis:
-                return standard
-    
-    return diagnosis
+
+    matches = [match.group(1) for match in _DIAGNOSIS_PATTERN.finditer(diagnosis)]
+    if not matches:
+        return diagnosis
+
+    # Seri panjang → varian yang muncul paling awal
+    return _DIAGNOSIS_VARIANTS[max(matches, key=len)]
+
+
+def normalize_diagnosis_series(diagnoses: pd.Series) -> pd.Series:
+    """
+    Versi vektor normalize_diagnosis untuk import massal / normalisasi ulang:
+    setiap nilai unik hanya dinormalisasi sekali lalu di-map balik.
+    """
+    diagnoses = diagnoses.astype("string")
+    codes, uniques = pd.factorize(diagnoses)
+    normalized = pd.array([normalize_diagnosis(value) for value in uniques], dtype="string")
+    return pd.Series(normalized.take(codes, allow_fill=True), index=diagnoses.index, name=diagnoses.name)
 
 
 # ==================== DISEASE CLASSIFICATION ====================
 
-DISEASE_MASTER = {
-    'DEMAM': {
-        'reimburseable': False,
-        'kategori': 'RINGAN',
-        'status_text': 'Tidak Bisa',
-        'reimburseable_male': False,
-        'reimburseable_female': False,
-        'catatan': 'Penyakit ringan, tidak direimburse'
-    },
-    'PILEK': {
-        'reimburseable': False,
-        'kategori': 'RINGAN',
-        'status_text': 'Tidak Bisa',
-        'reimburseable_male': False,
-        'reimburseable_female': False,
-        'catatan': 'Penyakit ringan, tidak direimburse'
-    },
-    'BATUK': {
-        'reimburseable': False,
-        'kategori': 'RINGAN',
-        'status_text': 'Tidak Bisa',
-        'reimburseable_male': False,
-        'reimburseable_female': False,
-        'catatan': 'Penyakit ringan, tidak direimburse'
-    },
-    'SAKIT KEPALA': {
-        'reimburseable': False,
-        'kategori': 'RINGAN',
-        'status_text': 'Tidak Bisa',
-        'reimburseable_male': False,
-        'reimburseable_female': False,
-        'catatan': 'Penyakit ringan, tidak direimburse'
-    },
-    'TIPES': {
-        'reimburseable': True,
-        'kategori': 'SEDANG',
-        'status_text': 'Bisa',
-        'reimburseable_male': True,
-        'reimburseable_female': True,
-        'catatan': 'Penyakit menular, bisa direimburse semua gender'
-    },
-    'DBD': {
-        'reimburseable': True,
-        'kategori': 'BERAT',
-        'status_text': 'Bisa',
-        'reimburseable_male': True,
-        'reimburseable_female': True,
-        'catatan': 'Penyakit berat, bisa direimburse semua gender'
-    },
-    'DIARE': {
-        'reimburseable': True,
-        'kategori': 'SEDANG',
-        'status_text': 'Bisa',
-        'reimburseable_male': True,
-        'reimburseable_female': True,
-        'catatan': 'Penyakit menular, bisa direimburse semua gender'
-    },
-    'ASMA': {
-        'reimburseable': True,
-        'kategori': 'SEDANG',
-        'status_text': 'Bisa',
-        'reimburseable_male': True,
-        'reimburseable_female': True,
-        'catatan': 'Penyakit kronis, bisa direimburse semua gender'
-    },
-    'HIPERTENSI': {
-        'reimburseable': True,
-        'kategori': 'SEDANG',
-        'status_text': 'Bisa',
-        'reimburseable_male': True,
-        'reimburseable_female': True,
-        'catatan': 'Penyakit kronis, bisa direimburse semua gender'
-    },
-    'DIABETES': {
-        'reimburseable': True,
-        'kategori': 'BERAT',
-        'status_text': 'Bisa',
-        'reimburseable_male': True,
-        'reimburseable_female': True,
-        'catatan': 'Penyakit kronis berat, bisa direimburse semua gender'
-    },
-}
+# Snapshot master penyakit dari tabel disease_master (lihat database.py).
+# classify_disease hanya membaca snapshot in-memory; versi di database dicek
+# paling sering sekali per DISEASE_MASTER_CHECK_SECONDS, dan snapshot baru
+# dibuat utuh lalu ditukar dalam satu assignment jika versinya berubah.
+DISEASE_MASTER_CHECK_SECONDS = float(os.getenv("DISEASE_MASTER_CHECK_SECONDS", "5"))
 
 
-def classify_disease(diagnosis: str) -> dict:
+class DiseaseMasterSnapshot(NamedTuple):
+    db_path: str
+    version: int
+    diseases: Mapping[str, Mapping]
+    checked_at: float
+
+
+_disease_master: DiseaseMasterSnapshot | None = None
+_disease_master_lock = threading.Lock()
+
+
+def _freeze_diseases(diseases: dict) -> Mapping[str, Mapping]:
+    return MappingProxyType({name: MappingProxyType(dict(info)) for name, info in diseases.items()})
+
+
+def reload_disease_master() -> DiseaseMasterSnapshot:
+    """
+    Muat ulang snapshot jika versi di database berubah (atau database lain
+    dipakai). Sebelum init_db membuat tabel, DEFAULT_DISEASE_MASTER dipakai
+    sebagai versi 0.
+    """
+    global _disease_master
+    with _disease_master_lock:
+        current = _disease_master
+        db_path = database.DB_PATH
+        try:
+            version = database.get_disease_master_version()
+            if current is None or current.db_path != db_path or current.version != version:
+                version, diseases = database.load_disease_master()
+                current = DiseaseMasterSnapshot(db_path, version, _freeze_diseases(diseases), 0.0)
+        except sqlite3.OperationalError:
+            current = DiseaseMasterSnapshot(db_path, 0, _freeze_diseases(database.DEFAULT_DISEASE_MASTER), 0.0)
+
+        _disease_master = current._replace(checked_at=time.monotonic())
+        return _disease_master
+
+
+def get_disease_master() -> DiseaseMasterSnapshot:
+    """Snapshot master penyakit saat ini (tanpa query selama belum waktunya cek versi)"""
+    snapshot = _disease_master
+    if (snapshot is None or snapshot.db_path != database.DB_PATH
+            or time.monotonic() - snapshot.checked_at >= DISEASE_MASTER_CHECK_SECONDS):
+        snapshot = reload_disease_master()
+    return snapshot
+
+
+def __getattr__(name: str):
+    """DISEASE_MASTER (dulu dict konstanta): alias read-only ke diseases snapshot saat ini"""
+    if name == "DISEASE_MASTER":
+        return get_disease_master().diseases
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+WARNING_NOT_REIMBURSEABLE = 'Penyakit tidak dapat direimburse'
+WARNING_UNKNOWN_DIAGNOSIS = 'Diagnosis tidak ditemukan di master data'
+DISEASE_WARNINGS = (WARNING_NOT_REIMBURSEABLE, WARNING_UNKNOWN_DIAGNOSIS)
+
+
+def classify_disease(diagnosis: str, master: DiseaseMasterSnapshot = None) -> dict:
     """
-    Klasifikasi penyakit dan tentukan reimbursability
+    Klasifikasi penyakit dan tentukan reimbursability.
+    master_version = versi master penyakit yang dipakai (disimpan per surat).
     """
+    master = master or get_disease_master()
     diagnosis = diagnosis.upper().strip()
     
-    if diagnosis in DISEASE_MASTER:
-        info = DISEASE_MASTER[diagnosis]
+    info = master.diseases.get(diagnosis)
+    if info is not None:
         return {
             'is_reimburseable': info['reimburseable'],
             'kategori': info['kategori'],
-            'warning': None if info['reimburseable'] else 'Penyakit tidak dapat direimburse'
+            'warning': None if info['reimburseable'] else WARNING_NOT_REIMBURSEABLE,
+            'master_version': master.version
         }
     
     return {
         'is_reimburseable': None,
         'kategori': 'TIDAK_DIKETAHUI',
-        'warning': 'Diagnosis tidak ditemukan di master data'
+        'warning': WARNING_UNKNOWN_DIAGNOSIS,
+        'master_version': master.version
     }
+
+
+def classify_diseases(diagnoses: pd.Series, master: DiseaseMasterSnapshot = None) -> pd.DataFrame:
+    """
+    Versi vektor classify_disease: satu left join diagnosa ke master penyakit.
+    Kolom hasil: is_reimburseable, kategori, warning (index sama dengan input).
+    """
+    master = master or get_disease_master()
+    table = pd.DataFrame(
+        [(name, info['reimburseable'], info['kategori']) for name, info in master.diseases.items()],
+        columns=['diagnosa', 'is_reimburseable', 'kategori']
+    ).astype({'diagnosa': 'string', 'is_reimburseable': 'boolean', 'kategori': 'string'})
+
+    keys = diagnoses.astype('string').str.upper().str.strip().rename('diagnosa')
+    result = keys.to_frame().merge(table, on='diagnosa', how='left').drop(columns='diagnosa')
+    result.index = diagnoses.index
+
+    known = result['kategori'].notna()
+    result['kategori'] = result['kategori'].fillna('TIDAK_DIKETAHUI')
+    result['warning'] = pd.Series(pd.NA, index=result.index, dtype='string')
+    result.loc[known & ~result['is_reimburseable'].fillna(False), 'warning'] = WARNING_NOT_REIMBURSEABLE
+    result.loc[~known, 'warning'] = WARNING_UNKNOWN_DIAGNOSIS
+    return result
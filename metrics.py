@@ -0,0 +1,129 @@
+"""
+Timing span ringan untuk pipeline upload dan query dashboard
+
+span(stage) mengukur satu tahap dengan perf_counter. Span di dalam trace()
+(mis. satu file upload) memakai trace_id yang sama, sehingga upload yang
+lambat bisa diurai per tahap. Span ditampung di buffer memori dan ditulis ke
+tabel perf_spans sekaligus (satu executemany) setiap METRICS_FLUSH_ROWS span
+atau METRICS_FLUSH_SECONDS detik, jadi biaya per span hanya beberapa µs.
+
+Span di luar trace tanpa `kind` (mis. llm_client dipanggil dari ingest.py
+atau benchmark) tidak dicatat.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+import pandas as pd
+
+import database
+
+METRICS_FLUSH_ROWS = 200
+METRICS_FLUSH_SECONDS = 10.0
+PERCENTILES = (0.50, 0.95, 0.99)
+
+# (trace_id, kind, label) trace yang sedang aktif
+_current_trace: ContextVar[tuple[str, str, str | None] | None] = ContextVar("metrics_trace", default=None)
+
+_buffer: list[tuple] = []
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+@contextmanager
+def trace(kind: str, trace_id: str = None, label: str = None):
+    """Kelompokkan span di dalam blok ini (trace_id sama = satu upload, meski lintas rerun)"""
+    token = _current_trace.set((trace_id or uuid.uuid4().hex, kind, label))
+    try:
+        yield
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str, kind: str = None):
+    """Ukur durasi blok sebagai tahap `stage` (juga saat blok raise exception)"""
+    current = _current_trace.get()
+    if current is None and kind is None:
+        yield
+        return
+
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        trace_id, trace_kind, label = current or (None, kind, None)
+        _record((trace_id, kind or trace_kind, stage, label, started_at, duration_ms))
+
+
+def _record(row: tuple):
+    with _buffer_lock:
+        _buffer.append(row)
+        due = len(_buffer) >= METRICS_FLUSH_ROWS or time.monotonic() - _last_flush >= METRICS_FLUSH_SECONDS
+    if due:
+        flush_spans()
+
+
+def flush_spans() -> int:
+    """
+    Tulis span di buffer ke database. Metrics bersifat best-effort: jika
+    database sedang sibuk, span dibuang dan upload/dashboard tetap jalan.
+    """
+    global _last_flush
+    with _buffer_lock:
+        rows = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+
+    if rows:
+        try:
+            database.save_perf_spans(rows)
+        except sqlite3.Error as e:
+            print(f"⚠️ Gagal menyimpan {len(rows)} span metrics: {e}")
+    return len(rows)
+
+
+atexit.register(flush_spans)
+
+
+# ==================== ANALISIS ====================
+
+def stage_percentiles(spans: pd.DataFrame, freq: str = None) -> pd.DataFrame:
+    """
+    p50/p95/p99 & jumlah span per (kind, stage), dan per periode `freq`
+    (mis. 'h' atau 'D', kolom 'periode') jika diisi.
+    """
+    columns = [f"p{round(q * 100)}" for q in PERCENTILES]
+    keys = ['kind', 'stage']
+    if freq:
+        spans = spans.assign(periode=spans['started_at'].dt.floor(freq))
+        keys = ['periode'] + keys
+    if spans.empty:
+        return pd.DataFrame(columns=keys + columns + ['jumlah'])
+
+    grouped = spans.groupby(keys)['duration_ms']
+    result = grouped.quantile(list(PERCENTILES)).unstack()
+    result.columns = columns
+    result['jumlah'] = grouped.size()
+    return result.reset_index()
+
+
+def slowest_traces(spans: pd.DataFrame, kind: str = 'upload', limit: int = 10) -> pd.DataFrame:
+    """Trace dengan total durasi terbesar; satu kolom ms per tahap (jumlah semua rerun)"""
+    traced = spans[(spans['kind'] == kind) & spans['trace_id'].notna()]
+    if traced.empty:
+        return pd.DataFrame(columns=['trace_id', 'mulai', 'label', 'total_ms'])
+
+    per_stage = traced.pivot_table(index='trace_id', columns='stage', values='duration_ms', aggfunc='sum')
+    result = traced.groupby('trace_id').agg(mulai=('started_at', 'min'), label=('label', 'first'))
+    result['total_ms'] = per_stage.sum(axis=1)
+    result = result.join(per_stage)
+    return result.sort_values('total_ms', ascending=False).head(limit).reset_index()
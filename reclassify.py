@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Klasifikasi ulang surat tersimpan setelah master penyakit berubah
+
+Hitung ulang is_reimburseable, kategori, warning_flag & warning_reason dari
+master penyakit terbaru, per chunk (satu transaksi per chunk). Hanya surat
+yang diagnosanya berubah sejak versi master yang dipakai surat itu yang
+dibaca; surat yang selesai dicap master_version baru, jadi job yang terhenti
+cukup dijalankan ulang untuk melanjutkan.
+
+Usage:
+    python reclassify.py
+    python reclassify.py --db surat_izin.db --chunk-size 10000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+import database
+from database import (
+    init_db,
+    count_stale_classifications,
+    read_stale_classifications,
+    write_classifications,
+    find_first_overlaps
+)
+from llm_client import DISEASE_WARNINGS, classify_diseases, reload_disease_master
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _same(a: pd.Series, b: pd.Series) -> pd.Series:
+    """Perbandingan null-safe (NULL dianggap sama dengan NULL)"""
+    return (a == b).fillna(False) | (a.isna() & b.isna())
+
+
+def reclassify_chunk(conn, chunk: pd.DataFrame, master) -> tuple[list[tuple], list[int]]:
+    """
+    Klasifikasi ulang satu chunk. Prioritas warning_reason sama dengan saat upload:
+    warning penyakit, lalu duplikasi, lalu overlap (dihitung ulang terhadap
+    semua surat lain jika dulu tertutup warning penyakit).
+    Return (updates untuk write_classifications, rowid yang hasilnya sama).
+    """
+    classified = classify_diseases(chunk['diagnosa'], master)
+
+    old_reason = chunk['warning_reason'].astype('string')
+    is_duplicate = chunk['is_duplicate'].fillna(0).astype(bool)
+    was_disease_warning = old_reason.isin(DISEASE_WARNINGS).fillna(False)
+
+    # Alasan non-penyakit (duplikasi/overlap) tetap; yang dulu tertutup warning penyakit dihitung ulang
+    fallback = old_reason.mask(was_disease_warning)
+    fallback = fallback.mask(was_disease_warning & is_duplicate,
+                             "Duplikasi (" + chunk['duplicate_score'].astype('string') + "%)")
+    recheck = was_disease_warning & ~is_duplicate & classified['warning'].isna()
+    overlaps = find_first_overlaps(conn, chunk.loc[recheck, 'rowid'].astype(int).tolist())
+    overlap_reason = chunk['rowid'].map({
+        rowid: f"Overlap izin dengan {surat_id} ({overlap_hari} hari)"
+        for rowid, (surat_id, overlap_hari) in overlaps.items()
+    }).astype('string')
+    fallback = fallback.mask(recheck, overlap_reason)
+
+    reason = classified['warning'].fillna(fallback)
+    flag = reason.notna()
+
+    same = (
+        _same(chunk['is_reimburseable'].astype('Int64').astype('boolean'), classified['is_reimburseable'])
+        & _same(chunk['kategori'].astype('string'), classified['kategori'])
+        & _same(chunk['warning_flag'].fillna(0).astype(bool), flag)
+        & _same(old_reason, reason)
+    )
+
+    changed = ~same
+    updates = list(zip(
+        classified.loc[changed, 'is_reimburseable'].astype(object).where(lambda values: values.notna(), None),
+        classified.loc[changed, 'kategori'].astype(object),
+        flag[changed].astype(bool),
+        reason[changed].astype(object).where(lambda values: values.notna(), None),
+        chunk.loc[changed, 'rowid'].astype(int)
+    ))
+    return updates, chunk.loc[same, 'rowid'].astype(int).tolist()
+
+
+def reclassify(chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> dict:
+    """
+    Jalankan klasifikasi ulang untuk master penyakit versi terbaru.
+    progress(selesai, total) dipanggil setelah setiap chunk di-commit.
+    """
+    init_db()
+    master = reload_disease_master()
+    total = count_stale_classifications(master.version)
+    summary = {'version': master.version, 'total': total, 'updated': 0, 'unchanged': 0}
+
+    after_rowid = 0
+    done = 0
+    while True:
+        with database.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            chunk = read_stale_classifications(conn, master.version, after_rowid, chunk_size)
+            if chunk.empty:
+                break
+
+            updates, unchanged = reclassify_chunk(conn, chunk, master)
+            write_classifications(conn, master.version, updates, unchanged)
+
+        after_rowid = int(chunk['rowid'].iloc[-1])
+        done += len(chunk)
+        summary['updated'] += len(updates)
+        summary['unchanged'] += len(unchanged)
+        if progress:
+            progress(min(done, total), total)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasifikasi ulang surat setelah master penyakit berubah")
+    parser.add_argument("--db", default=database.DB_PATH, help="Path database SQLite")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Jumlah surat per transaksi")
+    args = parser.parse_args()
+
+    database.DB_PATH = args.db
+    start = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - start
+        print(f"[{done:,}/{total:,}] {done / elapsed if elapsed else 0:,.0f} surat/detik", flush=True)
+
+    summary = reclassify(args.chunk_size, progress)
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Master versi {summary['version']}: {summary['total']:,} surat diperiksa dalam {elapsed:.1f} detik, "
+          f"{summary['updated']:,} berubah, {summary['unchanged']:,} tetap")
+
+
+if __name__ == "__main__":
+    main()
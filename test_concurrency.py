@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test konkurensi database: reader yang sedang membaca tidak boleh memblokir writer
+
+Jalankan dengan pytest (fixture temp_db ada di conftest.py).
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import database
+
+# Writer harus selesai jauh di bawah busy_timeout walaupun ada reader aktif
+MAX_WRITE_SECONDS = 1.0
+
+
+def make_record(i: int) -> dict:
+    return {
+        'surat_id': f"SURAT_TEST_{i:06d}",
+        'nik': f"3175{i % 50:012d}",
+        'nama': "karyawan test",
+        'tanggal_izin': "2026-01-12",
+        'durasi': 2,
+        'diagnosa': "DEMAM",
+        'dokter': "dr. Andi",
+        'rumah_sakit': "RS Sehat",
+        'is_reimburseable': False,
+        'kategori': "RINGAN",
+        'is_duplicate': False,
+        'duplicate_score': 0.0,
+        'duplicate_note': None,
+        'warning_flag': True,
+        'warning_reason': "Penyakit tidak dapat direimburse",
+        'upload_date': datetime.now().isoformat(),
+        'raw_text': "NIK: test"
+    }
+
+
+def test_open_read_transaction_does_not_block_writer(temp_db):
+    """Reader menahan transaksi baca terbuka, writer tetap bisa commit"""
+    for i in range(100):
+        database.save_to_db(make_record(i))
+
+    reader_ready = threading.Event()
+    writer_done = threading.Event()
+
+    def reader():
+        with database.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT * FROM surat_izin")
+            cursor.fetchmany(10)  # snapshot baca tetap terbuka
+            reader_ready.set()
+            writer_done.wait(timeout=10)
+            assert cursor.execute("SELECT count(*) FROM surat_izin").fetchone()[0] == 100
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    reader_ready.wait()
+
+    start = time.perf_counter()
+    database.save_to_db(make_record(1000))
+    elapsed = time.perf_counter() - start
+    writer_done.set()
+    thread.join()
+
+    assert elapsed < MAX_WRITE_SECONDS, f"writer terblokir {elapsed:.2f}s oleh reader"
+    assert len(database.get_all_records()) == 101
+
+
+def test_concurrent_readers_and_writers(temp_db):
+    """Banyak thread baca + tulis bersamaan tanpa 'database is locked'"""
+    errors = []
+
+    def writer(offset: int):
+        try:
+            for i in range(50):
+                record = make_record(offset + i)
+                database.check_duplicate(record)
+                database.save_to_db(record)
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(50):
+                database.get_all_records()
+        except sqlite3.Error as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n * 1000,)) for n in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
+    assert len(database.get_all_records()) == 200
+    with database.get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test normalisasi tanggal: normalize_date & normalize_date_series harus sama
+"""
+
+import pandas as pd
+
+from llm_client import normalize_date, normalize_date_series
+
+# (input OCR, hasil yang diharapkan; None = tidak dikenali / tidak valid)
+DATE_CASES = [
+    ("12 Januari 2026", "2026-01-12"),
+    ("Senin, 5 Januari 2026", "2026-01-05"),
+    ("Jumat,12 Des 26", "2026-12-12"),
+    ("Kamis 1 okt 2026", "2026-10-01"),
+    ("12-Agustus-2025", "2025-08-12"),
+    ("12 Desember, 2026", "2026-12-12"),
+    ("5 Sept 2026", "2026-09-05"),
+    ("05-01-26", "2026-01-05"),
+    ("1/2/26", "2026-02-01"),
+    ("12/01/2026", "2026-01-12"),
+    ("12.01.2026", "2026-01-12"),
+    ("2026-01-12", "2026-01-12"),
+    ("2026-1-5", "2026-01-05"),
+    ("tanggal 3 Mei 2026 s/d 5 Mei 2026", "2026-05-03"),
+    ("10-12 Januari 2026", "2026-01-10"),
+    ("10 - 12 Januari 2026", "2026-01-10"),
+    ("10 s/d 12 Januari 2026", "2026-01-10"),
+    ("28 sd 30 Jan 26", "2026-01-28"),
+    ("3 sampai dengan 5 Mei 2026", "2026-05-03"),
+    ("29/02/2024", "2024-02-29"),
+    ("29/02/2025", None),
+    ("31 Februari 2026", None),
+    ("31/04/2026", None),
+    ("12/13/2026", None),
+    ("tidak ada", None),
+    ("", None),
+]
+
+
+def test_normalize_date_cases():
+    """Setiap format tanggal di DATE_CASES"""
+    for text, expected in DATE_CASES:
+        assert normalize_date(text) == expected, f"{text!r}: {normalize_date(text)!r} != {expected!r}"
+
+
+def test_series_matches_scalar():
+    """normalize_date_series == normalize_date per elemen (termasuk <NA>, duplikat & index)"""
+    texts = [text for text, _ in DATE_CASES] * 2 + [None]
+    dates = pd.Series(texts, index=range(100, 100 + len(texts)), dtype="string")
+    result = normalize_date_series(dates)
+
+    assert result.index.equals(dates.index)
+    for text, value in zip(texts, result):
+        expected = normalize_date(text) if text is not None else None
+        assert (None if pd.isna(value) else value) == expected, f"{text!r}: {value!r} != {expected!r}"
+
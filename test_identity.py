@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test fuzzy matching identitas: NIK salah baca 1-2 digit + nama mirip
+"""
+
+import database
+
+NIK = "3175061203900012"
+
+
+def save(surat_id: str, nik: str, nama: str):
+    database.save_to_db({
+        'surat_id': surat_id, 'nik': nik, 'nama': nama, 'tanggal_izin': "2026-01-12", 'durasi': 1,
+        'diagnosa': "DEMAM", 'dokter': None, 'rumah_sakit': None, 'is_reimburseable': False,
+        'kategori': "RINGAN", 'is_duplicate': False, 'duplicate_score': 0.0, 'duplicate_note': None,
+        'warning_flag': False, 'warning_reason': None, 'upload_date': "2026-01-12T08:00:00", 'raw_text': None
+    })
+
+
+def matched_niks(nik: str, nama: str) -> dict[str, int]:
+    """{nik: jarak NIK} hasil find_identity_matches"""
+    return {match['nik']: match['nik_distance'] for match in database.find_identity_matches(nik, nama)}
+
+
+def test_nik_typos_match_only_with_similar_name(temp_db):
+    """NIK beda 1-2 digit (ganti, hapus, sisip) cocok jika nama mirip, tidak jika nama lain"""
+    cases = [
+        ("3175061203900013", 1),   # 1 digit salah baca
+        ("317506120390012", 1),    # 1 digit hilang
+        ("3175081203900072", 2),   # 2 digit salah baca
+        ("31750612039000122", 1),  # 1 digit tersisip
+        ("317506120390072", 2),    # 1 digit hilang + 1 salah baca
+    ]
+    save("SURAT_1", NIK, "dicky anugrah")
+
+    for typo, distance in cases:
+        assert matched_niks(typo, "Dicky Anugrah") == {NIK: distance}, typo
+        assert matched_niks(typo, "Dicky Anugerah") == {NIK: distance}, typo
+        assert matched_niks(typo, "Siti Rahmawati") == {}, typo
+        assert matched_niks(typo, None) == {NIK: distance}, typo
+
+
+def test_no_candidate(temp_db):
+    """NIK beda >= 3 digit atau database tanpa NIK mirip: tidak ada kandidat"""
+    assert matched_niks(NIK, "dicky anugrah") == {}
+
+    save("SURAT_1", NIK, "dicky anugrah")
+    assert matched_niks("3175061203977712", "dicky anugrah") == {}
+    assert matched_niks("3275071203900013", "dicky anugrah") == {}
+    assert matched_niks(NIK, "siti rahmawati") == {NIK: 0}
+
+
+def test_blocks_are_built_on_write(temp_db):
+    """save_to_db meng-index NIK di transaksinya sendiri; pencarian tidak menulis"""
+    save("SURAT_1", NIK, "dicky anugrah")
+
+    with database.get_connection() as conn:
+        last_rowid = conn.execute("SELECT last_rowid FROM nik_blocks_sync").fetchone()[0]
+        assert last_rowid == conn.execute("SELECT MAX(rowid) FROM surat_izin").fetchone()[0]
+        changes = conn.total_changes
+        assert matched_niks("3175061203900013", "dicky anugrah") == {NIK: 1}
+        assert conn.total_changes == changes
+
+
+def test_cluster_distance_is_to_canonical_nik(temp_db):
+    """nik_distance di identity_clusters = jarak ke NIK kanonik, bukan ke pasangan terakhir"""
+    # C hanya tersambung lewat B (C-B = 2 digit, C-NIK = 3 digit)
+    chain = [NIK, "3175061203900013", "3175061203901113"]
+    for i in range(3):
+        save(f"SURAT_A{i}", chain[0], "dicky anugrah")
+    save("SURAT_B", chain[1], "dicky anugrah")
+    save("SURAT_C", chain[2], "dicky anugrah")
+    save("SURAT_D", "3175061203900999", "siti rahmawati")
+
+    stats = database.rebuild_identity_clusters()
+    assert stats['clusters'] == 1 and stats['merged_niks'] == 2, stats
+
+    clusters = database.get_identity_clusters()
+    assert set(clusters['cluster_nik']) == {NIK}
+    assert dict(zip(clusters['nik'], clusters['nik_distance'])) == {chain[0]: 0, chain[1]: 1, chain[2]: 3}
+    assert set(clusters['name_similarity']) == {1.0}
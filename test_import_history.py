@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test import data historis: import ulang idempoten, normalisasi upload_date dan
+rollup bulanan
+"""
+
+import pandas as pd
+
+import database
+from import_history import import_history
+
+
+def write_csv(tmp_path, upload_dates: list) -> str:
+    path = str(tmp_path / "riwayat.csv")
+    pd.DataFrame({
+        'NIK': [f"3175{i:012d}" for i in range(len(upload_dates))],
+        'Nama': "karyawan test",
+        'Tanggal Izin': "10/01/2023",
+        'Durasi': "2 hari",
+        'Diagnosa': "demam",
+        'Tanggal Upload': upload_dates,
+    }).to_csv(path, index=False)
+    return path
+
+
+def rollup_rows(conn) -> list[tuple]:
+    return conn.execute(f"SELECT * FROM surat_izin_monthly ORDER BY {database.ROLLUP_KEYS}").fetchall()
+
+
+def test_reimport_skips_stored_rows(temp_db):
+    """Import ulang file yang sama (mis. setelah terhenti) tidak menyimpan baris dua kali"""
+    path = write_csv(temp_db, ["2023-01-15T08:00:00", "2023-02-16T08:30:00", None])
+    assert import_history(path)['inserted'] == 3
+
+    summary = import_history(path)
+    assert summary['inserted'] == 0 and summary['skipped'] == 3, summary
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM surat_izin").fetchone()[0] == 3
+
+
+def test_non_iso_upload_date_is_normalized(temp_db):
+    """upload_date DD/MM/YYYY [HH:MM] tersimpan sebagai YYYY-MM-DDTHH:MM:SS"""
+    path = write_csv(temp_db, ["15/01/2023", "16/02/2023 08:30", "2023-03-17 09:15:42", "5 April 2023"])
+    summary = import_history(path)
+    assert summary['inserted'] == 4, summary
+
+    with database.get_connection() as conn:
+        stored = [row[0] for row in conn.execute("SELECT upload_date FROM surat_izin ORDER BY nik")]
+    assert stored == ["2023-01-15T00:00:00", "2023-02-16T08:30:00",
+                      "2023-03-17T09:15:42", "2023-04-05T00:00:00"], stored
+
+    assert database.get_upload_date_range() == ("2023-01-15T00:00:00", "2023-04-05T00:00:00")
+    periods = database.get_upload_periods()
+    assert sorted(zip(periods['year'], periods['month'])) == [(2023, 1), (2023, 2), (2023, 3), (2023, 4)]
+
+
+def test_missing_or_invalid_upload_date_falls_back_to_tanggal_izin(temp_db):
+    """upload_date kosong / tidak dikenali → tanggal izin jam 00:00:00"""
+    path = write_csv(temp_db, [None, "kemarin", "31/02/2023"])
+    summary = import_history(path)
+    assert summary['inserted'] == 3 and summary['rejected'] == 0, summary
+
+    with database.get_connection() as conn:
+        stored = {row[0] for row in conn.execute("SELECT upload_date FROM surat_izin")}
+    assert stored == {"2023-01-10T00:00:00"}, stored
+
+
+def test_batch_insert_keeps_rollup_in_sync(temp_db):
+    """Rollup sesudah import (trigger dijeda) + upload biasa (trigger aktif) sama dengan rebuild"""
+    import_history(write_csv(temp_db, ["2023-01-15T08:00:00", "2023-02-16T08:30:00", None]))
+    database.save_to_db({
+        'surat_id': "SURAT_UPLOAD_1", 'nik': "3175999999999999", 'nama': "upload",
+        'tanggal_izin': "2023-03-01", 'durasi': 3, 'diagnosa': "DEMAM",
+        'upload_date': "2023-03-02T10:00:00"
+    })
+
+    with database.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM surat_izin_monthly_paused").fetchone()[0] == 0
+        incremental = rollup_rows(conn)
+    database.rebuild_monthly_rollup()
+    with database.get_connection() as conn:
+        assert incremental == rollup_rows(conn)
+        assert sum(row[-2] for row in incremental) == 4
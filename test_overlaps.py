@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test overlap izin: surat dengan NIK sama yang rentang [tanggal_izin,
+tanggal_izin + durasi) beririsan
+"""
+
+import database
+
+NIK = "3175061203900012"
+
+
+def save(surat_id: str, tanggal_izin: str, durasi, nik: str = NIK):
+    database.save_to_db({
+        'surat_id': surat_id, 'nik': nik, 'nama': "dicky anugrah", 'tanggal_izin': tanggal_izin,
+        'durasi': durasi, 'diagnosa': "DEMAM", 'upload_date': "2026-01-20T08:00:00"
+    })
+
+
+def overlaps(tanggal_izin: str, durasi, nik: str = NIK) -> dict[str, int]:
+    """{surat_id: overlap_hari} hasil find_overlapping_leaves"""
+    found = database.find_overlapping_leaves({'nik': nik, 'tanggal_izin': tanggal_izin, 'durasi': durasi})
+    return {row['surat_id']: row['overlap_hari'] for row in found}
+
+
+def test_overlapping_leaves(temp_db):
+    """3 hari mulai tgl 10 vs 2 hari mulai tgl 11 beririsan; surat yang bersambung tidak"""
+    save("SURAT_A", "2026-01-10", 3)   # 10, 11, 12
+    save("SURAT_B", "2026-01-20", None)
+
+    assert overlaps("2026-01-11", 2) == {"SURAT_A": 2}
+    assert overlaps("2026-01-08", 3) == {"SURAT_A": 1}
+    assert overlaps("2026-01-09", 10) == {"SURAT_A": 3}
+    assert overlaps("2026-01-13", 2) == {}                   # mulai tepat setelah SURAT_A selesai
+    assert overlaps("2026-01-07", 3) == {}                   # selesai tepat sebelum SURAT_A mulai
+    assert overlaps("2026-01-20", 1) == {"SURAT_B": 1}       # durasi kosong = 1 hari
+    assert overlaps("2026-01-11", 2, nik="3175061203900099") == {}
+
+
+def test_invalid_durasi_counts_as_one_day(temp_db):
+    """durasi bukan angka (hasil OCR) dihitung 1 hari, bukan ValueError"""
+    save("SURAT_A", "2026-01-10", 3)
+
+    assert overlaps("2026-01-12", "abc") == {"SURAT_A": 1}
+    assert overlaps("2026-01-12", "") == {"SURAT_A": 1}
+    assert overlaps("2026-01-13", "abc") == {}
+    assert overlaps("tidak ada", 2) == {}
+
+
+def test_bulk_pairs(temp_db):
+    """find_overlapping_pairs melaporkan setiap pasangan sekali, per NIK"""
+    save("SURAT_A", "2026-01-10", 3)
+    save("SURAT_B", "2026-01-11", 2)
+    save("SURAT_C", "2026-01-12", 1)
+    save("SURAT_D", "2026-01-13", 2)
+    save("SURAT_E", "2026-01-10", 3, nik="3175061203900099")
+
+    pairs = database.find_overlapping_pairs()
+    assert sorted(zip(pairs['surat_id_a'], pairs['surat_id_b'], pairs['overlap_hari'])) == [
+        ("SURAT_A", "SURAT_B", 2), ("SURAT_A", "SURAT_C", 1), ("SURAT_B", "SURAT_C", 1),
+    ]
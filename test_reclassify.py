@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test klasifikasi ulang: setelah master penyakit berubah hanya surat yang
+terdampak yang dibaca & diubah, job yang terhenti bisa dilanjutkan, dan
+rollup bulanan tetap sinkron
+"""
+
+import database
+from llm_client import WARNING_NOT_REIMBURSEABLE, classify_disease, reload_disease_master
+from reclassify import reclassify
+
+DIAGNOSES = ("DEMAM", "TIPES", "BATUK", "MIGRAIN")
+CHUNK_SIZE = 10
+
+
+class Interrupted(Exception):
+    pass
+
+
+def save_classified(i: int, diagnosa: str, is_duplicate: bool = False):
+    """Simpan surat dengan klasifikasi & warning seperti halaman Upload"""
+    disease = classify_disease(diagnosa, reload_disease_master())
+    reason = disease['warning'] or ("Duplikasi (80.0%)" if is_duplicate else None)
+    database.save_to_db({
+        'surat_id': f"SURAT_RECLASS_{i:04d}", 'nik': f"3175{i:012d}", 'nama': "karyawan test",
+        'tanggal_izin': f"2026-0{i % 3 + 1}-10", 'durasi': 2, 'diagnosa': diagnosa,
+        'is_reimburseable': disease['is_reimburseable'], 'kategori': disease['kategori'],
+        'is_duplicate': is_duplicate, 'duplicate_score': 80.0 if is_duplicate else 0.0,
+        'warning_flag': reason is not None, 'warning_reason': reason,
+        'upload_date': f"2026-0{i % 3 + 1}-11T08:00:00", 'master_version': disease['master_version']
+    })
+
+
+def classifications() -> dict[str, tuple]:
+    with database.get_connection() as conn:
+        return {row[0]: row[1:] for row in conn.execute(
+            "SELECT surat_id, diagnosa, is_reimburseable, kategori, warning_flag, warning_reason FROM surat_izin"
+        )}
+
+
+def assert_rollup_matches_rebuild():
+    query = f"SELECT * FROM surat_izin_monthly ORDER BY {database.ROLLUP_KEYS}"
+    with database.get_connection() as conn:
+        incremental = conn.execute(query).fetchall()
+    database.rebuild_monthly_rollup()
+    with database.get_connection() as conn:
+        assert conn.execute(query).fetchall() == incremental, "rollup tidak sinkron setelah reclassify"
+
+
+def test_reclassify_only_affected_rows_and_resume(temp_db):
+    """DEMAM jadi reimburseable: hanya surat DEMAM yang berubah, lanjut setelah terhenti"""
+    for i in range(100):
+        save_classified(i, DIAGNOSES[i % len(DIAGNOSES)], is_duplicate=i % 20 == 0)
+    before = classifications()
+    demam = {surat_id for surat_id, row in before.items() if row[0] == "DEMAM"}
+    duplicates = {f"SURAT_RECLASS_{i:04d}" for i in range(0, 100, 20)}
+    assert all(before[surat_id][1] == 0 for surat_id in demam)
+
+    _, diseases = database.load_disease_master()
+    diseases['DEMAM'] = {**diseases['DEMAM'], 'reimburseable': True, 'kategori': 'SEDANG'}
+    version = database.save_disease_master(diseases)
+    assert database.count_stale_classifications(version) == len(demam)
+
+    # Job terhenti setelah chunk pertama di-commit
+    def stop_after_first_chunk(done, total):
+        raise Interrupted()
+
+    try:
+        reclassify(CHUNK_SIZE, stop_after_first_chunk)
+    except Interrupted:
+        pass
+    assert database.count_stale_classifications(version) == len(demam) - CHUNK_SIZE
+    assert_rollup_matches_rebuild()
+
+    summary = reclassify(CHUNK_SIZE)
+    assert summary['total'] == len(demam) - CHUNK_SIZE, summary
+    assert summary['updated'] == len(demam) - CHUNK_SIZE and summary['unchanged'] == 0, summary
+    assert database.count_stale_classifications(version) == 0
+
+    after = classifications()
+    for surat_id, row in after.items():
+        if surat_id not in demam:
+            assert row == before[surat_id], surat_id
+            continue
+        diagnosa, is_reimburseable, kategori, warning_flag, warning_reason = row
+        assert (is_reimburseable, kategori) == (1, 'SEDANG'), row
+        assert before[surat_id][4] == WARNING_NOT_REIMBURSEABLE
+        # Warning penyakit hilang; surat duplikat kembali ke warning duplikasi
+        duplicate = surat_id in duplicates
+        assert warning_reason == ("Duplikasi (80.0%)" if duplicate else None), row
+        assert warning_flag == duplicate, row
+    assert_rollup_matches_rebuild()
+
+    # Tanpa perubahan master: tidak ada yang dibaca ulang
+    assert reclassify(CHUNK_SIZE)['total'] == 0
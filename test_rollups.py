@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test rollup bulanan: surat_izin_monthly harus selalu sama dengan GROUP BY
+langsung atas surat_izin setelah INSERT, UPDATE dan DELETE
+"""
+
+import random
+
+import database
+
+DIAGNOSES = [("DEMAM", "RINGAN", False), ("TIPES", "SEDANG", True), ("DBD", "BERAT", True), ("BATUK", None, None)]
+
+# GROUP BY langsung (NULL → '' / -1, seperti key surat_izin_monthly)
+EXPECTED_ROLLUP = '''
+SELECT COALESCE(substr(upload_date, 1, 7), ''), COALESCE(substr(tanggal_izin, 1, 7), ''),
+       COALESCE(diagnosa, ''), COALESCE(kategori, ''),
+       COALESCE(is_reimburseable = 1, -1), COALESCE(is_duplicate = 1, -1), COALESCE(warning_flag = 1, -1),
+       COUNT(*), COALESCE(SUM(durasi), 0)
+FROM surat_izin
+GROUP BY 1, 2, 3, 4, 5, 6, 7
+'''
+
+
+def make_record(rng: random.Random, i: int) -> dict:
+    diagnosa, kategori, reimburse = rng.choice(DIAGNOSES)
+    month = rng.randint(1, 4)
+    return {
+        'surat_id': f"SURAT_ROLLUP_{i:04d}",
+        'nik': f"3175{rng.randint(0, 20):012d}",
+        'nama': "karyawan test",
+        'tanggal_izin': f"2026-{month:02d}-{rng.randint(1, 28):02d}",
+        'durasi': rng.choice([1, 2, 3, None]),
+        'diagnosa': diagnosa,
+        'dokter': None,
+        'rumah_sakit': None,
+        'is_reimburseable': reimburse,
+        'kategori': kategori,
+        'is_duplicate': rng.random() < 0.2,
+        'duplicate_score': 0.0,
+        'duplicate_note': None,
+        'warning_flag': rng.random() < 0.3,
+        'warning_reason': None,
+        'upload_date': f"2026-{month:02d}-{rng.randint(1, 28):02d}T08:00:00" if rng.random() < 0.9 else None,
+        'raw_text': None,
+    }
+
+
+def assert_rollup_matches(step: str):
+    with database.get_connection() as conn:
+        rollup = sorted(conn.execute(f"SELECT {database.ROLLUP_KEYS}, jumlah, total_durasi FROM surat_izin_monthly"))
+        expected = sorted(conn.execute(EXPECTED_ROLLUP))
+    assert rollup == expected, f"rollup tidak sinkron setelah {step}"
+    assert all(row[-2] > 0 for row in rollup), f"baris rollup kosong tersisa setelah {step}"
+
+
+def test_rollup_matches_group_by_after_writes(temp_db):
+    """Trigger rollup menjaga surat_izin_monthly lewat insert, update & delete"""
+    rng = random.Random(7)
+    for i in range(200):
+        database.save_to_db(make_record(rng, i))
+    assert_rollup_matches("insert")
+
+    with database.get_connection() as conn:
+        conn.execute("UPDATE surat_izin SET diagnosa = 'TIPES', kategori = 'SEDANG', is_reimburseable = 1 "
+                     "WHERE diagnosa = 'DEMAM' AND rowid % 3 = 0")
+        conn.execute("UPDATE surat_izin SET upload_date = '2026-05-02T09:00:00', durasi = durasi + 1 "
+                     "WHERE rowid % 5 = 0")
+        conn.execute("UPDATE surat_izin SET is_duplicate = NOT is_duplicate, warning_flag = NULL "
+                     "WHERE rowid % 7 = 0")
+        conn.execute("UPDATE surat_izin SET nama = 'nama baru' WHERE rowid % 2 = 0")
+    assert_rollup_matches("update")
+
+    with database.get_connection() as conn:
+        conn.execute("DELETE FROM surat_izin WHERE rowid % 4 = 0 OR diagnosa = 'DBD'")
+    assert_rollup_matches("delete")
+
+    with database.get_connection() as conn:
+        incremental = sorted(conn.execute("SELECT * FROM surat_izin_monthly"))
+    database.rebuild_monthly_rollup()
+    with database.get_connection() as conn:
+        assert sorted(conn.execute("SELECT * FROM surat_izin_monthly")) == incremental
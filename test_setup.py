@@ -49,60 +49,78 @@ except ImportError:
     print("   ❌ requests not installed")
 
 # 3. Test llm_client functions
-print("\n3️⃣  Testing llm_client functions...")
-try:
-    from llm_client import (
-        parse_ocr_text,
-        normalize_date,
-        normalize_diagnosis,
-        classify_disease,
-        DISEASE_MASTER
-    )
-    print("   ✅ llm_client imports successful")
+def check_llm_client():
+    print("\n3️⃣  Testing llm_client functions...")
+    try:
+        from llm_client import (
+            parse_ocr_text,
+            normalize_date,
+            normalize_diagnosis,
+            classify_disease
+        )
+        print("   ✅ llm_client imports successful")
     
-    # Test normalize_date
-    date_result = normalize_date("12 Januari 2026")
-    print(f"   ✅ normalize_date: '12 Januari 2026' → '{date_result}'")
-    assert date_result == "2026-01-12", f"Expected 2026-01-12, got {date_result}"
+        # Test normalize_date
+        date_result = normalize_date("12 Januari 2026")
+        print(f"   ✅ normalize_date: '12 Januari 2026' → '{date_result}'")
+        assert date_result == "2026-01-12", f"Expected 2026-01-12, got {date_result}"
     
-    # Test normalize_diagnosis
-    diag_result = normalize_diagnosis("demam panas")
-    print(f"   ✅ normalize_diagnosis: 'demam panas' → '{diag_result}'")
-    assert diag_result == "DEMAM", f"Expected DEMAM, got {diag_result}"
+        # Test normalize_diagnosis
+        diag_result = normalize_diagnosis("demam panas")
+        print(f"   ✅ normalize_diagnosis: 'demam panas' → '{diag_result}'")
+        assert diag_result == "DEMAM", f"Expected DEMAM, got {diag_result}"
     
-    # Test classify_disease
-    disease_info = classify_disease("DEMAM")
-    print(f"   ✅ classify_disease: DEMAM → reimburseable={disease_info['is_reimburseable']}")
-    assert disease_info['is_reimburseable'] == False
+        # Test classify_disease
+        disease_info = classify_disease("DEMAM")
+        print(f"   ✅ classify_disease: DEMAM → reimburseable={disease_info['is_reimburseable']}")
+        assert disease_info['is_reimburseable'] == False
     
-    # Test parse_ocr_text
-    raw_text = """
-    NIK: 3175xxxx
-    Nama: Dicky Anugrah
-    Tanggal Izin: 12 Januari 2026
-    Durasi: 2 hari
-    Diagnosa: Demam
-    Dokter: dr. Andi
-    Rumah Sakit: RS Sehat
-    """
+        # Test parse_ocr_text
+        raw_text = """
+        NIK: 3175xxxx
+        Nama: Dicky Anugrah
+        Tanggal Izin: 12 Januari 2026
+        Durasi: 2 hari
+        Diagnosa: Demam
+        Dokter: dr. Andi
+        Rumah Sakit: RS Sehat
+        """
     
-    parsed = parse_ocr_text(raw_text)
-    print(f"   ✅ parse_ocr_text: Extracted {len([v for v in parsed.values() if v])} fields")
-    assert parsed['nik'] == "3175xxxx"
-    assert parsed['nama'] == "Dicky Anugrah"
+        parsed = parse_ocr_text(raw_text)
+        print(f"   ✅ parse_ocr_text: Extracted {len([v for v in parsed.values() if v])} fields")
+        assert parsed['nik'] == "3175xxxx"
+        assert parsed['nama'] == "Dicky Anugrah"
     
-except Exception as e:
-    print(f"   ❌ Error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
 
 # 4. Test disease master data
-print("\n4️⃣  Checking disease master data...")
-print(f"   ✅ Total diseases: {len(DISEASE_MASTER)}")
-for disease, info in DISEASE_MASTER.items():
-    status = "✅" if info['reimburseable'] else "❌"
-    print(f"      {status} {disease}: {info['kategori']}")
+def check_disease_master():
+    print("\n4️⃣  Checking disease master data...")
+    from llm_client import DISEASE_MASTER, get_disease_master
+
+    disease_master = get_disease_master()
+    print(f"   ✅ Total diseases: {len(disease_master.diseases)} (versi {disease_master.version})")
+    for disease, info in disease_master.diseases.items():
+        status = "✅" if info['reimburseable'] else "❌"
+        print(f"      {status} {disease}: {info['kategori']}")
+    assert DISEASE_MASTER == disease_master.diseases
+
+
+def test_llm_client(temp_db):
+    """Lewat pytest: check 3 & 4 memakai database sementara (fixture temp_db di
+    conftest.py), jadi surat_izin.db yang di-commit tidak ikut diubah"""
+    check_llm_client()
+    check_disease_master()
+
+
+if __name__ == "__main__":
+    check_llm_client()
+    check_disease_master()
 
 # 5. Test database
 print("\n5️⃣  Testing database...")